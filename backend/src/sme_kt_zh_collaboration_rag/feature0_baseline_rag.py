@@ -21,6 +21,9 @@ Data & vector store:
     The vector store is written to <project-root>/backend/data_vs.db.
     Set reset_vs=True (or RESET_VS=1) to rebuild the store from scratch.
     Re-embedding is skipped on subsequent runs if the store already exists.
+    Set sync_vs=True (or SYNC_VS=1) to instead update the store incrementally:
+    only new or edited files are re-chunked, and only their changed chunks are
+    embedded; chunks of edited or deleted files are removed.
 
 Usage:
     BACKEND must always be provided explicitly:
@@ -43,7 +46,13 @@ from pathlib import Path
 from loguru import logger
 
 from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.embeddings.cached import CachedEmbeddings
 from conversational_toolkit.embeddings.openai import OpenAIEmbeddings
+from conversational_toolkit.embeddings.quantization import (
+    Quantization,
+    QuantizationReport,
+    compare_quantized_recall,
+)
 
 from conversational_toolkit.agents.base import QueryWithContext
 from conversational_toolkit.agents.rag import RAG
@@ -54,6 +63,9 @@ from conversational_toolkit.chunking.pdf_chunker import PDFChunker
 from conversational_toolkit.embeddings.sentence_transformer import (
     SentenceTransformerEmbeddings,
 )
+from conversational_toolkit.ingestion.parallel_chunker import ParallelChunker
+from conversational_toolkit.ingestion.pipeline import IngestionPipeline
+from conversational_toolkit.ingestion.sync import ChunkIndex, VectorStoreSync
 from conversational_toolkit.llms.base import LLM, LLMMessage
 from conversational_toolkit.llms.local_llm import LocalLLM
 from conversational_toolkit.llms.ollama import OllamaLLM
@@ -61,11 +73,15 @@ from conversational_toolkit.llms.openai import OpenAILLM
 from conversational_toolkit.retriever.vectorstore_retriever import VectorStoreRetriever
 from conversational_toolkit.vectorstores.base import ChunkMatch
 from conversational_toolkit.vectorstores.chromadb import ChromaDBVectorStore
+from sme_kt_zh_collaboration_rag.feature1_evaluation import EVALUATION_QUERIES
 
 # Paths and defaults
 _ROOT = Path(__file__).parents[3]  # <project-root>/
 DATA_DIR = _ROOT / "data"
 VS_PATH = _ROOT / "backend" / "data_vs.db"
+EMBEDDING_CACHE_PATH = _ROOT / "backend" / "embedding_cache.db"
+CHUNK_CACHE_DIR = _ROOT / "backend" / "chunk_cache"
+MANIFEST_PATH = _ROOT / "backend" / "data_vs_manifest.json"
 
 EMBEDDING_MODEL = "text-embedding-3-small"
 RETRIEVER_TOP_K = 5
@@ -174,18 +190,8 @@ def build_llm(
             )
 
 
-def load_chunks(max_files: int | None = None) -> list[Chunk]:
-    """Load documents from DATA_DIR and split them into chunks.
-
-    Supported formats:
-        .pdf: converted to Markdown, split on headings
-        .xlsx, .xls: one chunk per sheet (Markdown table)
-
-    Unsupported formats (e.g. standalone images) are logged as warnings and skipped. Images embedded inside PDFs are not extracted as text by default!
-
-    Pass 'max_files' to cap the total number of files processed. Useful for quick iteration during development before scaling to all files.
-    """
-    all_chunks: list[Chunk] = []
+def _list_data_files(max_files: int | None = None) -> list[Path]:
+    """Supported files in DATA_DIR, without evaluation sheets and oversized files."""
     all_files = sorted(f for f in DATA_DIR.iterdir() if f.is_file())
 
     if max_files is not None:
@@ -205,8 +211,8 @@ def load_chunks(max_files: int | None = None) -> list[Chunk]:
         for f in all_files
         if f.suffix.lower() in _CHUNKERS and "EVALUATION" not in f.name
     ]
-    logger.info(f"Chunking {len(supported_files)} files from {DATA_DIR}")
 
+    files = []
     for file_path in supported_files:
         size_mb = file_path.stat().st_size / (1024 * 1024)
         if size_mb > MAX_FILE_SIZE_MB:
@@ -215,18 +221,44 @@ def load_chunks(max_files: int | None = None) -> list[Chunk]:
                 f"({size_mb:.1f} MB > {MAX_FILE_SIZE_MB} MB limit)"
             )
             continue
-        chunker = _CHUNKERS[file_path.suffix.lower()]
-        try:
-            file_chunks = chunker.make_chunks(str(file_path))
-            for chunk in file_chunks:
-                chunk.metadata["source_file"] = file_path.name
-                # Also store as "source" and "title" so the frontend can display them
-                chunk.metadata["source"] = file_path.name
-                chunk.metadata["title"] = chunk.title
-            all_chunks.extend(file_chunks)
-            logger.debug(f"  {file_path.name}: {len(file_chunks)} chunks")
-        except Exception as exc:
-            logger.warning(f"Skipping {file_path.name}: {exc}")
+        files.append(file_path)
+    return files
+
+
+def _annotate_chunks(file_path: Path, chunks: list[Chunk]) -> None:
+    for chunk in chunks:
+        chunk.metadata["source_file"] = file_path.name
+        # Also store as "source" and "title" so the frontend can display them
+        chunk.metadata["source"] = file_path.name
+        chunk.metadata["title"] = chunk.title
+
+
+def load_chunks(max_files: int | None = None) -> list[Chunk]:
+    """Load documents from DATA_DIR and split them into chunks.
+
+    Supported formats:
+        .pdf: converted to Markdown, split on headings
+        .xlsx, .xls: one chunk per sheet (Markdown table)
+
+    Unsupported formats (e.g. standalone images) are logged as warnings and skipped. Images embedded inside PDFs are not extracted as text by default!
+
+    Files are converted in parallel worker processes ('ParallelChunker'), and the result per file is cached in CHUNK_CACHE_DIR, so unchanged files are not converted again on the next run.
+
+    Pass 'max_files' to cap the total number of files processed. Useful for quick iteration during development before scaling to all files.
+    """
+    files_to_chunk = _list_data_files(max_files)
+    logger.info(f"Chunking {len(files_to_chunk)} files from {DATA_DIR}")
+
+    chunker = ParallelChunker(_CHUNKERS, cache_dir=str(CHUNK_CACHE_DIR))
+    try:
+        chunks_by_file = chunker.chunk_files(files_to_chunk)
+    finally:
+        chunker.close()
+
+    all_chunks: list[Chunk] = []
+    for file_path, file_chunks in chunks_by_file.items():
+        _annotate_chunks(file_path, file_chunks)
+        all_chunks.extend(file_chunks)
 
     logger.info(f"Done, {len(all_chunks)} chunks total")
     return all_chunks
@@ -254,9 +286,13 @@ async def build_vector_store(
     embedding_model: EmbeddingsModel,
     db_path: Path = VS_PATH,
     reset: bool = False,
-    batch_size: int = 10,
+    concurrency: int = 4,
+    max_batch_tokens: int = 100_000,
 ) -> ChromaDBVectorStore:
-    """Embed 'chunks' and persist them in a ChromaDB vector store."""
+    """Embed 'chunks' and persist them in a ChromaDB vector store.
+
+    Chunks are packed into batches of up to 'max_batch_tokens' (estimated) tokens, with 'concurrency' embedding requests in flight while earlier batches are written to the store ('IngestionPipeline').
+    """
     vector_store = ChromaDBVectorStore(db_path=str(db_path))
 
     if reset:
@@ -264,6 +300,8 @@ async def build_vector_store(
         vector_store.collection = vector_store.client.create_collection(
             name="default_collection"
         )
+        # Chunk IDs recorded by 'sync_vector_store' no longer exist
+        MANIFEST_PATH.unlink(missing_ok=True)
         logger.info(f"Reset vector store collection at {db_path}")
 
     if not reset and vector_store.collection.count() > 0:
@@ -274,38 +312,67 @@ async def build_vector_store(
 
     logger.info(f"Embedding {len(chunks)} chunks with {embedding_model!r} ...")
 
-    for i in range(0, len(chunks), batch_size):
-        batch = chunks[i : i + batch_size]
+    # Several embedding requests in flight while a single writer inserts finished batches
+    pipeline = IngestionPipeline(
+        embedding_model,
+        vector_store,
+        concurrency=concurrency,
+        max_batch_tokens=max_batch_tokens,
+    )
+    await pipeline.run(chunks)
 
-        # Text embeddings need content strings; multimodal embeddings need Chunk objects
-        if all(c.mime_type.startswith("text") for c in batch):
-            embeddings = await embedding_model.get_embeddings(
-                [c.content for c in batch]
-            )
-        else:
-            embeddings = await embedding_model.get_embeddings(batch)
+    logger.info(f"Done! Vector store written to {db_path}")
+    return vector_store
 
-        await vector_store.insert_chunks(chunks=batch, embedding=embeddings)
 
-        logger.info(
-            f"Processed batch {i // batch_size + 1}/{(len(chunks) - 1) // batch_size + 1}"
+async def sync_vector_store(
+    embedding_model: EmbeddingsModel,
+    db_path: Path = VS_PATH,
+    manifest_path: Path = MANIFEST_PATH,
+    max_files: int | None = None,
+    indexes: list[ChunkIndex] | None = None,
+) -> ChromaDBVectorStore:
+    """Incrementally update the vector store to match the files in DATA_DIR.
+
+    Alternative to 'load_chunks' + 'build_vector_store': only files that changed since the last sync are chunked, only their new chunks are embedded, and chunks of edited or deleted files are removed ('VectorStoreSync'). Pass 'indexes' (e.g. a 'BM25Retriever' over the same store) to keep them in step.
+    """
+    vector_store = ChromaDBVectorStore(db_path=str(db_path))
+    if not manifest_path.exists() and vector_store.collection.count() > 0:
+        # Built by 'build_vector_store': its chunk IDs are unknown, so start over once
+        vector_store.client.delete_collection(vector_store.collection.name)
+        vector_store.collection = vector_store.client.create_collection(
+            name="default_collection"
         )
+        logger.info(f"No sync manifest yet, reset vector store collection at {db_path}")
+    store_sync = VectorStoreSync(
+        vector_store, embedding_model, str(manifest_path), indexes=indexes or []
+    )
 
-    logger.info(f"Done! Vector store written to {db_path}")
+    chunker = ParallelChunker(_CHUNKERS, cache_dir=str(CHUNK_CACHE_DIR))
+    try:
+        await store_sync.sync(
+            _list_data_files(max_files), chunker, prepare=_annotate_chunks
+        )
+    finally:
+        chunker.close()
+
+    logger.info(
+        f"Vector store at {db_path} holds {vector_store.collection.count()} chunks"
+    )
     return vector_store
 
 
 async def inspect_retrieval(
     query: str,
     vector_store: ChromaDBVectorStore,
-    embedding_model: SentenceTransformerEmbeddings | OpenAIEmbeddings,
+    embedding_model: EmbeddingsModel,
     top_k: int = RETRIEVER_TOP_K,
 ) -> list[ChunkMatch]:
     """Run semantic retrieval and print the results before the LLM sees anything.
 
     This is the most important diagnostic step: if the chunks returned here are wrong, the final answer will be wrong regardless of the model. Run this step in isolation to tune 'RETRIEVER_TOP_K', experiment with query phrasing, or compare different embedding models.
 
-    # To add lexical (BM25) or hybrid (semantic + lexical) retrieval, replace 'VectorStoreRetriever' with 'HybridRetriever([semantic, bm25], top_k=top_k)' 'BM25Retriever' requires a 'list[ChunkRecord]' corpus -> pass the records retrieved from ChromaDB or, after a full store insert, re-fetch them with 'vector_store.get_chunks_by_embedding(zero_vector, top_k=N)'.
+    # To add lexical (BM25) or hybrid (semantic + lexical) retrieval, replace 'VectorStoreRetriever' with 'HybridRetriever([semantic, bm25], top_k=top_k)' 'BM25Retriever' only needs the vector store -> pass 'index_path' to persist its inverted index between runs.
     """
     retriever = VectorStoreRetriever(embedding_model, vector_store, top_k=top_k)
     results = await retriever.retrieve(query)
@@ -322,9 +389,33 @@ async def inspect_retrieval(
     return results
 
 
+async def check_embedding_quantization(
+    model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+    quantization: Quantization = "onnx-int8",
+    top_k: int = RETRIEVER_TOP_K,
+    max_files: int | None = MAX_FILES,
+) -> QuantizationReport:
+    """Compare an int8-quantized local embedding model against its fp32 version.
+
+    Both models embed the EVALUATION_QUERIES and the chunks of DATA_DIR; the report gives the fraction of the fp32 top-k chunks that the quantized model still retrieves, and the speedup. Run this before switching a deployment to a quantized model: a recall@k close to 1.0 means retrieval is practically unchanged.
+    """
+    chunks = load_chunks(max_files=max_files)
+    reference = SentenceTransformerEmbeddings(model_name=model_name)
+    quantized = SentenceTransformerEmbeddings(
+        model_name=model_name, quantization=quantization
+    )
+    return await compare_quantized_recall(
+        reference,
+        quantized,
+        queries=[q["query"] for q in EVALUATION_QUERIES],
+        corpus=[c.content for c in chunks],
+        k=top_k,
+    )
+
+
 def build_agent(
     vector_store: ChromaDBVectorStore,
-    embedding_model: SentenceTransformerEmbeddings | OpenAIEmbeddings,
+    embedding_model: EmbeddingsModel,
     llm: LLM,
     top_k: int,
     system_prompt: str,
@@ -377,6 +468,7 @@ async def run_pipeline(
     model_name: str | None = None,
     query: str = "What sustainability certifications do the pallets have?",
     reset_vs: bool = False,
+    sync_vs: bool = False,
 ) -> str:
     """Run the full five-step pipeline and return the final answer.
 
@@ -385,27 +477,36 @@ async def run_pipeline(
         model_name: Model override, see build_llm() for per-backend defaults
         query:      The question to ask
         reset_vs:   Rebuild the vector store from scratch even if one exists
+        sync_vs:    Incrementally sync the vector store with DATA_DIR instead
 
     Returns:
         The final answer string from the RAG agent.
     """
     logger.info("Starting Baseline RAG pipeline")
     logger.info(
-        f"backend={backend!r}  model={model_name!r}  max_files={MAX_FILES}  reset_vs={reset_vs}  top_k={RETRIEVER_TOP_K}"
+        f"backend={backend!r}  model={model_name!r}  max_files={MAX_FILES}  reset_vs={reset_vs}  sync_vs={sync_vs}  top_k={RETRIEVER_TOP_K}"
     )
 
-    # Step 1: Chunking
-    chunks = load_chunks(max_files=MAX_FILES)
-    inspect_chunks(chunks)
-
-    # Step 2: Embedding + vector store
-    embedding_model: SentenceTransformerEmbeddings | OpenAIEmbeddings
+    base_embedding_model: SentenceTransformerEmbeddings | OpenAIEmbeddings
     if "sentence-transformers" in EMBEDDING_MODEL:
-        embedding_model = SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL)
+        base_embedding_model = SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL)
+    else:
+        base_embedding_model = OpenAIEmbeddings(model_name=EMBEDDING_MODEL)
+    # Rebuilding the vector store only re-embeds chunks whose text changed
+    embedding_model = CachedEmbeddings(
+        base_embedding_model, cache_path=str(EMBEDDING_CACHE_PATH)
+    )
+
+    if sync_vs and not reset_vs:
+        # Steps 1 + 2: Chunk and embed only what changed since the last run
+        vector_store = await sync_vector_store(embedding_model, max_files=MAX_FILES)
     else:
-        embedding_model = OpenAIEmbeddings(model_name=EMBEDDING_MODEL)
+        # Step 1: Chunking
+        chunks = load_chunks(max_files=MAX_FILES)
+        inspect_chunks(chunks)
 
-    vector_store = await build_vector_store(chunks, embedding_model, reset=reset_vs)
+        # Step 2: Embedding + vector store
+        vector_store = await build_vector_store(chunks, embedding_model, reset=reset_vs)
 
     # Step 3: Inspect retrieval before the LLM is involved
     await inspect_retrieval(query, vector_store, embedding_model)
@@ -441,5 +542,6 @@ if __name__ == "__main__":
             model_name=os.getenv("MODEL") or None,
             query=os.getenv("QUERY", "What materials is the Lara pallet made out of?"),
             reset_vs=os.getenv("RESET_VS", "0") == "1",
+            sync_vs=os.getenv("SYNC_VS", "0") == "1",
         )
     )
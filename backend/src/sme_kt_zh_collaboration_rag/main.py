@@ -51,6 +51,7 @@ _DB_DIR.mkdir(exist_ok=True)
 
 IMAGE_VS_PATH = _DB_DIR / "vs_image"
 TEXT_VS_PATH = _DB_DIR / "vs_text"
+BM25_INDEX_PATH = _DB_DIR / "bm25_text.json"
 
 SYSTEM_PROMPT = dedent("""
     You are a sustainability compliance assistant for PrimePack AG.
@@ -130,7 +131,9 @@ def build_server():
     hybrid_retriever = HybridRetriever(
         retrievers=[
             VectorStoreRetriever(text_embedding_model, text_vs, top_k=RETRIEVER_TOP_K),
-            BM25Retriever(text_vs, top_k=RETRIEVER_TOP_K),
+            BM25Retriever(
+                text_vs, top_k=RETRIEVER_TOP_K, index_path=str(BM25_INDEX_PATH)
+            ),
         ],
         top_k=RETRIEVER_TOP_K,
     )
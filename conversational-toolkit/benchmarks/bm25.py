@@ -0,0 +1,97 @@
+"""
+Benchmark: sparse 'BM25Index' search vs. dense 'rank_bm25.BM25Okapi' scoring.
+
+The dense path is what 'BM25Retriever' used to do per query: 'get_scores' over every chunk followed by a Python sort of all indices. The sparse path only touches the postings of the query terms and selects the top k with 'np.argpartition'.
+
+The corpus is synthetic: token IDs drawn from a Zipf distribution over a fixed vocabulary, which reproduces the long-tailed term frequencies of real text. Queries mix frequent and rare terms.
+
+Usage (from the 'conversational-toolkit' directory):
+    python -m benchmarks.bm25 --sizes 10000 100000 1000000
+
+Building 'BM25Okapi' over 1M chunks needs several GB of RAM; pass '--skip-dense-above 100000' to benchmark only the sparse index at that size.
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+from rank_bm25 import BM25Okapi  # type: ignore[import-untyped]
+
+from conversational_toolkit.retriever.bm25_index import BM25Index, tokenize
+
+VOCABULARY_SIZE = 50_000
+CHUNK_LENGTH = 60
+QUERY_LENGTH = 4
+N_QUERIES = 50
+TOP_K = 10
+
+
+def make_corpus(n_chunks: int, rng: np.random.Generator) -> list[str]:
+    token_ids = rng.zipf(1.2, size=(n_chunks, CHUNK_LENGTH)) % VOCABULARY_SIZE
+    return [" ".join(f"t{token}" for token in row) for row in token_ids]
+
+
+def make_queries(rng: np.random.Generator) -> list[str]:
+    token_ids = rng.zipf(1.2, size=(N_QUERIES, QUERY_LENGTH)) % VOCABULARY_SIZE
+    return [" ".join(f"t{token}" for token in row) for row in token_ids]
+
+
+def time_queries(search: Callable[[str], object], queries: list[str]) -> float:
+    """Mean latency per query in milliseconds."""
+    start = time.perf_counter()
+    for query in queries:
+        search(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def run(n_chunks: int, skip_dense_above: int | None) -> None:
+    rng = np.random.default_rng(0)
+    corpus = make_corpus(n_chunks, rng)
+    queries = make_queries(rng)
+
+    start = time.perf_counter()
+    index = BM25Index()
+    for i, text in enumerate(corpus):
+        index.add(str(i), text)
+    sparse_build = time.perf_counter() - start
+    # The first pass also compiles the posting arrays of the query terms; the second one hits the cache.
+    sparse_cold_ms = time_queries(lambda q: index.search(q, TOP_K), queries)
+    sparse_ms = time_queries(lambda q: index.search(q, TOP_K), queries)
+    print(
+        f"{n_chunks:>9,} chunks | sparse  build {sparse_build:7.1f}s | query {sparse_ms:9.2f} ms "
+        f"(first use {sparse_cold_ms:.2f} ms)"
+    )
+
+    if skip_dense_above is not None and n_chunks > skip_dense_above:
+        print(f"{n_chunks:>9,} chunks | dense   skipped")
+        return
+
+    start = time.perf_counter()
+    bm25 = BM25Okapi([tokenize(text) for text in corpus])
+    dense_build = time.perf_counter() - start
+
+    def dense_search(query: str) -> list[int]:
+        scores: list[float] = bm25.get_scores(tokenize(query)).tolist()
+        return sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:TOP_K]
+
+    dense_search(queries[0])
+    dense_ms = time_queries(dense_search, queries)
+    print(
+        f"{n_chunks:>9,} chunks | dense   build {dense_build:7.1f}s | query {dense_ms:9.2f} ms "
+        f"| speed-up {dense_ms / sparse_ms:6.1f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--skip-dense-above", type=int, default=None)
+    args = parser.parse_args()
+
+    for n_chunks in args.sizes:
+        run(n_chunks, args.skip_dense_above)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: loading one conversation from the in-memory databases with secondary indexes vs. full scans.
+
+Loading a conversation (what 'ConversationalToolkitController.get_messages_by_conversation_id' does) fetches its messages, then the sources and reactions of every message. The scan path is how the in-memory repositories used to answer these lookups: a list comprehension over every stored record, once per lookup. The indexed path goes through the repositories' 'SecondaryIndex'es.
+
+The databases are filled with 'messages_per_conversation' messages per conversation, each with two sources and one reaction.
+
+Usage (from the 'conversational-toolkit' directory):
+    python -m benchmarks.conversation_db --messages 100000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from conversational_toolkit.conversation_database.data_models.message import Message
+from conversational_toolkit.conversation_database.data_models.reaction import Reaction
+from conversational_toolkit.conversation_database.data_models.source import Source
+from conversational_toolkit.conversation_database.in_memory.message import InMemoryMessageDatabase
+from conversational_toolkit.conversation_database.in_memory.reactions import InMemoryReactionDatabase
+from conversational_toolkit.conversation_database.in_memory.source import InMemorySourceDatabase
+
+N_LOOKUPS = 20
+
+
+def write_snapshots(directory: str, n_messages: int, messages_per_conversation: int) -> None:
+    messages, sources, reactions = {}, {}, {}
+    for i in range(n_messages):
+        message_id = f"m{i}"
+        messages[message_id] = Message(
+            id=message_id,
+            user_id="u",
+            conversation_id=f"c{i // messages_per_conversation}",
+            content="content",
+            role="assistant",
+            create_timestamp=i,
+        ).model_dump()
+        for j in range(2):
+            sources[f"s{i}_{j}"] = Source(
+                id=f"s{i}_{j}", message_id=message_id, content="chunk", metadata={}
+            ).model_dump()
+        reactions[f"r{i}"] = Reaction(id=f"r{i}", user_id="u", message_id=message_id, content="like").model_dump()
+
+    for name, records in (("messages", messages), ("sources", sources), ("reactions", reactions)):
+        with open(os.path.join(directory, f"{name}.json"), "w") as f:
+            json.dump(records, f)
+
+
+async def load_indexed(
+    message_db: InMemoryMessageDatabase,
+    source_db: InMemorySourceDatabase,
+    reaction_db: InMemoryReactionDatabase,
+    conversation_id: str,
+) -> int:
+    n_records = 0
+    for message in await message_db.get_messages_by_conversation_id(conversation_id):
+        n_records += len(await source_db.get_sources_by_message_id(message.id))
+        n_records += len(await reaction_db.get_reactions_by_message_id(message.id))
+    return n_records
+
+
+def load_scanning(
+    message_db: InMemoryMessageDatabase,
+    source_db: InMemorySourceDatabase,
+    reaction_db: InMemoryReactionDatabase,
+    conversation_id: str,
+) -> int:
+    n_records = 0
+    for message in [msg for msg in message_db.messages.values() if msg.conversation_id == conversation_id]:
+        n_records += len([src for src in source_db.sources.values() if src.message_id == message.id])
+        n_records += len([react for react in reaction_db.reactions.values() if react.message_id == message.id])
+    return n_records
+
+
+async def run(n_messages: int, messages_per_conversation: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        write_snapshots(directory, n_messages, messages_per_conversation)
+        start = time.perf_counter()
+        message_db = InMemoryMessageDatabase(os.path.join(directory, "messages.json"))
+        source_db = InMemorySourceDatabase(os.path.join(directory, "sources.json"))
+        reaction_db = InMemoryReactionDatabase(os.path.join(directory, "reactions.json"))
+        load_s = time.perf_counter() - start
+
+    n_conversations = n_messages // messages_per_conversation
+    conversation_ids = [f"c{i * n_conversations // N_LOOKUPS}" for i in range(N_LOOKUPS)]
+
+    start = time.perf_counter()
+    for conversation_id in conversation_ids:
+        indexed_records = await load_indexed(message_db, source_db, reaction_db, conversation_id)
+    indexed_ms = (time.perf_counter() - start) / N_LOOKUPS * 1000
+
+    start = time.perf_counter()
+    for conversation_id in conversation_ids:
+        scanned_records = load_scanning(message_db, source_db, reaction_db, conversation_id)
+    scan_ms = (time.perf_counter() - start) / N_LOOKUPS * 1000
+
+    assert indexed_records == scanned_records
+    print(
+        f"{n_messages:>9,} messages ({messages_per_conversation} per conversation) | load {load_s:5.1f}s | "
+        f"indexed {indexed_ms:9.3f} ms | scan {scan_ms:9.1f} ms | speed-up {scan_ms / indexed_ms:,.0f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--messages-per-conversation", type=int, default=20)
+    args = parser.parse_args()
+
+    for n_messages in args.messages:
+        asyncio.run(run(n_messages, args.messages_per_conversation))
+
+
+if __name__ == "__main__":
+    main()
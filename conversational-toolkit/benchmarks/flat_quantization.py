@@ -0,0 +1,98 @@
+"""
+Benchmark: 'FlatVectorStore' search over float32 vectors vs. int8 and product-quantized codes.
+
+For every configuration the benchmark reports the bytes scanned per chunk, the mean latency of a single-query 'get_chunks_by_embedding' call, and recall@k against the exact float32 ranking (fraction of the exact top k that the configuration returns). Quantized configurations run with and without the float32 rerank of the 'top_k * rerank_factor' best candidates.
+
+The corpus is synthetic: unit vectors scattered around random cluster centres, which gives the uneven neighbourhoods of real embeddings (uniform random vectors would make every neighbour almost equally far). Queries are perturbed corpus vectors.
+
+Usage (from the 'conversational-toolkit' directory):
+    python -m benchmarks.flat_quantization --sizes 10000 100000 --dimensions 1024
+
+The float32 matrix of 'n' chunks takes 'n * dimensions * 4' bytes on disk and is briefly held in RAM while the store is filled.
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+import numpy as np
+from numpy.typing import NDArray
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.vectorstores.flat import FlatVectorStore
+from conversational_toolkit.vectorstores.quantization import QuantizationKind
+
+N_CLUSTERS = 1_000
+N_QUERIES = 50
+TOP_K = 10
+RERANK_FACTOR = 10
+
+
+def make_corpus(n_chunks: int, dimensions: int, rng: np.random.Generator) -> NDArray[np.float32]:
+    centres = rng.standard_normal((N_CLUSTERS, dimensions), dtype=np.float32)
+    vectors = centres[rng.integers(0, N_CLUSTERS, n_chunks)]
+    vectors += rng.standard_normal((n_chunks, dimensions), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(corpus: NDArray[np.float32], rng: np.random.Generator) -> NDArray[np.float32]:
+    queries = corpus[rng.integers(0, corpus.shape[0], N_QUERIES)]
+    return queries + 0.5 * rng.standard_normal(queries.shape, dtype=np.float32) / np.sqrt(corpus.shape[1])
+
+
+async def search(store: FlatVectorStore, queries: NDArray[np.float32]) -> tuple[list[set[str]], float]:
+    """Result IDs per query and the mean latency per query in milliseconds."""
+    await store.get_chunks_by_embedding(queries[0], TOP_K)  # warm-up: page in the codes
+    start = time.perf_counter()
+    results = [await store.get_chunks_by_embedding(query, TOP_K) for query in queries]
+    latency = (time.perf_counter() - start) / len(queries) * 1000
+    return [{match.id for match in matches} for matches in results], latency
+
+
+async def run(n_chunks: int, dimensions: int, dims_per_subspace: int) -> None:
+    rng = np.random.default_rng(0)
+    corpus = make_corpus(n_chunks, dimensions, rng)
+    queries = make_queries(corpus, rng)
+
+    with tempfile.TemporaryDirectory() as db_path:
+        store = FlatVectorStore(db_path)
+        chunks = [Chunk(title="", content=str(i), mime_type="text/plain", metadata={}) for i in range(n_chunks)]
+        await store.insert_chunks(chunks, corpus)
+        del corpus
+
+        exact, exact_ms = await search(store, queries)
+        print(f"\n{n_chunks} chunks, {dimensions} dimensions, top {TOP_K}")
+        print(f"  {'configuration':<22}{'bytes/chunk':>12}{'open (s)':>11}{'latency (ms)':>14}{'recall':>9}")
+        print(f"  {'float32':<22}{store.search_bytes // n_chunks:>12}{'-':>11}{exact_ms:>14.2f}{1.0:>9.3f}")
+
+        kinds: tuple[QuantizationKind, ...] = ("int8", "pq")
+        for kind in kinds:
+            for rerank_factor in (0, RERANK_FACTOR):
+                start = time.perf_counter()
+                # Opening the store with another quantization trains it and re-encodes every vector
+                store = FlatVectorStore(
+                    db_path, quantization=kind, rerank_factor=rerank_factor, dims_per_subspace=dims_per_subspace
+                )
+                open_seconds = time.perf_counter() - start
+                found, latency = await search(store, queries)
+                recall = np.mean([len(f & e) / len(e) for f, e in zip(found, exact)])
+                name = kind if rerank_factor == 0 else f"{kind} + rerank x{rerank_factor}"
+                print(
+                    f"  {name:<22}{store.search_bytes // n_chunks:>12}{open_seconds:>11.1f}"
+                    f"{latency:>14.2f}{recall:>9.3f}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dimensions", type=int, default=1024)
+    parser.add_argument("--dims-per-subspace", type=int, default=8)
+    args = parser.parse_args()
+    for n_chunks in args.sizes:
+        asyncio.run(run(n_chunks, args.dimensions, args.dims_per_subspace))
+
+
+if __name__ == "__main__":
+    main()
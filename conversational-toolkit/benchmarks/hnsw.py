@@ -0,0 +1,125 @@
+"""
+Benchmark: 'HNSWVectorStore' recall and latency vs. exact search with 'FlatVectorStore'.
+
+Both stores are filled with the same synthetic corpus. The exact top k of 'FlatVectorStore' is the ground truth; for a range of 'ef_search' values the benchmark reports the mean latency of a single-query 'get_chunks_by_embedding' call and recall@k (fraction of the exact top k that HNSW returns). The last rows repeat the measurement with a metadata filter matching 10% of the chunks, which HNSW answers with a filtered graph search.
+
+The corpus is synthetic: unit vectors scattered around random cluster centres, which gives the uneven neighbourhoods of real embeddings. Queries are perturbed corpus vectors.
+
+Usage (from the 'conversational-toolkit' directory):
+    python -m benchmarks.hnsw --size 1000000 --dimensions 128
+
+Building the graph over 1M vectors takes a few minutes on all cores; both stores together need about 'size * dimensions * 8' bytes of RAM and disk.
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.vectorstores.base import VectorStore
+from conversational_toolkit.vectorstores.flat import FlatVectorStore
+from conversational_toolkit.vectorstores.hnsw import HNSWVectorStore
+
+N_CLUSTERS = 1_000
+N_CATEGORIES = 10
+N_QUERIES = 200
+TOP_K = 10
+EF_SEARCH_VALUES = (16, 32, 64, 128, 256, 512)
+INSERT_BATCH = 100_000
+
+
+def make_corpus(n_chunks: int, dimensions: int, rng: np.random.Generator) -> NDArray[np.float32]:
+    centres = rng.standard_normal((N_CLUSTERS, dimensions), dtype=np.float32)
+    vectors = centres[rng.integers(0, N_CLUSTERS, n_chunks)]
+    vectors += rng.standard_normal((n_chunks, dimensions), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(corpus: NDArray[np.float32], rng: np.random.Generator) -> NDArray[np.float32]:
+    queries = corpus[rng.integers(0, corpus.shape[0], N_QUERIES)]
+    return queries + 0.5 * rng.standard_normal(queries.shape, dtype=np.float32) / np.sqrt(corpus.shape[1])
+
+
+async def fill(store: VectorStore, corpus: NDArray[np.float32]) -> float:
+    """Insert the corpus in batches; every chunk's content is its row number, which identifies it across stores."""
+    start = time.perf_counter()
+    for offset in range(0, corpus.shape[0], INSERT_BATCH):
+        batch = corpus[offset : offset + INSERT_BATCH]
+        chunks = [
+            Chunk(title="", content=str(row), mime_type="text/plain", metadata={"category": row % N_CATEGORIES})
+            for row in range(offset, offset + batch.shape[0])
+        ]
+        await store.insert_chunks(chunks, batch)
+    return time.perf_counter() - start
+
+
+async def search(
+    store: VectorStore, queries: NDArray[np.float32], filters: dict[str, Any] | None = None, **kwargs: Any
+) -> tuple[list[set[str]], float]:
+    """Result rows per query and the mean latency per query in milliseconds."""
+    start = time.perf_counter()
+    results = [await store.get_chunks_by_embedding(query, TOP_K, filters, **kwargs) for query in queries]
+    latency = (time.perf_counter() - start) / len(queries) * 1000
+    return [{match.content for match in matches} for matches in results], latency
+
+
+def recall(found: list[set[str]], exact: list[set[str]]) -> float:
+    return float(np.mean([len(f & e) / len(e) for f, e in zip(found, exact)]))
+
+
+async def run(n_chunks: int, dimensions: int, M: int, ef_construction: int) -> None:
+    rng = np.random.default_rng(0)
+    corpus = make_corpus(n_chunks, dimensions, rng)
+    queries = make_queries(corpus, rng)
+    filters = {"category": 3}
+
+    with tempfile.TemporaryDirectory() as flat_path, tempfile.TemporaryDirectory() as hnsw_path:
+        flat = FlatVectorStore(flat_path)
+        await fill(flat, corpus)
+        hnsw = HNSWVectorStore(
+            hnsw_path, M=M, ef_construction=ef_construction, initial_capacity=n_chunks, autosave=False
+        )
+        build_seconds = await fill(hnsw, corpus)
+        del corpus
+
+        start = time.perf_counter()
+        await hnsw.save()
+        save_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        hnsw = HNSWVectorStore(hnsw_path)
+        load_seconds = time.perf_counter() - start
+
+        print(f"\n{n_chunks} chunks, {dimensions} dimensions, top {TOP_K}, M={M}, ef_construction={ef_construction}")
+        print(f"  build {build_seconds:.1f}s, snapshot {save_seconds:.1f}s, load {load_seconds:.1f}s")
+        print(f"  {'search':<28}{'latency (ms)':>14}{'recall':>9}")
+
+        exact, exact_ms = await search(flat, queries)
+        print(f"  {'exact (flat)':<28}{exact_ms:>14.2f}{1.0:>9.3f}")
+        for ef_search in EF_SEARCH_VALUES:
+            found, latency = await search(hnsw, queries, ef_search=ef_search)
+            print(f"  {f'hnsw ef_search={ef_search}':<28}{latency:>14.2f}{recall(found, exact):>9.3f}")
+
+        exact, exact_ms = await search(flat, queries, filters)
+        print(f"  {'exact (flat), 10% filter':<28}{exact_ms:>14.2f}{1.0:>9.3f}")
+        for ef_search in (64, 256):
+            found, latency = await search(hnsw, queries, filters, ef_search=ef_search)
+            print(f"  {f'hnsw ef={ef_search}, 10% filter':<28}{latency:>14.2f}{recall(found, exact):>9.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--dimensions", type=int, default=128)
+    parser.add_argument("--M", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.size, args.dimensions, args.M, args.ef_construction))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Semantic cache for complete agent answers.
+
+'SemanticAnswerCache' stores the final 'AgentAnswer' of a turn under two keys: the embedding of the standalone query and a fingerprint of the IDs of the sources retrieved for it. A later turn is served from the cache when its standalone query is at least 'similarity_threshold' similar (cosine) to a cached one *and* it retrieved exactly the same sources. The fingerprint makes the cache self-invalidating: once the vector store contents change in a way that affects a query, that query retrieves different chunk IDs and misses the cache. 'clear()' drops everything, e.g. after a bulk re-ingestion.
+
+Entries expire after 'ttl_seconds' and the least recently used entry is evicted once 'max_entries' is reached.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+
+from conversational_toolkit.agents.base import AgentAnswer
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.vectorstores.base import ChunkRecord
+
+
+@dataclass
+class _CacheEntry:
+    embedding: NDArray[np.float64]
+    fingerprint: str
+    answer: AgentAnswer
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """
+    LRU + TTL cache of agent answers matched by query similarity and retrieved sources.
+
+    Attributes:
+        embedding_model: Model used to embed standalone queries. Wrapping it in 'CachedEmbeddings' avoids paying for repeated queries twice.
+        similarity_threshold: Minimum cosine similarity between two standalone queries for a cache hit.
+        ttl_seconds: Lifetime of an entry.
+        max_entries: Maximum number of cached answers.
+    """
+
+    def __init__(
+        self,
+        embedding_model: EmbeddingsModel,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 1000,
+    ) -> None:
+        self.embedding_model = embedding_model
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._next_key = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def fingerprint(sources: Sequence[ChunkRecord]) -> str:
+        """Order-insensitive hash of the retrieved source IDs."""
+        return hashlib.sha256("\0".join(sorted(source.id for source in sources)).encode("utf-8")).hexdigest()
+
+    async def embed(self, query: str) -> NDArray[np.float64]:
+        """Embed 'query' and L2-normalise it so that a dot product is the cosine similarity."""
+        embedding = np.asarray(await self.embedding_model.get_embeddings([query]), dtype=np.float64)[0]
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if now - entry.created_at > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+
+    def get(self, embedding: NDArray[np.float64], fingerprint: str) -> AgentAnswer | None:
+        """Return the cached answer of the most similar query with the same source fingerprint, if any."""
+        self._evict_expired(time.monotonic())
+
+        best_key, best_similarity = None, self.similarity_threshold
+        for key, entry in self._entries.items():
+            if entry.fingerprint != fingerprint:
+                continue
+            similarity = float(entry.embedding @ embedding)
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+
+        if best_key is None:
+            return None
+
+        self._entries.move_to_end(best_key)
+        logger.debug(f"Answer cache hit (similarity={best_similarity:.3f})")
+        return self._entries[best_key].answer
+
+    def put(self, embedding: NDArray[np.float64], fingerprint: str, answer: AgentAnswer) -> None:
+        """Cache 'answer', evicting the least recently used entry when full."""
+        now = time.monotonic()
+        self._evict_expired(now)
+        while len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+
+        self._entries[self._next_key] = _CacheEntry(embedding, fingerprint, answer, now)
+        self._next_key += 1
+
+    def clear(self) -> None:
+        """Drop every cached answer, e.g. after the vector store has been rebuilt."""
+        self._entries.clear()
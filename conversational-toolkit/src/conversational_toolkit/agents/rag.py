@@ -1,14 +1,18 @@
 """
 Retrieval-Augmented Generation (RAG) agent.
 
-'RAG' combines document retrieval with language model generation. Before calling the LLM it rewrites the query to be history-independent, optionally expands it into multiple search queries, retrieves relevant chunks from all configured retrievers, merges the ranked results via Reciprocal Rank Fusion, and injects the sources into the LLM prompt using XML tags.
+'RAG' combines document retrieval with language model generation. Before calling the LLM it rewrites the query to be history-independent, optionally expands it into multiple search queries (expansion and HyDE run concurrently, and retrieval for the standalone query starts while they are generated), retrieves relevant chunks from all configured retrievers concurrently, merges the ranked results via Reciprocal Rank Fusion, and injects the sources into the LLM prompt using XML tags.
 """
 
+import asyncio
+import time
 from typing import Any, AsyncGenerator
 
+from conversational_toolkit.agents.answer_cache import SemanticAnswerCache
 from conversational_toolkit.agents.base import Agent, AgentAnswer, QueryWithContext
 from conversational_toolkit.llms.base import LLM, LLMMessage, Roles, MessageContent
 from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.utils.metadata_provider import MetadataProvider
 from conversational_toolkit.utils.retriever import (
     make_query_standalone,
     query_expansion,
@@ -35,6 +39,11 @@ class RAG(Agent):
         utility_llm: A (typically cheaper) LLM used for query rewriting and expansion. Kept separate so a fast model can handle preprocessing while a more capable model handles generation.
         retrievers: One or more retrievers queried in parallel. Their results are merged with Reciprocal Rank Fusion before being passed to the LLM.
         number_query_expansion: Number of additional search queries to generate from the original query. Set to 0 to disable expansion.
+        max_concurrent_retrievals: Maximum number of retrievers running at the same time. Within a retriever, the per-query calls of the default 'retrieve_many' are bounded by 'Retriever.max_concurrent_queries'.
+        retriever_timeout: Seconds after which a retriever is abandoned and contributes no sources. None disables the timeout.
+        speculative_retrieval: Start retrieving for the original query while it is being rewritten. The result is reused if the rewrite leaves the query unchanged and discarded otherwise.
+        early_retrieval: Start retrieving for the standalone query while the expansion and HyDE queries are generated. This hides retrieval latency behind the LLM calls at the cost of a second 'retrieve_many' call per retriever; when False, all queries are sent in one call once they are generated.
+        answer_cache: Optional semantic cache; a hit replays the cached answer instead of calling the LLM.
     """
 
     def __init__(
@@ -46,6 +55,11 @@ class RAG(Agent):
         description: str = "",
         number_query_expansion: int = 0,
         enable_hyde: bool = False,
+        max_concurrent_retrievals: int = 8,
+        retriever_timeout: float | None = 10.0,
+        speculative_retrieval: bool = False,
+        early_retrieval: bool = True,
+        answer_cache: SemanticAnswerCache | None = None,
     ):
         super().__init__(system_prompt, llm, description)
         self.description = description
@@ -54,29 +68,118 @@ class RAG(Agent):
         self.retrievers = retrievers
         self.number_query_expansion = number_query_expansion
         self.enable_hyde = enable_hyde
+        self.max_concurrent_retrievals = max_concurrent_retrievals
+        self.retriever_timeout = retriever_timeout
+        self.speculative_retrieval = speculative_retrieval
+        self.early_retrieval = early_retrieval
+        self.answer_cache = answer_cache
 
-    async def answer_stream(self, query_with_context: QueryWithContext) -> AsyncGenerator[AgentAnswer, None]:  # noqa: PLR0912
-        query = query_with_context.query
-        history = query_with_context.history
+    async def _retrieve(
+        self, retriever: Retriever[Any], queries: list[str], semaphore: asyncio.Semaphore
+    ) -> tuple[list[list[Any]], dict[str, Any]]:
+        """Run one retriever over all queries. Timeouts and errors degrade to an empty result."""
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                retrieved = await asyncio.wait_for(retriever.retrieve_many(queries), timeout=self.retriever_timeout)
+                status = "ok"
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"{type(retriever).__name__} timed out after {self.retriever_timeout}s, skipping its sources"
+                )
+                retrieved, status = [], "timeout"
+            except Exception as e:
+                logger.warning(f"{type(retriever).__name__} failed, skipping its sources: {e}")
+                retrieved, status = [], "error"
+            latency = time.perf_counter() - start
+
+        return retrieved, {"retriever": type(retriever).__name__, "latency_s": round(latency, 4), "status": status}
+
+    async def _retrieve_grid(self, queries: list[str], semaphore: asyncio.Semaphore) -> list[list[list[Any]]]:
+        """Query all retrievers concurrently; returns, per retriever, one result list per query."""
+        if not queries:
+            return [[] for _ in self.retrievers]
+
+        results = await asyncio.gather(
+            *[self._retrieve(retriever, queries, semaphore) for retriever in self.retrievers]
+        )
+        for _, timing in results:
+            MetadataProvider.add_metadata({**timing, "queries": len(queries)})
+        return [retrieved for retrieved, _ in results]
+
+    async def _additional_queries(self, query: str) -> list[str]:
+        """Generate the expansion and HyDE queries for the standalone 'query' concurrently."""
+        expansion_task = (
+            asyncio.create_task(query_expansion(query, self.utility_llm, self.number_query_expansion))
+            if self.number_query_expansion > 0
+            else None
+        )
+        hyde_task = asyncio.create_task(hyde_expansion(query, self.utility_llm)) if self.enable_hyde else None
+
+        tasks = [task for task in (expansion_task, hyde_task) if task is not None]
+        try:
+            # Fails as soon as either generation fails
+            await asyncio.gather(*tasks)
+        finally:
+            # Do not leave the other generation running after a failure or cancellation
+            for task in tasks:
+                task.cancel()
 
-        if len(history) > 0:
-            query = await make_query_standalone(self.utility_llm, history, query)
+        queries: list[str] = []
+        if expansion_task is not None:
+            queries += expansion_task.result()
+        if hyde_task is not None:
+            queries.append(hyde_task.result())
+        return queries
 
-        queries = [query]
+    async def _prepare_and_retrieve(self, query: str, history: list[LLMMessage]) -> tuple[str, list[ChunkRecord]]:
+        """Rewrite the query, generate additional queries and retrieve sources, overlapping the independent steps.
 
-        if self.number_query_expansion > 0:
-            queries_expanded = await query_expansion(query, self.utility_llm, self.number_query_expansion)
-            queries += queries_expanded
+        With 'early_retrieval', retrieval for the standalone query runs while expansion and HyDE are generated; with 'speculative_retrieval' it even starts before the rewrite is done. Otherwise every retriever gets all queries in a single 'retrieve_many' call.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_retrievals)
+        primary: asyncio.Task[list[list[list[Any]]]] | None = None
+        try:
+            if len(history) > 0:
+                if self.speculative_retrieval:
+                    primary = asyncio.create_task(self._retrieve_grid([query], semaphore))
+                standalone = await make_query_standalone(self.utility_llm, history, query)
+                if primary is not None and standalone.strip() != query.strip():
+                    primary.cancel()
+                    primary = None
+                query = standalone
 
-        if self.enable_hyde:
-            hyde_expansion_message = await hyde_expansion(query, self.utility_llm)
-            queries.append(hyde_expansion_message)
+            if primary is None and not self.early_retrieval:
+                grid = await self._retrieve_grid([query, *await self._additional_queries(query)], semaphore)
+                primary_results = [retrieved[:1] for retrieved in grid]
+                extra_results = [retrieved[1:] for retrieved in grid]
+            else:
+                if primary is None:
+                    primary = asyncio.create_task(self._retrieve_grid([query], semaphore))
+                extra_results = await self._retrieve_grid(await self._additional_queries(query), semaphore)
+                primary_results = await primary
+        finally:
+            if primary is not None and not primary.done():
+                primary.cancel()
 
         sources: list[ChunkRecord] = []
-        for retriever in self.retrievers:
-            retrieved = [await retriever.retrieve(q) for q in queries]
+        for retriever, first, rest in zip(self.retrievers, primary_results, extra_results):
+            retrieved = first + rest
             if retrieved:
                 sources += reciprocal_rank_fusion(retrieved)[: retriever.top_k]
+        return query, sources
+
+    async def answer_stream(self, query_with_context: QueryWithContext) -> AsyncGenerator[AgentAnswer, None]:  # noqa: PLR0912
+        history = query_with_context.history
+        query, sources = await self._prepare_and_retrieve(query_with_context.query, history)
+
+        if self.answer_cache is not None:
+            query_embedding = await self.answer_cache.embed(query)
+            fingerprint = self.answer_cache.fingerprint(sources)
+            cached_answer = self.answer_cache.get(query_embedding, fingerprint)
+            if cached_answer is not None:
+                yield cached_answer
+                return
 
         sources_list = []
 
@@ -131,6 +234,7 @@ class RAG(Agent):
         )
 
         content = ""
+        answer = None
         async for response_chunk in response_stream:
             if response_chunk.content:
                 for message_content in response_chunk.content:
@@ -147,3 +251,6 @@ class RAG(Agent):
                 )
                 if answer:
                     yield answer
+
+        if self.answer_cache is not None and answer:
+            self.answer_cache.put(query_embedding, fingerprint, answer)
@@ -1,4 +1,6 @@
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Optional, Union
 
 from fastapi import FastAPI, __version__
@@ -13,6 +15,8 @@ from conversational_toolkit.api.routes.api import create_api_router
 from conversational_toolkit.conversation_database.controller import (
     ConversationalToolkitController,
 )
+from conversational_toolkit.utils.executors import shutdown_executors
+from conversational_toolkit.utils.loop_monitor import EventLoopLagMonitor
 from conversational_toolkit.utils.paths import Paths
 
 # TODO: This should not be in the library. Otherwise we can't mute library logs
@@ -25,6 +29,7 @@ def create_app(
     allow_origins=None,
     dist_path: str = Paths.DIST_FOLDER,
     env: str = os.getenv("ENV", "local"),
+    loop_lag_threshold_ms: float = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100")),
 ) -> FastAPI:
     if auth_provider is None:
         auth_provider = SessionCookieProvider(
@@ -37,7 +42,20 @@ def create_app(
     if allow_origins is None:
         allow_origins = ["http://localhost:3000", "http://localhost:8080"]
 
-    app = FastAPI(docs_url=None)
+    # Logs event-loop stalls (blocking calls inside coroutines) with the blocking stack; 0 disables it
+    loop_monitor = EventLoopLagMonitor(threshold=loop_lag_threshold_ms / 1000) if loop_lag_threshold_ms > 0 else None
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        if loop_monitor is not None:
+            loop_monitor.start()
+        yield
+        if loop_monitor is not None:
+            await loop_monitor.stop()
+        shutdown_executors()
+
+    app = FastAPI(docs_url=None, lifespan=lifespan)
+    app.state.loop_monitor = loop_monitor
 
     app.add_middleware(
         CORSMiddleware,  # type: ignore
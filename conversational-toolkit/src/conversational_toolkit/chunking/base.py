@@ -48,3 +48,7 @@ class Chunker(ABC):
     def make_chunks(self, *args: Any, **kwargs: Any) -> list[Chunk]:
         """Parse the source file and return a list of 'Chunk' objects."""
         pass
+
+    def warm_up(self, *args: Any, **kwargs: Any) -> None:
+        """Load models or converters ahead of the first 'make_chunks' call (same arguments, minus the file). No-op by default."""
+        return None
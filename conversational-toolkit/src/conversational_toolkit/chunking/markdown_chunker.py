@@ -17,3 +17,12 @@ class MarkdownChunker(PDFChunker):
         image_path: str | None = None,
     ) -> str:
         return Path(file_path).read_text(encoding="utf-8")
+
+    def warm_up(
+        self,
+        engine: MarkdownConverterEngine = MarkdownConverterEngine.DOCLING,
+        write_images: bool = False,
+        image_path: str | None = None,
+    ) -> None:
+        """Nothing to load: the file is read as is."""
+        return None
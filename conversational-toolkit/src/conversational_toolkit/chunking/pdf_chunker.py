@@ -3,6 +3,7 @@ import shutil
 import io
 import base64
 import re
+import tempfile
 from enum import StrEnum
 
 from docling.document_converter import DocumentConverter
@@ -11,6 +12,8 @@ from docling.datamodel.pipeline_options import PdfPipelineOptions
 from docling.document_converter import PdfFormatOption
 from docling_core.types.doc.document import PictureItem
 from pathlib import Path
+from typing import Any
+
 from markitdown import MarkItDown  # type: ignore[import-untyped]
 from PIL import Image  # type: ignore[import-untyped]
 
@@ -26,6 +29,40 @@ class PDFChunker(Chunker):
     # TODO: Improve by not creating temporary files for images and support more image formats
     # TODO: Currently resizing, maybe not desired.
 
+    def __init__(self) -> None:
+        # Docling loads its layout and table models when a converter is built; keep one per configuration
+        self._docling_converters: dict[bool, DocumentConverter] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Converters hold loaded models and are not picklable; worker processes build their own
+        state = self.__dict__.copy()
+        state["_docling_converters"] = {}
+        return state
+
+    def _docling_converter(self, generate_picture_images: bool) -> DocumentConverter:
+        converter = self._docling_converters.get(generate_picture_images)
+        if converter is None:
+            if generate_picture_images:
+                pipeline_options = PdfPipelineOptions()
+                pipeline_options.generate_picture_images = True
+                converter = DocumentConverter(
+                    format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+                )
+            else:
+                converter = DocumentConverter()
+            self._docling_converters[generate_picture_images] = converter
+        return converter
+
+    def warm_up(
+        self,
+        engine: MarkdownConverterEngine = MarkdownConverterEngine.DOCLING,
+        write_images: bool = True,
+        image_path: str | None = None,
+    ) -> None:
+        """Build the converter 'make_chunks' will use and load its models."""
+        if engine == MarkdownConverterEngine.DOCLING:
+            self._docling_converter(write_images).initialize_pipeline(InputFormat.PDF)
+
     def _pdf2markdown(
         self,
         file_path: str,
@@ -40,13 +77,7 @@ class PDFChunker(Chunker):
             return str(result.text_content)
         elif engine == MarkdownConverterEngine.DOCLING:
             if write_images and image_path:
-                pipeline_options = PdfPipelineOptions()
-                pipeline_options.generate_picture_images = True
-
-                doc_converter = DocumentConverter(
-                    format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
-                )
-                conv_result = doc_converter.convert(file_path)
+                conv_result = self._docling_converter(generate_picture_images=True).convert(file_path)
 
                 # Manually save images from PictureItem elements
                 doc_filename = Path(file_path).stem
@@ -60,7 +91,8 @@ class PDFChunker(Chunker):
 
                 return conv_result.document.export_to_markdown()  # type: ignore[no-any-return]
             else:
-                return DocumentConverter().convert(file_path).document.export_to_markdown()  # type: ignore[no-any-return]
+                conv_result = self._docling_converter(generate_picture_images=False).convert(file_path)
+                return conv_result.document.export_to_markdown()  # type: ignore[no-any-return]
         else:
             raise NotImplementedError(f"Engine '{engine}' is not supported.")
 
@@ -74,11 +106,24 @@ class PDFChunker(Chunker):
         file_path: str,
         engine: MarkdownConverterEngine = MarkdownConverterEngine.DOCLING,
         write_images: bool = True,
-        image_path: str | None = "./tmp",
+        image_path: str | None = None,
     ) -> list[Chunk]:
-        if not os.path.exists(image_path):
+        # Without an explicit path, images go to a private directory so that concurrent calls never mix them up
+        owns_image_path = write_images and image_path is None
+        if owns_image_path:
+            image_path = tempfile.mkdtemp(prefix="pdf_images_")
+        elif image_path is not None and not os.path.exists(image_path):
             os.makedirs(image_path)
-        markdown = self._pdf2markdown(file_path, engine, write_images=write_images, image_path=image_path)
+        try:
+            markdown = self._pdf2markdown(file_path, engine, write_images=write_images, image_path=image_path)
+            return self._split_markdown(markdown, image_path if write_images else None)
+        finally:
+            # The early return for documents without headers and errors skip the cleanup in '_split_markdown'
+            if owns_image_path and image_path is not None:
+                shutil.rmtree(image_path, ignore_errors=True)
+
+    def _split_markdown(self, markdown: str, image_path: str | None) -> list[Chunk]:
+        """One chunk per header section, plus one chunk per image written to 'image_path' (which is then removed)."""
         header_pattern = re.compile(r"^(#{1,6}\s.*)$", re.MULTILINE)
         matches = list(header_pattern.finditer(markdown))
 
@@ -121,7 +166,7 @@ class PDFChunker(Chunker):
             )
             chunks.append(chunk)
 
-        if write_images and image_path:
+        if image_path:
             for file_name in os.listdir(image_path):
                 extension = os.path.splitext(file_name)[1].lower()
                 if extension in [".png", ".jpg", ".jpeg", ".gif"]:
@@ -139,7 +184,7 @@ class PDFChunker(Chunker):
                     )
                     chunks.append(image_chunk)
 
-        if write_images and image_path:
+        if image_path:
             shutil.rmtree(image_path)
 
         return chunks
@@ -1,7 +1,7 @@
 """
 Conversational toolkit controller (Facade).
 
-'ConversationalToolkitController' is the single entry point for all application logic. It coordinates five pluggable database repositories and an agent to handle the full lifecycle of a conversation turn: user registration, conversation and thread management, agent invocation, streaming, and persistence of messages, sources, and reactions.
+'ConversationalToolkitController' is the single entry point for all application logic. It coordinates five pluggable database repositories (plus a 'ConversationUnitOfWork' for writes that span several of them) and an agent to handle the full lifecycle of a conversation turn: user registration, conversation and thread management, agent invocation, streaming, and persistence of messages, sources, and reactions.
 
 The two public entry points for message processing are:
 
@@ -11,6 +11,7 @@ The two public entry points for message processing are:
 'ClientMessage' extends 'Message' with the API-response fields ('sources', 'reaction', 'follow_up_questions') that the frontend needs but that are not stored directly on the message record.
 """
 
+import asyncio
 import json
 from collections.abc import AsyncGenerator, Sequence
 from typing import Any
@@ -22,6 +23,10 @@ from conversational_toolkit.conversation_database.data_models.conversation impor
 from conversational_toolkit.conversation_database.data_models.message import Message, MessageDatabase
 from conversational_toolkit.conversation_database.data_models.reaction import Reaction, ReactionDatabase
 from conversational_toolkit.conversation_database.data_models.source import Source, SourceDatabase
+from conversational_toolkit.conversation_database.data_models.unit_of_work import (
+    ConversationUnitOfWork,
+    RepositoryUnitOfWork,
+)
 from conversational_toolkit.conversation_database.data_models.user import User, UserDatabase
 from conversational_toolkit.llms.base import LLMMessage, Roles, MessageContent
 from conversational_toolkit.utils.database import generate_uid
@@ -70,6 +75,7 @@ class ConversationalToolkitController:
         source_db: SourceDatabase,
         user_db: UserDatabase,
         agent: Agent,
+        unit_of_work: ConversationUnitOfWork | None = None,
     ):
         self.conversation_db = conversation_db
         self.message_db = message_db
@@ -77,6 +83,8 @@ class ConversationalToolkitController:
         self.source_db = source_db
         self.user_db = user_db
         self.agent = agent
+        # Writes that span several repositories; pass a backend-specific one (e.g. 'PostgreSQLUnitOfWork') for single transactions
+        self.unit_of_work = unit_of_work or RepositoryUnitOfWork(conversation_db, message_db, source_db, reaction_db)
 
     async def get_user_by_id(self, user_id: str) -> User | None:
         return await self.user_db.get_user_by_id(user_id)
@@ -180,38 +188,34 @@ class ConversationalToolkitController:
             if last_chunk is None:
                 return
 
-            final_message = await self.message_db.create_message(
-                Message(
-                    id=generate_uid(),
+            final_message_id = generate_uid()
+            final_content = chunk.content[0].text if chunk.content else ""
+            # The message, its sources and the conversation update are written as one unit of work
+            final_message, sources = await self.unit_of_work.save_answer(
+                conversation=Conversation(
+                    id=conversation.id,
+                    user_id=conversation.user_id,
+                    create_timestamp=conversation.create_timestamp,
+                    update_timestamp=get_current_timestamp(),
+                    title=final_content[:40] if user_input.conversation_id is None else conversation.title,
+                ),
+                message=Message(
+                    id=final_message_id,
                     user_id=None,
                     conversation_id=conversation.id,
-                    content=chunk.content[0].text if chunk.content else "",
+                    content=final_content,
                     role=Roles.ASSISTANT,
                     create_timestamp=get_current_timestamp(),
                     metadata=MetadataProvider.get_metadata(),
                     parent_id=input_message.id,
-                )
-            )
-
-            sources = [
-                await self.source_db.create_source(
+                ),
+                sources=[
                     Source(
-                        id=generate_uid(), message_id=final_message.id, content=source.content, metadata=source.metadata
-                    )
-                )
-                for source in last_chunk.sources
-            ]
-
-            if user_input.conversation_id is None:
-                await self.conversation_db.update_conversation(
-                    conversation=Conversation(
-                        id=conversation.id,
-                        user_id=user_id,
-                        create_timestamp=conversation.create_timestamp,
-                        update_timestamp=get_current_timestamp(),
-                        title=final_message.content[:40],
+                        id=generate_uid(), message_id=final_message_id, content=source.content, metadata=source.metadata
                     )
-                )
+                    for source in last_chunk.sources
+                ],
+            )
 
             yield ClientMessage(
                 id=final_message.id,
@@ -232,6 +236,7 @@ class ConversationalToolkitController:
     async def get_conversation_by_id(self, conversation_id: str) -> ClientConversation:
         conversation = await self.conversation_db.get_conversation_by_id(conversation_id)
         messages = await self.message_db.get_messages_by_conversation_id(conversation_id)
+        sources_by_message = await self.source_db.get_sources_by_message_ids([message.id for message in messages])
         api_messages = [
             ClientMessage(
                 id=message.id,
@@ -239,7 +244,7 @@ class ConversationalToolkitController:
                 conversation_id=message.conversation_id,
                 content=message.content,
                 role=message.role,
-                sources=await self.source_db.get_sources_by_message_id(message.id),
+                sources=sources_by_message[message.id],
                 reaction=None,
                 follow_up_questions=[],
                 parent_id=message.parent_id,
@@ -274,25 +279,21 @@ class ConversationalToolkitController:
         )
 
     async def delete_conversation(self, conversation_id: str) -> bool:
-        messages = await self.message_db.get_messages_by_conversation_id(conversation_id)
-        for message in messages:
-            sources = await self.source_db.get_sources_by_message_id(message_id=message.id)
-            await self.source_db.delete_sources([source.id for source in sources])
-
-            reactions = await self.reaction_db.get_reactions_by_message_id(message_id=message.id)
-            await self.reaction_db.delete_reactions([reaction.id for reaction in reactions])
-
-            await self.message_db.delete_message(message.id)
-
-        return await self.conversation_db.delete_conversation(conversation_id)
+        return await self.unit_of_work.delete_conversation(conversation_id)
 
     async def get_messages_by_conversation_id(self, conversation_id: str) -> list[ClientMessage]:
         messages = await self.message_db.get_messages_by_conversation_id(conversation_id)
+        message_ids = [message.id for message in messages]
+        # One query per repository for the whole conversation instead of two per message
+        reactions_by_message, sources_by_message = await asyncio.gather(
+            self.reaction_db.get_reactions_by_message_ids(message_ids),
+            self.source_db.get_sources_by_message_ids(message_ids),
+        )
         api_messages = []
         for message in messages:
-            reactions = await self.reaction_db.get_reactions_by_message_id(message.id)
+            reactions = reactions_by_message[message.id]
             api_reaction = reactions[0].content if reactions else None
-            sources = await self.source_db.get_sources_by_message_id(message.id)
+            sources = sources_by_message[message.id]
             api_message = ClientMessage(
                 id=message.id,
                 user_id=message.user_id,
@@ -58,3 +58,9 @@ class MessageDatabase(ABC):
     @abstractmethod
     async def delete_message(self, message_id: str) -> bool:
         pass
+
+    async def delete_messages_by_conversation_id(self, conversation_id: str) -> bool:
+        """Delete every message of a conversation. The default deletes them one by one."""
+        for message in await self.get_messages_by_conversation_id(conversation_id):
+            await self.delete_message(message.id)
+        return True
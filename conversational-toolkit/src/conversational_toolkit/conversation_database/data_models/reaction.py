@@ -34,6 +34,21 @@ class ReactionDatabase(ABC):
     async def get_reactions_by_message_id(self, message_id: str) -> list[Reaction]:
         pass
 
+    async def get_reactions_by_message_ids(self, message_ids: list[str]) -> dict[str, list[Reaction]]:
+        """
+        Reactions of several messages, keyed by message ID (every requested ID is present).
+
+        The default issues one 'get_reactions_by_message_id' call per message; backends override it with a single query.
+        """
+        return {message_id: await self.get_reactions_by_message_id(message_id) for message_id in message_ids}
+
     @abstractmethod
     async def delete_reactions(self, reaction_ids: list[str]) -> bool:
         pass
+
+    async def delete_reactions_by_message_ids(self, message_ids: list[str]) -> bool:
+        """Delete every reaction attached to one of 'message_ids'."""
+        reactions_by_message = await self.get_reactions_by_message_ids(message_ids)
+        return await self.delete_reactions(
+            [reaction.id for reactions in reactions_by_message.values() for reaction in reactions]
+        )
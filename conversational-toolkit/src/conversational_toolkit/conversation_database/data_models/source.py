@@ -29,10 +29,27 @@ class SourceDatabase(ABC):
     async def create_source(self, source: Source) -> Source:
         pass
 
+    async def create_sources(self, sources: list[Source]) -> list[Source]:
+        """Create several sources. The default creates them one by one; backends override it with a bulk insert."""
+        return [await self.create_source(source) for source in sources]
+
     @abstractmethod
     async def get_sources_by_message_id(self, message_id: str) -> list[Source]:
         pass
 
+    async def get_sources_by_message_ids(self, message_ids: list[str]) -> dict[str, list[Source]]:
+        """
+        Sources of several messages, keyed by message ID (every requested ID is present).
+
+        The default issues one 'get_sources_by_message_id' call per message; backends override it with a single query.
+        """
+        return {message_id: await self.get_sources_by_message_id(message_id) for message_id in message_ids}
+
     @abstractmethod
     async def delete_sources(self, source_ids: list[str]) -> bool:
         pass
+
+    async def delete_sources_by_message_ids(self, message_ids: list[str]) -> bool:
+        """Delete every source attached to one of 'message_ids'."""
+        sources_by_message = await self.get_sources_by_message_ids(message_ids)
+        return await self.delete_sources([source.id for sources in sources_by_message.values() for source in sources])
@@ -0,0 +1,72 @@
+"""
+Unit-of-work interface for writes that span several repositories.
+
+Each repository ('ConversationDatabase', 'MessageDatabase', ...) only knows its own records. Operations that must touch several of them together go through a 'ConversationUnitOfWork', which owns the repositories it needs and is passed to the controller. 'RepositoryUnitOfWork' works with any combination of backends by issuing one call per repository; backends whose repositories share a database provide an implementation that runs the whole operation in one transaction.
+
+Concrete implementations: 'RepositoryUnitOfWork', 'PostgreSQLUnitOfWork'.
+"""
+
+from abc import ABC, abstractmethod
+
+from conversational_toolkit.conversation_database.data_models.conversation import Conversation, ConversationDatabase
+from conversational_toolkit.conversation_database.data_models.message import Message, MessageDatabase
+from conversational_toolkit.conversation_database.data_models.reaction import ReactionDatabase
+from conversational_toolkit.conversation_database.data_models.source import Source, SourceDatabase
+
+
+class ConversationUnitOfWork(ABC):
+    """Abstract multi-repository operations of the controller."""
+
+    @abstractmethod
+    async def save_answer(
+        self, conversation: Conversation, message: Message, sources: list[Source]
+    ) -> tuple[Message, list[Source]]:
+        """Store the end of a turn: the answer 'message', its 'sources' and the updated 'conversation'."""
+        pass
+
+    @abstractmethod
+    async def delete_conversation(self, conversation_id: str) -> bool:
+        """Delete a conversation together with its messages and their sources and reactions."""
+        pass
+
+
+class RepositoryUnitOfWork(ConversationUnitOfWork):
+    """
+    Unit of work that issues one call per repository, for backends without shared transactions.
+
+    Attributes:
+        conversation_db: Repository of the conversations.
+        message_db: Repository of the messages.
+        source_db: Repository of the sources.
+        reaction_db: Repository of the reactions.
+    """
+
+    def __init__(
+        self,
+        conversation_db: ConversationDatabase,
+        message_db: MessageDatabase,
+        source_db: SourceDatabase,
+        reaction_db: ReactionDatabase,
+    ) -> None:
+        self.conversation_db = conversation_db
+        self.message_db = message_db
+        self.source_db = source_db
+        self.reaction_db = reaction_db
+
+    async def save_answer(
+        self, conversation: Conversation, message: Message, sources: list[Source]
+    ) -> tuple[Message, list[Source]]:
+        """Create the message, then its sources, then update the conversation."""
+        message = await self.message_db.create_message(message)
+        sources = await self.source_db.create_sources(sources)
+        await self.conversation_db.update_conversation(conversation)
+        return message, sources
+
+    async def delete_conversation(self, conversation_id: str) -> bool:
+        """Delete the children first, with one bulk delete per repository, then the conversation."""
+        messages = await self.message_db.get_messages_by_conversation_id(conversation_id)
+        message_ids = [message.id for message in messages]
+        await self.source_db.delete_sources_by_message_ids(message_ids)
+        await self.reaction_db.delete_reactions_by_message_ids(message_ids)
+        await self.message_db.delete_messages_by_conversation_id(conversation_id)
+        return await self.conversation_db.delete_conversation(conversation_id)
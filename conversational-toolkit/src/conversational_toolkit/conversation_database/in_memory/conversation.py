@@ -1,49 +1,38 @@
-import json
-
 from loguru import logger
 
 from conversational_toolkit.conversation_database.data_models.conversation import (
     ConversationDatabase,
     Conversation,
 )
+from conversational_toolkit.conversation_database.in_memory.index import SecondaryIndex
+from conversational_toolkit.conversation_database.in_memory.storage import JsonRecordStore
 from conversational_toolkit.utils.database import generate_uid
 
 
 class InMemoryConversationDatabase(ConversationDatabase):
-    def __init__(self, json_file_path: str):
+    def __init__(self, json_file_path: str, write_ahead_log: bool = False):
         self.json_file_path = json_file_path
-        self.conversations: dict[str, Conversation] = {}
-        self._load()
-
-    def _load(self) -> None:
-        try:
-            with open(self.json_file_path, "r") as f:
-                data = json.load(f)
-                self.conversations = {k: Conversation(**v) for k, v in data.items()}
-        except FileNotFoundError:
-            self._save()
+        self._store = JsonRecordStore(json_file_path, Conversation, write_ahead_log=write_ahead_log)
+        self.conversations: dict[str, Conversation] = self._store.load()
+        self._ids_by_user = SecondaryIndex[Conversation](
+            lambda conversation: conversation.user_id, self.conversations.values()
+        )
 
-    def _save(self) -> None:
-        with open(self.json_file_path, "w") as f:
-            json.dump(
-                {
-                    conversation_id: conversation.model_dump()
-                    for conversation_id, conversation in self.conversations.items()
-                },
-                f,
-                indent=4,
-            )
+    def close(self) -> None:
+        """Flush the write-ahead log, if any."""
+        self._store.close()
 
     async def create_conversation(self, conversation: Conversation) -> Conversation:
         if not conversation.id:
             conversation.id = generate_uid()
+        self._ids_by_user.replace(self.conversations.get(conversation.id), conversation)
         self.conversations[conversation.id] = conversation
-        self._save()
+        await self._store.put_async(conversation.id, conversation)
         logger.debug(f"Created conversation: {conversation}")
         return conversation
 
     async def get_conversations_by_user_id(self, user_id: str) -> list[Conversation]:
-        return [conv for conv in self.conversations.values() if conv.user_id == user_id]
+        return [self.conversations[conversation_id] for conversation_id in self._ids_by_user.get(user_id)]
 
     async def get_conversation_by_id(self, conversation_id: str) -> Conversation:
         conversation = self.conversations.get(conversation_id)
@@ -57,15 +46,16 @@ class InMemoryConversationDatabase(ConversationDatabase):
     ) -> Conversation:
         if self.conversations.get(conversation.id) is None:
             raise ValueError(f"Conversation with id {conversation.id} not found")
+        self._ids_by_user.replace(self.conversations.get(conversation.id), conversation)
         self.conversations[conversation.id] = conversation
-        self._save()
+        await self._store.put_async(conversation.id, conversation)
         logger.debug(f"Updated conversation: {conversation}")
         return conversation
 
     async def delete_conversation(self, conversation_id: str) -> bool:
         if conversation_id in self.conversations:
-            del self.conversations[conversation_id]
-            self._save()
+            self._ids_by_user.remove(self.conversations.pop(conversation_id))
+            await self._store.delete_async([conversation_id])
             logger.debug(f"Deleted conversation: {conversation_id}")
             return True
         return False
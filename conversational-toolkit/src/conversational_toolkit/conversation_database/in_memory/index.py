@@ -0,0 +1,58 @@
+"""
+Secondary indexes for the in-memory conversation databases.
+
+'SecondaryIndex' maps a foreign key (e.g. a message's 'conversation_id') to the IDs of the records carrying it, so that lookups such as "all messages of a conversation" cost O(result size) instead of a scan over every stored record. Repositories keep it in step with their '{id: record}' dictionary on every create, update and delete.
+"""
+
+from collections.abc import Callable, Iterable
+from typing import Generic, Protocol, TypeVar
+
+
+class _Record(Protocol):
+    id: str
+
+
+RecordT = TypeVar("RecordT", bound=_Record)
+
+
+class SecondaryIndex(Generic[RecordT]):
+    """
+    'key -> record IDs' map over the records of one repository.
+
+    IDs are kept in insertion order, like the records of the primary dictionary.
+
+    Attributes:
+        key: Function extracting the indexed field from a record. Records for which it returns None are not indexed.
+    """
+
+    def __init__(self, key: Callable[[RecordT], str | None], records: Iterable[RecordT] = ()) -> None:
+        self.key = key
+        self._ids_by_key: dict[str, dict[str, None]] = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record: RecordT) -> None:
+        """Index a stored record."""
+        key = self.key(record)
+        if key is not None:
+            self._ids_by_key.setdefault(key, {})[record.id] = None
+
+    def remove(self, record: RecordT) -> None:
+        """Forget a record that is being deleted or replaced."""
+        key = self.key(record)
+        if key is None or key not in self._ids_by_key:
+            return
+        ids = self._ids_by_key[key]
+        ids.pop(record.id, None)
+        if not ids:
+            del self._ids_by_key[key]
+
+    def replace(self, old: RecordT | None, new: RecordT) -> None:
+        """Re-index a record that is created or updated in place of 'old'."""
+        if old is not None and self.key(old) != self.key(new):
+            self.remove(old)
+        self.add(new)
+
+    def get(self, key: str) -> list[str]:
+        """IDs of the records whose indexed field equals 'key'."""
+        return list(self._ids_by_key.get(key, ()))
@@ -1,28 +1,23 @@
-import json
-
 from loguru import logger
 
 from conversational_toolkit.conversation_database.data_models.message import MessageDatabase, Message
+from conversational_toolkit.conversation_database.in_memory.index import SecondaryIndex
+from conversational_toolkit.conversation_database.in_memory.storage import JsonRecordStore
 from conversational_toolkit.utils.database import generate_uid
 
 
 class InMemoryMessageDatabase(MessageDatabase):
-    def __init__(self, json_file_path: str):
+    def __init__(self, json_file_path: str, write_ahead_log: bool = False):
         self.json_file_path = json_file_path
-        self.messages: dict[str, Message] = {}
-        self._load()
-
-    def _load(self) -> None:
-        try:
-            with open(self.json_file_path, "r") as f:
-                data = json.load(f)
-                self.messages = {k: Message(**v) for k, v in data.items()}
-        except FileNotFoundError:
-            self._save()
+        self._store = JsonRecordStore(json_file_path, Message, write_ahead_log=write_ahead_log)
+        self.messages: dict[str, Message] = self._store.load()
+        self._ids_by_conversation = SecondaryIndex[Message](
+            lambda message: message.conversation_id, self.messages.values()
+        )
 
-    def _save(self) -> None:
-        with open(self.json_file_path, "w") as f:
-            json.dump({message_id: message.model_dump() for message_id, message in self.messages.items()}, f, indent=4)
+    def close(self) -> None:
+        """Flush the write-ahead log, if any."""
+        self._store.close()
 
     async def create_message(
         self,
@@ -30,13 +25,14 @@ class InMemoryMessageDatabase(MessageDatabase):
     ) -> Message:
         if not message.id:
             message.id = generate_uid()
+        self._ids_by_conversation.replace(self.messages.get(message.id), message)
         self.messages[message.id] = message
-        self._save()
+        await self._store.put_async(message.id, message)
         logger.debug(f"Created message: {message}")
         return message
 
     async def get_messages_by_conversation_id(self, conversation_id: str) -> list[Message]:
-        return [msg for msg in self.messages.values() if msg.conversation_id == conversation_id]
+        return [self.messages[message_id] for message_id in self._ids_by_conversation.get(conversation_id)]
 
     async def get_message_by_id(self, message_id: str) -> Message:
         message = self.messages.get(message_id)
@@ -46,8 +42,16 @@ class InMemoryMessageDatabase(MessageDatabase):
 
     async def delete_message(self, message_id: str) -> bool:
         if message_id in self.messages:
-            del self.messages[message_id]
-            self._save()
+            self._ids_by_conversation.remove(self.messages.pop(message_id))
+            await self._store.delete_async([message_id])
             logger.debug(f"Deleted message: {message_id}")
             return True
         return False
+
+    async def delete_messages_by_conversation_id(self, conversation_id: str) -> bool:
+        message_ids = self._ids_by_conversation.get(conversation_id)
+        for message_id in message_ids:
+            self._ids_by_conversation.remove(self.messages.pop(message_id))
+        await self._store.delete_async(message_ids)
+        logger.debug(f"Deleted {len(message_ids)} messages of conversation: {conversation_id}")
+        return True
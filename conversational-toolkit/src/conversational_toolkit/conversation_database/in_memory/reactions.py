@@ -1,46 +1,54 @@
-import json
-
 from loguru import logger
 
 from conversational_toolkit.conversation_database.data_models.reaction import ReactionDatabase, Reaction
+from conversational_toolkit.conversation_database.in_memory.index import SecondaryIndex
+from conversational_toolkit.conversation_database.in_memory.storage import JsonRecordStore
 from conversational_toolkit.utils.database import generate_uid
 
 
 class InMemoryReactionDatabase(ReactionDatabase):
-    def __init__(self, json_file_path: str):
+    def __init__(self, json_file_path: str, write_ahead_log: bool = False):
         self.json_file_path = json_file_path
-        self.reactions: dict[str, Reaction] = {}
-        self._load()
-
-    def _load(self) -> None:
-        try:
-            with open(self.json_file_path, "r") as f:
-                data = json.load(f)
-                self.reactions = {k: Reaction(**v) for k, v in data.items()}
-        except FileNotFoundError:
-            self._save()
-
-    def _save(self) -> None:
-        with open(self.json_file_path, "w") as f:
-            json.dump(
-                {reaction_id: reaction.model_dump() for reaction_id, reaction in self.reactions.items()}, f, indent=4
-            )
+        self._store = JsonRecordStore(json_file_path, Reaction, write_ahead_log=write_ahead_log)
+        self.reactions: dict[str, Reaction] = self._store.load()
+        self._ids_by_message = SecondaryIndex[Reaction](lambda reaction: reaction.message_id, self.reactions.values())
+
+    def close(self) -> None:
+        """Flush the write-ahead log, if any."""
+        self._store.close()
 
     async def create_reaction(self, reaction: Reaction) -> Reaction:
         if not reaction.id:
             reaction.id = generate_uid()
+        self._ids_by_message.replace(self.reactions.get(reaction.id), reaction)
         self.reactions[reaction.id] = reaction
-        self._save()
+        await self._store.put_async(reaction.id, reaction)
         logger.debug(f"Created reaction: {reaction}")
         return reaction
 
     async def get_reactions_by_message_id(self, message_id: str) -> list[Reaction]:
-        return [react for react in self.reactions.values() if react.message_id == message_id]
+        return [self.reactions[reaction_id] for reaction_id in self._ids_by_message.get(message_id)]
+
+    async def get_reactions_by_message_ids(self, message_ids: list[str]) -> dict[str, list[Reaction]]:
+        return {
+            message_id: [self.reactions[record_id] for record_id in self._ids_by_message.get(message_id)]
+            for message_id in message_ids
+        }
 
     async def delete_reactions(self, reaction_ids: list[str]) -> bool:
         for reaction_id in reaction_ids:
             if reaction_id in self.reactions:
-                del self.reactions[reaction_id]
-        self._save()
+                self._ids_by_message.remove(self.reactions.pop(reaction_id))
+        await self._store.delete_async(reaction_ids)
         logger.debug(f"Deleted reactions: {reaction_ids}")
         return True
+
+    async def delete_reactions_by_message_ids(self, message_ids: list[str]) -> bool:
+        reaction_ids = [
+            reaction_id for message_id in message_ids for reaction_id in self._ids_by_message.get(message_id)
+        ]
+        for reaction_id in reaction_ids:
+            self._ids_by_message.remove(self.reactions.pop(reaction_id))
+        await self._store.delete_async(reaction_ids)
+        logger.debug(f"Deleted {len(reaction_ids)} reactions of messages: {message_ids}")
+        return True
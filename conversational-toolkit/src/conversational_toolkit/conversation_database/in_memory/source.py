@@ -1,44 +1,62 @@
-import json
-
 from loguru import logger
 
 from conversational_toolkit.conversation_database.data_models.source import SourceDatabase, Source
+from conversational_toolkit.conversation_database.in_memory.index import SecondaryIndex
+from conversational_toolkit.conversation_database.in_memory.storage import JsonRecordStore
 from conversational_toolkit.utils.database import generate_uid
 
 
 class InMemorySourceDatabase(SourceDatabase):
-    def __init__(self, json_file_path: str):
+    def __init__(self, json_file_path: str, write_ahead_log: bool = False):
         self.json_file_path = json_file_path
-        self.sources: dict[str, Source] = {}
-        self._load()
-
-    def _load(self) -> None:
-        try:
-            with open(self.json_file_path, "r") as f:
-                data = json.load(f)
-                self.sources = {k: Source(**v) for k, v in data.items()}
-        except FileNotFoundError:
-            self._save()
+        self._store = JsonRecordStore(json_file_path, Source, write_ahead_log=write_ahead_log)
+        self.sources: dict[str, Source] = self._store.load()
+        self._ids_by_message = SecondaryIndex[Source](lambda source: source.message_id, self.sources.values())
 
-    def _save(self) -> None:
-        with open(self.json_file_path, "w") as f:
-            json.dump({source_id: source.model_dump() for source_id, source in self.sources.items()}, f, indent=4)
+    def close(self) -> None:
+        """Flush the write-ahead log, if any."""
+        self._store.close()
 
     async def create_source(self, source: Source) -> Source:
         if not source.id:
             source.id = generate_uid()
+        self._ids_by_message.replace(self.sources.get(source.id), source)
         self.sources[source.id] = source
-        self._save()
+        await self._store.put_async(source.id, source)
         logger.debug(f"Created source: {source}")
         return source
 
+    async def create_sources(self, sources: list[Source]) -> list[Source]:
+        for source in sources:
+            if not source.id:
+                source.id = generate_uid()
+            self._ids_by_message.replace(self.sources.get(source.id), source)
+            self.sources[source.id] = source
+        await self._store.put_many_async({source.id: source for source in sources})
+        logger.debug(f"Created {len(sources)} sources")
+        return sources
+
     async def get_sources_by_message_id(self, message_id: str) -> list[Source]:
-        return [src for src in self.sources.values() if src.message_id == message_id]
+        return [self.sources[source_id] for source_id in self._ids_by_message.get(message_id)]
+
+    async def get_sources_by_message_ids(self, message_ids: list[str]) -> dict[str, list[Source]]:
+        return {
+            message_id: [self.sources[record_id] for record_id in self._ids_by_message.get(message_id)]
+            for message_id in message_ids
+        }
 
     async def delete_sources(self, source_ids: list[str]) -> bool:
         for source_id in source_ids:
             if source_id in self.sources:
-                del self.sources[source_id]
-        self._save()
+                self._ids_by_message.remove(self.sources.pop(source_id))
+        await self._store.delete_async(source_ids)
         logger.debug(f"Deleted sources: {source_ids}")
         return True
+
+    async def delete_sources_by_message_ids(self, message_ids: list[str]) -> bool:
+        source_ids = [source_id for message_id in message_ids for source_id in self._ids_by_message.get(message_id)]
+        for source_id in source_ids:
+            self._ids_by_message.remove(self.sources.pop(source_id))
+        await self._store.delete_async(source_ids)
+        logger.debug(f"Deleted {len(source_ids)} sources of messages: {message_ids}")
+        return True
@@ -0,0 +1,283 @@
+"""
+File persistence shared by the in-memory conversation databases.
+
+'JsonRecordStore' owns the '{id: record}' dictionary of one in-memory repository and persists it in one of two modes:
+
+- snapshot (default): every mutation rewrites the whole JSON file, as the repositories always did. Simple, but the cost of a write grows with the total history.
+- write-ahead log ('write_ahead_log=True'): every mutation is appended as one JSON line to '<json_file_path>.wal'. At startup the snapshot is loaded and the log replayed on top of it. A background thread fsyncs the log in batches (every 'fsync_interval' seconds).
+
+The log is compacted once it holds 'compact_min_entries' entries and 'compact_interval' seconds have passed since the last compaction. The check runs on the thread that appends (the event loop), which also owns 'records': it dumps the records to plain dictionaries and, holding the lock only for that, rotates the log to '<json_file_path>.wal.compacting' and opens a fresh one. The background thread then writes the dump as the new snapshot and deletes the rotated segment, while new entries keep going to the fresh log. At startup a leftover segment (a crash mid-compaction) is replayed before the log and folded into the snapshot.
+
+The repositories persist through the async 'put_async' / 'put_many_async' / 'delete_async'. In snapshot mode the records are dumped to plain dictionaries on the loop, and the JSON encoding and file rewrite run in the shared thread pool ('run_in_thread'), so they do not stall the event loop; each rewrite carries a sequence number and a rewrite that finishes after a newer one is skipped, so the file never goes back to an older state. Log appends are short and stay on the loop, which keeps them in mutation order.
+
+Log entries are idempotent ('put' stores the full record, 'delete' removes IDs), so replaying a log on top of a snapshot that already contains its effects (e.g. after a crash between writing the snapshot and truncating the log) yields the same state.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Generic, TypeVar
+
+from loguru import logger
+from pydantic import BaseModel
+
+from conversational_toolkit.utils.executors import run_in_thread
+
+RecordT = TypeVar("RecordT", bound=BaseModel)
+
+
+class JsonRecordStore(Generic[RecordT]):
+    """
+    Persistence for a '{id: record}' dictionary of pydantic models.
+
+    Attributes:
+        json_file_path: Path of the JSON snapshot.
+        log_path: Path of the append-only log (only used with 'write_ahead_log').
+        segment_path: Path the log is rotated to while it is being compacted.
+        records: The live dictionary; repositories read and mutate it directly and report mutations through 'put' / 'delete'.
+    """
+
+    def __init__(
+        self,
+        json_file_path: str,
+        model: type[RecordT],
+        write_ahead_log: bool = False,
+        fsync_interval: float = 1.0,
+        compact_interval: float = 300.0,
+        compact_min_entries: int = 1000,
+    ) -> None:
+        """
+        :param json_file_path: Path of the JSON snapshot file.
+        :param model: Pydantic model of the stored records.
+        :param write_ahead_log: Append mutations to a log instead of rewriting the snapshot on every write.
+        :param fsync_interval: Seconds between batched fsyncs of the log.
+        :param compact_interval: Minimum seconds between two compactions.
+        :param compact_min_entries: Number of log entries that triggers a compaction.
+        """
+        self.json_file_path = Path(json_file_path)
+        self.log_path = Path(f"{json_file_path}.wal")
+        self.segment_path = Path(f"{json_file_path}.wal.compacting")
+        self.model = model
+        self.write_ahead_log = write_ahead_log
+        self.fsync_interval = fsync_interval
+        self.compact_interval = compact_interval
+        self.compact_min_entries = compact_min_entries
+        self.records: dict[str, RecordT] = {}
+
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_seq = 0
+        self._written_seq = 0
+        self._log_file: Any = None
+        self._log_entries = 0
+        self._dirty = False
+        self._stop = threading.Event()
+        self._worker: threading.Thread | None = None
+        # Compaction handed to the background thread: the dumped records and the rotated log file
+        self._compaction_lock = threading.Lock()
+        self._pending_compaction: tuple[dict[str, dict[str, Any]], Any] | None = None
+        self._compacting = False
+        self._last_compaction = time.monotonic()
+
+    def load(self) -> dict[str, RecordT]:
+        """Load the snapshot (and replay the log), start background maintenance and return the live dictionary."""
+        try:
+            with open(self.json_file_path, "r") as f:
+                self.records = {k: self.model(**v) for k, v in json.load(f).items()}
+        except FileNotFoundError:
+            self._write_snapshot()
+
+        if self.write_ahead_log:
+            self._replay(self.segment_path)
+            self._replay(self.log_path)
+            if self.segment_path.exists():
+                # A compaction was interrupted: the records now include the segment, so finish it
+                self._write_snapshot()
+                self.segment_path.unlink()
+            self._log_file = open(self.log_path, "a", encoding="utf-8")
+            self._worker = threading.Thread(target=self._maintain, name=f"wal-{self.json_file_path.name}", daemon=True)
+            self._worker.start()
+            atexit.register(self.close)
+        return self.records
+
+    def _replay(self, log_path: Path) -> None:
+        if not log_path.exists():
+            return
+
+        with open(log_path, "rb") as f:
+            content = f.read()
+        if content and not content.endswith(b"\n"):
+            # A torn final line from a crash mid-write: drop it so that new entries start on a fresh line.
+            logger.warning(f"Discarding incomplete last entry of {log_path}")
+            content = content[: content.rfind(b"\n") + 1]
+            with open(log_path, "r+b") as f:
+                f.truncate(len(content))
+
+        replayed = 0
+        for line_number, line in enumerate(content.decode("utf-8").splitlines(), start=1):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring unreadable entry {line_number} in {log_path}")
+                continue
+            if entry["op"] == "put":
+                self.records[entry["id"]] = self.model(**entry["record"])
+            elif entry["op"] == "delete":
+                for record_id in entry["ids"]:
+                    self.records.pop(record_id, None)
+            replayed += 1
+        if log_path == self.log_path:
+            self._log_entries = replayed
+        logger.debug(f"Replayed {replayed} log entries from {log_path}")
+
+    def _dump(self) -> dict[str, dict[str, Any]]:
+        return {record_id: record.model_dump() for record_id, record in self.records.items()}
+
+    def _write_snapshot(self, data: dict[str, dict[str, Any]] | None = None) -> None:
+        """Atomically rewrite the snapshot file with 'data' (the dumped records), or the current records if not given."""
+        data = self._dump() if data is None else data
+        tmp_path = self.json_file_path.with_name(f"{self.json_file_path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=4)
+            if self.write_ahead_log:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.json_file_path)
+
+    def _append(self, entries: list[dict[str, Any]]) -> None:
+        with self._lock:
+            self._log_file.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            self._log_file.flush()
+            self._log_entries += len(entries)
+            self._dirty = True
+        if (
+            not self._compacting
+            and self._log_entries >= self.compact_min_entries
+            and time.monotonic() - self._last_compaction >= self.compact_interval
+        ):
+            # Handed to the background thread, which writes the snapshot on its next tick
+            self._pending_compaction = self._rotate()
+
+    def put(self, record_id: str, record: RecordT) -> None:
+        """Persist the creation or update of 'record' (already stored in 'records')."""
+        self.put_many({record_id: record})
+
+    def put_many(self, records: dict[str, RecordT]) -> None:
+        """Persist the creation or update of several records with a single write."""
+        if self.write_ahead_log:
+            self._append(
+                [{"op": "put", "id": record_id, "record": record.model_dump()} for record_id, record in records.items()]
+            )
+        else:
+            self._write_snapshot()
+
+    def delete(self, record_ids: list[str]) -> None:
+        """Persist the removal of 'record_ids' (already removed from 'records')."""
+        if self.write_ahead_log:
+            self._append([{"op": "delete", "ids": record_ids}])
+        else:
+            self._write_snapshot()
+
+    def _write_snapshot_if_newer(self, seq: int, data: dict[str, dict[str, Any]]) -> None:
+        with self._snapshot_lock:
+            if seq <= self._written_seq:
+                return
+            self._write_snapshot(data)
+            self._written_seq = seq
+
+    async def _write_snapshot_async(self) -> None:
+        # Dump on the loop: the snapshot is the state after the mutation that triggered it, and the worker thread never
+        # reads record objects that the loop may be mutating. Only JSON encoding and the file write run in the thread.
+        self._snapshot_seq += 1
+        await run_in_thread(self._write_snapshot_if_newer, self._snapshot_seq, self._dump())
+
+    async def put_async(self, record_id: str, record: RecordT) -> None:
+        """Async 'put': the snapshot rewrite runs off the event loop."""
+        await self.put_many_async({record_id: record})
+
+    async def put_many_async(self, records: dict[str, RecordT]) -> None:
+        """Async 'put_many': the snapshot rewrite runs off the event loop."""
+        if self.write_ahead_log:
+            self.put_many(records)
+        else:
+            await self._write_snapshot_async()
+
+    async def delete_async(self, record_ids: list[str]) -> None:
+        """Async 'delete': the snapshot rewrite runs off the event loop."""
+        if self.write_ahead_log:
+            self.delete(record_ids)
+        else:
+            await self._write_snapshot_async()
+
+    def _rotate(self) -> tuple[dict[str, dict[str, Any]], Any]:
+        """Dump the records and swap in a fresh log. Must run on the thread that mutates 'records'."""
+        data = self._dump()
+        with self._lock:
+            rotated = self._log_file
+            os.replace(self.log_path, self.segment_path)
+            self._log_file = open(self.log_path, "a", encoding="utf-8")
+            self._log_entries = 0
+            self._dirty = False
+        self._compacting = True
+        self._last_compaction = time.monotonic()
+        return data, rotated
+
+    def _finish_compaction(self) -> None:
+        """Write the pending compaction's snapshot and delete the rotated segment it covers."""
+        with self._compaction_lock:
+            pending, self._pending_compaction = self._pending_compaction, None
+            if pending is None:
+                return
+            data, rotated = pending
+            try:
+                if not rotated.closed:
+                    os.fsync(rotated.fileno())
+                    rotated.close()
+                self._write_snapshot(data)
+            except Exception:
+                # Retried on the next tick; until then the segment stays on disk and is replayed after a crash
+                self._pending_compaction = pending
+                raise
+            self.segment_path.unlink(missing_ok=True)
+            self._compacting = False
+        logger.debug(f"Compacted {self.log_path} into {self.json_file_path}")
+
+    def compact(self) -> None:
+        """Write the current state as a new snapshot and truncate the log. Must run on the thread that mutates 'records'."""
+        if not self.write_ahead_log:
+            return
+        # Finish a compaction handed to the background thread first, so its segment is not overwritten
+        self._finish_compaction()
+        self._pending_compaction = self._rotate()
+        self._finish_compaction()
+
+    def _fsync(self) -> None:
+        with self._lock:
+            if self._dirty and self._log_file is not None:
+                os.fsync(self._log_file.fileno())
+                self._dirty = False
+
+    def _maintain(self) -> None:
+        """Background loop: batched fsync, and the snapshot write of a compaction started by '_append'."""
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self._fsync()
+                self._finish_compaction()
+            except Exception as e:
+                logger.error(f"Write-ahead log maintenance failed for {self.log_path}: {e}")
+
+    def close(self) -> None:
+        """Stop the background thread and fsync outstanding log entries."""
+        if self._log_file is None:
+            return
+        self._stop.set()
+        if self._worker is not None and self._worker is not threading.current_thread():
+            self._worker.join()
+        self._finish_compaction()
+        self._fsync()
+        with self._lock:
+            self._log_file.close()
+            self._log_file = None
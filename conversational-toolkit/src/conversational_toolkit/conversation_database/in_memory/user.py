@@ -1,34 +1,25 @@
-import json
-
 from loguru import logger
 
 from conversational_toolkit.conversation_database.data_models.user import UserDatabase, User
+from conversational_toolkit.conversation_database.in_memory.storage import JsonRecordStore
 from conversational_toolkit.utils.database import generate_uid
 
 
 class InMemoryUserDatabase(UserDatabase):
-    def __init__(self, json_file_path: str):
+    def __init__(self, json_file_path: str, write_ahead_log: bool = False):
         self.json_file_path = json_file_path
-        self.users: dict[str, User] = {}
-        self._load()
-
-    def _load(self) -> None:
-        try:
-            with open(self.json_file_path, "r") as f:
-                data = json.load(f)
-                self.users = {k: User(**v) for k, v in data.items()}
-        except FileNotFoundError:
-            self._save()
+        self._store = JsonRecordStore(json_file_path, User, write_ahead_log=write_ahead_log)
+        self.users: dict[str, User] = self._store.load()
 
-    def _save(self) -> None:
-        with open(self.json_file_path, "w") as f:
-            json.dump({user_id: user.model_dump() for user_id, user in self.users.items()}, f, indent=4)
+    def close(self) -> None:
+        """Flush the write-ahead log, if any."""
+        self._store.close()
 
     async def create_user(self, user: User) -> User:
         if not user.id:
             user.id = generate_uid()
         self.users[user.id] = user
-        self._save()
+        await self._store.put_async(user.id, user)
         logger.debug(f"Created user: {user}")
         return user
 
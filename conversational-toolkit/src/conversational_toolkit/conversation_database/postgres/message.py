@@ -1,6 +1,6 @@
 from typing import Any, cast
 
-from sqlalchemy import Column, String, ForeignKey, Text, BigInteger, select
+from sqlalchemy import Column, String, ForeignKey, Text, BigInteger, delete, select
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import relationship
@@ -29,6 +29,19 @@ class MessageTable(Base):
     sources = relationship("SourceTable", order_by="SourceTable.id", back_populates="message")
     reactions = relationship("ReactionTable", order_by="ReactionTable.id", back_populates="message")
 
+    @classmethod
+    def from_model(cls, message: Message) -> "MessageTable":
+        return cls(
+            id=message.id or generate_uid(),
+            user_id=message.user_id,
+            conversation_id=message.conversation_id,
+            content=message.content,
+            role=message.role,
+            create_timestamp=message.create_timestamp,
+            metadata_=message.metadata,
+            parent_id=message.parent_id,
+        )
+
     def to_model(self) -> Message:
         return Message(
             id=str(self.id),
@@ -62,16 +75,7 @@ class PostgreSQLMessageDatabase(MessageDatabase):
         async with self.make_session() as session:
             async with session.begin():
                 try:
-                    db_message = MessageTable(
-                        id=message.id or generate_uid(),
-                        user_id=message.user_id,
-                        conversation_id=message.conversation_id,
-                        content=message.content,
-                        role=message.role,
-                        create_timestamp=message.create_timestamp,
-                        metadata_=message.metadata,
-                        parent_id=message.parent_id,
-                    )
+                    db_message = MessageTable.from_model(message)
                     session.add(db_message)
                     await session.commit()
                     return db_message.to_model()
@@ -117,3 +121,15 @@ class PostgreSQLMessageDatabase(MessageDatabase):
                     logger.error(f"Error deleting message {message_id}: {e}")
                     await session.rollback()
                     raise
+
+    async def delete_messages_by_conversation_id(self, conversation_id: str) -> bool:
+        async with self.make_session() as session:
+            async with session.begin():
+                try:
+                    await session.execute(delete(MessageTable).where(MessageTable.conversation_id == conversation_id))
+                    await session.commit()
+                    return True
+                except Exception as e:
+                    logger.error(f"Error deleting messages of conversation {conversation_id}: {e}")
+                    await session.rollback()
+                    raise
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Text, select
+from sqlalchemy import Column, String, ForeignKey, Text, delete, select
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import relationship
 
@@ -72,6 +72,21 @@ class PostgreSQLReactionDatabase(ReactionDatabase):
                 await session.rollback()
                 raise
 
+    async def get_reactions_by_message_ids(self, message_ids: list[str]) -> dict[str, list[Reaction]]:
+        reactions_by_message: dict[str, list[Reaction]] = {message_id: [] for message_id in message_ids}
+        if not message_ids:
+            return reactions_by_message
+        async with self.make_session() as session:
+            try:
+                result = await session.execute(select(ReactionTable).where(ReactionTable.message_id.in_(message_ids)))
+                for reaction in result.scalars().all():
+                    reactions_by_message[str(reaction.message_id)].append(reaction.to_model())
+                return reactions_by_message
+            except Exception as e:
+                logger.error(f"Error retrieving reactions for messages {message_ids}: {e}")
+                await session.rollback()
+                raise
+
     async def delete_reactions(self, reaction_ids: list[str]) -> bool:
         async with self.make_session() as session:
             async with session.begin():
@@ -86,3 +101,15 @@ class PostgreSQLReactionDatabase(ReactionDatabase):
                     logger.error(f"Error deleting reactions {reaction_ids}: {e}")
                     await session.rollback()
                     raise
+
+    async def delete_reactions_by_message_ids(self, message_ids: list[str]) -> bool:
+        async with self.make_session() as session:
+            async with session.begin():
+                try:
+                    await session.execute(delete(ReactionTable).where(ReactionTable.message_id.in_(message_ids)))
+                    await session.commit()
+                    return True
+                except Exception as e:
+                    logger.error(f"Error deleting reactions of messages {message_ids}: {e}")
+                    await session.rollback()
+                    raise
@@ -1,6 +1,6 @@
 import json
 
-from sqlalchemy import Column, String, ForeignKey, Text, select
+from sqlalchemy import Column, String, ForeignKey, Text, delete, select
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import relationship
 
@@ -19,6 +19,15 @@ class SourceTable(Base):
     metadata_ = Column("metadata", Text)  # Store JSON as text for simplicity
     message = relationship("MessageTable", back_populates="sources")
 
+    @classmethod
+    def from_model(cls, source: Source) -> "SourceTable":
+        return cls(
+            id=source.id or generate_uid(),
+            message_id=source.message_id,
+            content=source.content,
+            metadata_=json.dumps(source.metadata),
+        )
+
     def to_model(self) -> Source:
         return Source(
             id=str(self.id),
@@ -45,12 +54,7 @@ class PostgreSQLSourceDatabase(SourceDatabase):
         async with self.make_session() as session:
             async with session.begin():
                 try:
-                    db_source = SourceTable(
-                        id=source.id or generate_uid(),
-                        message_id=source.message_id,
-                        content=source.content,
-                        metadata_=json.dumps(source.metadata),
-                    )
+                    db_source = SourceTable.from_model(source)
                     session.add(db_source)
                     await session.commit()
                     return db_source.to_model()
@@ -59,6 +63,21 @@ class PostgreSQLSourceDatabase(SourceDatabase):
                     await session.rollback()
                     raise
 
+    async def create_sources(self, sources: list[Source]) -> list[Source]:
+        if not sources:
+            return []
+        async with self.make_session() as session:
+            async with session.begin():
+                try:
+                    db_sources = [SourceTable.from_model(source) for source in sources]
+                    session.add_all(db_sources)
+                    await session.commit()
+                    return [db_source.to_model() for db_source in db_sources]
+                except Exception as e:
+                    logger.error(f"Error creating {len(sources)} sources: {e}")
+                    await session.rollback()
+                    raise
+
     async def get_sources_by_message_id(self, message_id: str) -> list[Source]:
         async with self.make_session() as session:
             try:
@@ -70,6 +89,21 @@ class PostgreSQLSourceDatabase(SourceDatabase):
                 await session.rollback()
                 raise
 
+    async def get_sources_by_message_ids(self, message_ids: list[str]) -> dict[str, list[Source]]:
+        sources_by_message: dict[str, list[Source]] = {message_id: [] for message_id in message_ids}
+        if not message_ids:
+            return sources_by_message
+        async with self.make_session() as session:
+            try:
+                result = await session.execute(select(SourceTable).where(SourceTable.message_id.in_(message_ids)))
+                for source in result.scalars().all():
+                    sources_by_message[str(source.message_id)].append(source.to_model())
+                return sources_by_message
+            except Exception as e:
+                logger.error(f"Error retrieving sources for messages {message_ids}: {e}")
+                await session.rollback()
+                raise
+
     async def delete_sources(self, source_ids: list[str]) -> bool:
         async with self.make_session() as session:
             async with session.begin():
@@ -84,3 +118,15 @@ class PostgreSQLSourceDatabase(SourceDatabase):
                     logger.error(f"Error deleting sources {source_ids}: {e}")
                     await session.rollback()
                     raise
+
+    async def delete_sources_by_message_ids(self, message_ids: list[str]) -> bool:
+        async with self.make_session() as session:
+            async with session.begin():
+                try:
+                    await session.execute(delete(SourceTable).where(SourceTable.message_id.in_(message_ids)))
+                    await session.commit()
+                    return True
+                except Exception as e:
+                    logger.error(f"Error deleting sources of messages {message_ids}: {e}")
+                    await session.rollback()
+                    raise
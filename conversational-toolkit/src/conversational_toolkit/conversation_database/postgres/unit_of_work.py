@@ -0,0 +1,67 @@
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, AsyncSession
+
+from conversational_toolkit.conversation_database.data_models.conversation import Conversation
+from conversational_toolkit.conversation_database.data_models.message import Message
+from conversational_toolkit.conversation_database.data_models.source import Source
+from conversational_toolkit.conversation_database.data_models.unit_of_work import ConversationUnitOfWork
+from conversational_toolkit.conversation_database.postgres.conversation import ConversationTable
+from conversational_toolkit.conversation_database.postgres.message import MessageTable
+from conversational_toolkit.conversation_database.postgres.reactions import ReactionTable
+from conversational_toolkit.conversation_database.postgres.source import SourceTable
+
+from loguru import logger
+
+
+class PostgreSQLUnitOfWork(ConversationUnitOfWork):
+    """Runs every operation in a single transaction on the engine shared by the PostgreSQL repositories."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.make_session = async_sessionmaker(
+            bind=self.engine,
+            expire_on_commit=False,
+            class_=AsyncSession,
+        )
+
+    async def save_answer(
+        self, conversation: Conversation, message: Message, sources: list[Source]
+    ) -> tuple[Message, list[Source]]:
+        """Insert the message and its sources and update the conversation in one transaction."""
+        async with self.make_session() as session:
+            async with session.begin():
+                try:
+                    db_message = MessageTable.from_model(message)
+                    db_sources = [SourceTable.from_model(source) for source in sources]
+                    # The unit of work inserts the message before the sources that reference it
+                    session.add_all([db_message, *db_sources])
+                    await session.execute(
+                        update(ConversationTable)
+                        .where(ConversationTable.id == conversation.id)
+                        .values(update_timestamp=conversation.update_timestamp, title=conversation.title)
+                    )
+                    await session.commit()
+                    return db_message.to_model(), [db_source.to_model() for db_source in db_sources]
+                except Exception as e:
+                    logger.error(f"Error saving answer for conversation {conversation.id}: {e}")
+                    await session.rollback()
+                    raise
+
+    async def delete_conversation(self, conversation_id: str) -> bool:
+        """Delete the conversation, its messages, sources and reactions with set-based statements in one transaction."""
+        message_ids = select(MessageTable.id).where(MessageTable.conversation_id == conversation_id)
+        async with self.make_session() as session:
+            async with session.begin():
+                try:
+                    await session.execute(delete(SourceTable).where(SourceTable.message_id.in_(message_ids)))
+                    await session.execute(delete(ReactionTable).where(ReactionTable.message_id.in_(message_ids)))
+                    await session.execute(delete(MessageTable).where(MessageTable.conversation_id == conversation_id))
+                    result = await session.execute(
+                        delete(ConversationTable).where(ConversationTable.id == conversation_id)
+                    )
+                    await session.commit()
+                    return bool(result.rowcount)
+                except Exception as e:
+                    logger.error(f"Error deleting conversation {conversation_id} with its messages: {e}")
+                    await session.rollback()
+                    raise
@@ -1,7 +1,8 @@
 """
 Embeddings model abstractions.
 
-Concrete implementations: 'OpenAIEmbeddings', 'SentenceTransformerEmbeddings'.
+Concrete implementations: 'OpenAIEmbeddings', 'SentenceTransformerEmbeddings', 'Qwen3VLEmbeddings'.
+'CachedEmbeddings' wraps any of them with a persistent on-disk cache.
 """
 
 from abc import ABC, abstractmethod
@@ -0,0 +1,133 @@
+"""
+Persistent, content-addressed embedding cache.
+
+'CachedEmbeddings' wraps any 'EmbeddingsModel' and stores every vector it computes in a local SQLite file. Entries are keyed by '(model_name, dimensions, sha256(text))', so re-ingesting a corpus after small edits only sends the changed chunks to the wrapped model, in one batch. Identical texts inside a single call are embedded once. Lookups and writes run in the shared thread pool ('run_in_thread'), on one connection guarded by a lock, so a large cache never blocks the event loop.
+
+Multimodal models ('Qwen3VLEmbeddings') receive 'Chunk' objects instead of strings; for those the hash covers the MIME type and the content, and cache misses are forwarded as 'Chunk' objects so the wrapped model still sees images as images.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Any, Sequence
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.utils.executors import run_in_thread
+
+# SQLite limits the number of bound parameters per statement (999 on older builds).
+_SELECT_BATCH_SIZE = 500
+
+
+class CachedEmbeddings(EmbeddingsModel):
+    """
+    Embeddings model decorator that only embeds texts it has not seen before.
+
+    Attributes:
+        embedding_model: The wrapped model that computes cache misses.
+        model_name: Name of the wrapped model, part of the cache key.
+        dimensions: Output dimensionality, part of the cache key. Taken from the wrapped model's 'dimensions' attribute when not given.
+    """
+
+    def __init__(self, embedding_model: EmbeddingsModel, cache_path: str, dimensions: int | None = None) -> None:
+        """
+        :param embedding_model: The model to wrap ('OpenAIEmbeddings', 'SentenceTransformerEmbeddings', 'Qwen3VLEmbeddings', ...)
+        :param cache_path: Path of the SQLite file; created if it does not exist.
+        :param dimensions: Override for the dimensionality used in the cache key.
+        """
+        self.embedding_model = embedding_model
+        self.model_name: str = getattr(embedding_model, "model_name", type(embedding_model).__name__)
+        self.dimensions: int | None = (
+            dimensions if dimensions is not None else getattr(embedding_model, "dimensions", None)
+        )
+        self.cache_path = cache_path
+
+        # Used from the thread pool, one statement at a time
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model_name TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model_name, dimensions, text_hash)
+            )
+            """
+        )
+        self._connection.commit()
+        logger.debug(f"Embedding cache for {self.model_name} (dimensions={self.dimensions}) opened at {cache_path}")
+
+    @staticmethod
+    def _hash(item: str | Chunk, kwargs: dict[str, Any]) -> str:
+        payload = item if isinstance(item, str) else f"{item.mime_type}\0{item.content}"
+        if kwargs:
+            payload += "\0" + json.dumps(kwargs, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lookup(self, hashes: Sequence[str]) -> dict[str, NDArray[np.float64]]:
+        found: dict[str, NDArray[np.float64]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for i in range(0, len(unique), _SELECT_BATCH_SIZE):
+                batch = unique[i : i + _SELECT_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model_name = ? AND dimensions = ? AND text_hash IN ({placeholders})",
+                    (self.model_name, self.dimensions or 0, *batch),
+                )
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=np.float64)
+        return found
+
+    def _store(self, vectors: dict[str, NDArray[np.float64]]) -> None:
+        rows = [
+            (self.model_name, self.dimensions or 0, text_hash, np.asarray(vector, dtype=np.float64).tobytes())
+            for text_hash, vector in vectors.items()
+        ]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model_name, dimensions, text_hash, vector) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._connection.commit()
+
+    async def get_embeddings(self, texts: str | Chunk | Sequence[str | Chunk], **kwargs: Any) -> NDArray[np.float64]:
+        """Return cached vectors where available and embed the misses in a single call to the wrapped model.
+
+        Extra keyword arguments are forwarded to the wrapped model and become part of the cache key.
+        """
+        items: list[str | Chunk] = [texts] if isinstance(texts, (str, Chunk)) else list(texts)
+        if not items:
+            return np.empty((0, self.dimensions or 0), dtype=np.float64)
+
+        hashes = [self._hash(item, kwargs) for item in items]
+        cached = await run_in_thread(self._lookup, hashes)
+
+        missing: dict[str, str | Chunk] = {}
+        for text_hash, item in zip(hashes, items):
+            if text_hash not in cached and text_hash not in missing:
+                missing[text_hash] = item
+
+        logger.debug(f"Embedding cache: {len(items) - len(missing)} hits, {len(missing)} misses")
+        if missing:
+            computed = await self.embedding_model.get_embeddings(list(missing.values()), **kwargs)  # type: ignore[arg-type]
+            new_vectors = {
+                text_hash: np.asarray(vector, dtype=np.float64) for text_hash, vector in zip(missing, computed)
+            }
+            await run_in_thread(self._store, new_vectors)
+            cached.update(new_vectors)
+
+        return np.stack([cached[text_hash] for text_hash in hashes])
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._connection.close()
@@ -9,6 +9,7 @@ from transformers import CLIPProcessor, CLIPModel, CLIPTokenizer, CLIPTextModel
 from PIL import Image
 
 from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.utils.executors import run_in_thread
 
 
 class CLIPEmbeddings:
@@ -24,6 +25,10 @@ class CLIPEmbeddings:
         if isinstance(texts, str):
             texts = [texts]
 
+        # Forward passes run in the shared thread pool so they do not block the event loop
+        return await run_in_thread(self._encode_texts, texts)
+
+    def _encode_texts(self, texts: list[str]) -> np.ndarray:
         inputs = self.tokenizer(texts, return_tensors="pt", padding=True, truncation=True)
 
         with torch.no_grad():
@@ -35,6 +40,9 @@ class CLIPEmbeddings:
         if isinstance(images, str):
             images = [images]
 
+        return await run_in_thread(self._encode_images, images)
+
+    def _encode_images(self, images: list[str]) -> np.ndarray:
         decoded_images = []
         for img_base64 in images:
             img_data = base64.b64decode(img_base64)
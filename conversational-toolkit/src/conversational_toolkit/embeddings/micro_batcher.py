@@ -0,0 +1,113 @@
+"""
+Dynamic micro-batching for local embedding models.
+
+Local models ('SentenceTransformerEmbeddings', 'Qwen3VLEmbeddings') are much cheaper per item in one padded forward pass over many inputs than in many passes over one input each, and their forward pass is CPU/GPU-bound, so running it directly inside a coroutine blocks the event loop.
+
+'MicroBatcher' sits between the two: concurrent 'submit' calls put their inputs on a queue, a collector task waits up to 'max_wait_ms' after the first request for more requests to arrive (or until 'max_batch_size' inputs are gathered), runs a single 'encode' call over the merged inputs in the shared thread pool ('run_in_thread'), and hands each caller its own rows of the result. While one forward pass runs, the next batch accumulates, so the batch size grows with the load: an idle server answers a single query after at most 'max_wait_ms', a busy one runs full batches back to back.
+
+The collector waits for one 'encode' call to finish before starting the next, so batched calls never run concurrently.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any, Generic, TypeVar
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+
+from conversational_toolkit.utils.executors import run_in_thread
+
+T = TypeVar("T")
+
+
+class _Request(Generic[T]):
+    __slots__ = ("future", "items")
+
+    def __init__(self, items: list[T], future: "asyncio.Future[NDArray[Any]]") -> None:
+        self.items = items
+        self.future = future
+
+
+class MicroBatcher(Generic[T]):
+    """
+    Merge concurrent embedding requests into batched forward passes run off the event loop.
+
+    Attributes:
+        encode: Embeds a list of inputs, returning one row per input. Called in the shared thread pool.
+        max_batch_size: Maximum number of inputs per 'encode' call; larger requests are run on their own.
+        max_wait_ms: How long the collector waits for more requests after the first one.
+    """
+
+    def __init__(
+        self, encode: Callable[[list[T]], NDArray[Any]], max_batch_size: int = 32, max_wait_ms: float = 5.0
+    ) -> None:
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: asyncio.Queue[_Request[T]] | None = None
+        self._collector: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _ensure_collector(self) -> "asyncio.Queue[_Request[T]]":
+        """Start the collector on the running loop; a new loop (e.g. a second 'asyncio.run') gets a new one."""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._collector is None or self._collector.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect(self._queue))
+        return self._queue
+
+    async def submit(self, items: list[T]) -> NDArray[Any]:
+        """Embed 'items' as part of the next batch and return their rows, in order."""
+        if not items:
+            raise ValueError("Nothing to embed")
+        queue = self._ensure_collector()
+        future: asyncio.Future[NDArray[Any]] = asyncio.get_running_loop().create_future()
+        await queue.put(_Request(items, future))
+        return await future
+
+    async def _collect(self, queue: "asyncio.Queue[_Request[T]]") -> None:
+        carry: _Request[T] | None = None
+        while True:
+            first = carry if carry is not None else await queue.get()
+            carry = None
+            batch = [first]
+            size = len(first.items)
+
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+            while size < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    request = queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if size + len(request.items) > self.max_batch_size:
+                    # Does not fit: it opens the next batch instead
+                    carry = request
+                    break
+                batch.append(request)
+                size += len(request.items)
+
+            await self._run(batch)
+
+    async def _run(self, batch: list[_Request[T]]) -> None:
+        items = [item for request in batch for item in request.items]
+        try:
+            embeddings = await run_in_thread(self.encode, items)
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        logger.debug(f"Micro-batch of {len(items)} inputs from {len(batch)} requests")
+        embeddings = np.asarray(embeddings)
+        start = 0
+        for request in batch:
+            end = start + len(request.items)
+            # A caller that was cancelled while waiting no longer wants its rows
+            if not request.future.done():
+                request.future.set_result(embeddings[start:end])
+            start = end
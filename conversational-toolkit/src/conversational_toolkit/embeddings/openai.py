@@ -1,38 +1,121 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+
 from loguru import logger
 import numpy as np
 from numpy.typing import NDArray
 
 from conversational_toolkit.embeddings.base import EmbeddingsModel
-from openai import AsyncOpenAI
+from conversational_toolkit.utils.tokens import estimate_token_count
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI
+
+# OpenAI accepts at most 2048 inputs and 300k tokens per embeddings request
+_MAX_INPUTS_PER_REQUEST = 2048
+
+
+def _retry_after(error: APIStatusError) -> float | None:
+    """Seconds to wait according to the 'retry-after-ms' / 'retry-after' response headers, if present."""
+    headers = error.response.headers
+    try:
+        if (value := headers.get("retry-after-ms")) is not None:
+            return float(value) / 1000
+        if (value := headers.get("retry-after")) is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+    except (TypeError, ValueError):
+        pass
+    return None
 
 
 class OpenAIEmbeddings(EmbeddingsModel):
     """
     OpenAI embeddings model.
 
+    Requests are packed by estimated token count and sent concurrently; the semaphore is shared by all calls on the instance, so concurrent callers (e.g. the embedders of an 'IngestionPipeline') together never have more than 'max_concurrency' requests in flight. Rate-limit (429) and server (5xx) errors are retried with exponential backoff, waiting at least as long as the 'Retry-After' header asks for.
+
     Attributes:
         model_name (str): The name of the embeddings model.
+        dimensions (int): Requested output dimensionality of the embeddings.
+        max_concurrency (int): Maximum number of requests in flight.
+        max_retries (int): Retries per request for 429, 5xx and connection errors.
     """
 
-    def __init__(self, model_name: str):
-        self.client = AsyncOpenAI()
+    def __init__(self, model_name: str, dimensions: int = 1024, max_concurrency: int = 4, max_retries: int = 6):
+        # Retries are handled in '_embed_batch', so they honour 'max_retries' and do not hold a semaphore slot while waiting
+        self.client = AsyncOpenAI(max_retries=0)
         self.model_name = model_name
-        logger.debug(f"OpenAI embeddings model loaded: {model_name}")
+        self.dimensions = dimensions
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        logger.debug(f"OpenAI embeddings model loaded: {model_name} ({dimensions} dimensions)")
+
+    async def _embed_batch(self, batch: list[str]) -> NDArray[np.float64]:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self.client.embeddings.create(
+                        input=batch, model=self.model_name, dimensions=self.dimensions
+                    )
+                return np.asarray([d.embedding for d in response.data])
+            except APIStatusError as e:
+                if attempt >= self.max_retries or not (
+                    e.status_code == HTTPStatus.TOO_MANY_REQUESTS or e.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+                ):
+                    raise
+                retry_after = _retry_after(e)
+                error = f"HTTP {e.status_code}"
+            except APIConnectionError as e:
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = None
+                error = type(e).__name__
+
+            backoff = min(60.0, 2**attempt) * random.uniform(0.5, 1.0)
+            delay = max(backoff, retry_after or 0.0)
+            logger.warning(f"OpenAI embeddings request failed ({error}), retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
 
     async def get_embeddings(
-        self, texts: str | list[str], batch_size: int = 100, max_chars: int = 30_000
+        self, texts: str | list[str], batch_size: int = 100, max_chars: int = 30_000, max_batch_tokens: int = 100_000
     ) -> NDArray[np.float64]:
-        """Embed one or more texts using OpenAI, batching requests to stay within the token-per-request limit."""
+        """
+        Embed one or more texts using OpenAI, with concurrent requests, in input order.
+
+        :param texts: Text or texts to embed
+        :param batch_size: Maximum number of texts per request
+        :param max_chars: Texts are truncated to this many characters, to stay below the per-input token limit
+        :param max_batch_tokens: Estimated token budget per request
+        """
         if isinstance(texts, str):
             texts = [texts]
 
         texts = [t[:max_chars] if len(t) > max_chars else t for t in texts]
-        batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
-        all_embeddings: list[NDArray[np.float64]] = []
-        for batch in batches:
-            response = await self.client.embeddings.create(input=batch, model=self.model_name, dimensions=1024)
-            all_embeddings.append(np.asarray([d.embedding for d in response.data]))
+        batch_size = min(batch_size, _MAX_INPUTS_PER_REQUEST)
+
+        batches: list[list[str]] = []
+        batch: list[str] = []
+        batch_tokens = 0
+        for text in texts:
+            tokens = estimate_token_count(text)
+            if batch and (batch_tokens + tokens > max_batch_tokens or len(batch) >= batch_size):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+
+        # 'gather' keeps the batch order, so the rows line up with 'texts'
+        all_embeddings = await asyncio.gather(*(self._embed_batch(batch) for batch in batches))
 
         embeddings = np.concatenate(all_embeddings, axis=0)
-        logger.info(f"OpenAI embeddings shape: {embeddings.shape}")
+        logger.info(f"OpenAI embeddings shape: {embeddings.shape} ({len(batches)} requests)")
         return embeddings
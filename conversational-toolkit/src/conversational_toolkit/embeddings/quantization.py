@@ -0,0 +1,192 @@
+"""
+Quantized CPU inference for local embedding models.
+
+Two backends are available, selected with the 'quantization' argument of 'SentenceTransformerEmbeddings' (and, for the torch backend, 'Qwen3VLEmbeddings'):
+    'onnx-int8': the model is exported to ONNX and its weights are quantized to int8 with ONNX Runtime dynamic quantization (activations are quantized on the fly, so no calibration data is needed). The quantized file is written once to 'cache_dir' and re-used afterwards. Needs 'onnxruntime' and 'optimum' ('pip install "sentence-transformers[onnx]"').
+    'torch-int8': PyTorch dynamic quantization of every 'nn.Linear' layer. It needs nothing beyond torch and is used as the fallback when the ONNX dependencies are missing.
+
+Both run on CPU only and trade a little accuracy for a smaller, faster model. 'compare_quantized_recall' measures that trade-off on real queries: it ranks a corpus for each query with the fp32 model and with the quantized one and reports how much of the fp32 top k the quantized model still retrieves.
+"""
+
+import platform
+import time
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+import torch
+from loguru import logger
+from numpy.typing import NDArray
+from pydantic import BaseModel
+from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+
+Quantization = Literal["onnx-int8", "torch-int8"]
+
+DEFAULT_ONNX_CACHE_DIR = Path.home() / ".cache" / "conversational_toolkit" / "onnx"
+
+
+def default_onnx_quantization_config() -> str:
+    """ONNX Runtime quantization preset for this CPU: 'arm64' on ARM, 'avx2' (supported by any recent x86 CPU) otherwise."""
+    return "arm64" if platform.machine().lower() in ("arm64", "aarch64") else "avx2"
+
+
+def quantize_torch_dynamic(module: torch.nn.Module) -> torch.nn.Module:
+    """Quantize the weights of every 'nn.Linear' layer of 'module' to int8, in place. The module must be on CPU."""
+    module.eval()
+    return torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def _load_onnx_int8(model_name: str, cache_dir: Path, quantization_config: str, **kwargs: Any) -> SentenceTransformer:
+    export_dir = cache_dir / model_name.replace("/", "__")
+    file_name = f"model_qint8_{quantization_config}.onnx"
+    quantized = next(export_dir.rglob(file_name), None) if export_dir.exists() else None
+    if quantized is None:
+        logger.info(
+            f"Exporting {model_name} to ONNX with int8 dynamic quantization ({quantization_config}) in {export_dir}"
+        )
+        model = SentenceTransformer(model_name, backend="onnx", device="cpu", **kwargs)
+        model.save(str(export_dir))
+        export_dynamic_quantized_onnx_model(model, quantization_config, str(export_dir))
+        quantized = next(export_dir.rglob(file_name))
+
+    model_kwargs = {
+        **kwargs.pop("model_kwargs", {}),
+        "file_name": str(quantized.relative_to(export_dir)),
+        "provider": "CPUExecutionProvider",
+    }
+    return SentenceTransformer(str(export_dir), backend="onnx", device="cpu", model_kwargs=model_kwargs, **kwargs)
+
+
+def _load_torch_int8(model_name: str, **kwargs: Any) -> SentenceTransformer:
+    model = SentenceTransformer(model_name, device="cpu", **kwargs)
+    quantize_torch_dynamic(model)
+    return model
+
+
+def load_sentence_transformer(
+    model_name: str,
+    quantization: Quantization | None = None,
+    cache_dir: str | Path | None = None,
+    quantization_config: str | None = None,
+    **kwargs: Any,
+) -> SentenceTransformer:
+    """
+    Load a 'SentenceTransformer', optionally quantized to int8 for CPU inference.
+
+    :param model_name: Name or path of the model
+    :param quantization: None for the fp32 model, 'onnx-int8' or 'torch-int8'
+    :param cache_dir: Where the quantized ONNX export is stored; defaults to '~/.cache/conversational_toolkit/onnx'
+    :param quantization_config: ONNX Runtime preset ('avx2', 'avx512', 'avx512_vnni', 'arm64'); detected from the CPU when not given
+    :param kwargs: Passed on to 'SentenceTransformer'
+    """
+    if quantization is None:
+        return SentenceTransformer(model_name, **kwargs)
+    if kwargs.pop("device", "cpu") != "cpu":
+        logger.warning(f"Quantized {model_name} runs on CPU, ignoring the requested device")
+
+    if quantization == "onnx-int8":
+        try:
+            return _load_onnx_int8(
+                model_name,
+                Path(cache_dir) if cache_dir is not None else DEFAULT_ONNX_CACHE_DIR,
+                quantization_config or default_onnx_quantization_config(),
+                **kwargs,
+            )
+        except ImportError as e:
+            logger.warning(f"ONNX int8 backend unavailable ({e}), falling back to torch dynamic quantization")
+        return _load_torch_int8(model_name, **kwargs)
+    if quantization == "torch-int8":
+        return _load_torch_int8(model_name, **kwargs)
+    raise ValueError(f"Unknown quantization {quantization!r}, expected 'onnx-int8' or 'torch-int8'")
+
+
+class QuantizationReport(BaseModel):
+    """
+    Agreement between a quantized model and its fp32 reference on a retrieval task.
+
+    Attributes:
+        k: Cutoff of the top-k lists.
+        recall_at_k: Mean fraction of the fp32 top k that the quantized model also ranks in its top k.
+        per_query_recall: The same fraction for each query.
+        mean_cosine: Mean cosine similarity between the fp32 and quantized embedding of the same text.
+        reference_seconds: Time the fp32 model took to embed the queries and the corpus.
+        quantized_seconds: Time the quantized model took for the same inputs.
+    """
+
+    k: int
+    recall_at_k: float
+    per_query_recall: list[float]
+    mean_cosine: float
+    reference_seconds: float
+    quantized_seconds: float
+
+    @property
+    def speedup(self) -> float:
+        return self.reference_seconds / self.quantized_seconds if self.quantized_seconds else 0.0
+
+
+def _normalize(embeddings: NDArray[Any]) -> NDArray[np.float64]:
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1.0, norms)
+
+
+def _top_k(queries: NDArray[np.float64], corpus: NDArray[np.float64], k: int) -> NDArray[np.int64]:
+    # Only the membership of the top k matters, not its order
+    return np.argpartition(-(queries @ corpus.T), k - 1, axis=1)[:, :k]
+
+
+async def _timed_embed(model: EmbeddingsModel, texts: list[str]) -> tuple[NDArray[np.float64], float]:
+    start = time.perf_counter()
+    embeddings = await model.get_embeddings(texts)
+    return _normalize(embeddings), time.perf_counter() - start
+
+
+async def compare_quantized_recall(
+    reference: EmbeddingsModel, quantized: EmbeddingsModel, queries: list[str], corpus: list[str], k: int = 10
+) -> QuantizationReport:
+    """
+    Check how well a quantized model preserves the retrieval results of its fp32 reference.
+
+    Both models embed 'queries' and 'corpus'; for each query the top 'k' corpus entries by cosine similarity are compared.
+
+    :param reference: The fp32 model
+    :param quantized: The quantized model
+    :param queries: Evaluation queries, e.g. 'EVALUATION_QUERIES' of the backend
+    :param corpus: Texts to retrieve from, typically the chunk contents of the vector store
+    :param k: Cutoff of the top-k lists
+    """
+    if not queries or not corpus:
+        raise ValueError("Need at least one query and one corpus entry")
+    k = min(k, len(corpus))
+
+    reference_queries, reference_query_seconds = await _timed_embed(reference, queries)
+    reference_corpus, reference_corpus_seconds = await _timed_embed(reference, corpus)
+    quantized_queries, quantized_query_seconds = await _timed_embed(quantized, queries)
+    quantized_corpus, quantized_corpus_seconds = await _timed_embed(quantized, corpus)
+
+    reference_top = _top_k(reference_queries, reference_corpus, k)
+    quantized_top = _top_k(quantized_queries, quantized_corpus, k)
+    per_query = [len(set(r) & set(q)) / k for r, q in zip(reference_top.tolist(), quantized_top.tolist())]
+
+    cosines = np.concatenate(
+        [
+            np.sum(reference_queries * quantized_queries, axis=1),
+            np.sum(reference_corpus * quantized_corpus, axis=1),
+        ]
+    )
+    report = QuantizationReport(
+        k=k,
+        recall_at_k=float(np.mean(per_query)),
+        per_query_recall=per_query,
+        mean_cosine=float(np.mean(cosines)),
+        reference_seconds=reference_query_seconds + reference_corpus_seconds,
+        quantized_seconds=quantized_query_seconds + quantized_corpus_seconds,
+    )
+    logger.info(
+        f"Quantized recall@{k}: {report.recall_at_k:.3f}, mean cosine to fp32: {report.mean_cosine:.4f}, "
+        f"speedup: {report.speedup:.2f}x"
+    )
+    return report
@@ -3,7 +3,7 @@
 
 import io
 import base64
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 import numpy as np
 import torch
@@ -23,6 +23,8 @@ from transformers.modeling_outputs import ModelOutput
 
 from conversational_toolkit.chunking.base import Chunk
 from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.embeddings.micro_batcher import MicroBatcher
+from conversational_toolkit.embeddings.quantization import quantize_torch_dynamic
 
 
 # --- Minimal "embedding-only" model head (matches the HF repo script idea) ---
@@ -235,7 +237,18 @@ class Qwen3VLEmbeddings(EmbeddingsModel):
         torch_dtype: torch.dtype | None = None,  # e.g. torch.float16
         attn_implementation: str | None = None,  # e.g. "flash_attention_2"
         device: str | None = None,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        quantization: Literal["torch-int8"]
+        | None = None,  # int8 CPU inference; ONNX export is not supported for this model
     ):
+        self.model_name = f"{model_name_or_path}@{quantization}" if quantization else model_name_or_path
+        self.dimensions = output_dim
+        if quantization is not None:
+            if quantization != "torch-int8":
+                raise ValueError(f"Unsupported quantization {quantization!r} for Qwen3-VL, use 'torch-int8'")
+            # Dynamic quantization runs fp32 activations on CPU
+            device, torch_dtype = "cpu", torch.float32
         self.embedder = _Qwen3VLEmbedder(
             model_name_or_path=model_name_or_path,
             instruction=instruction,
@@ -245,13 +258,20 @@ class Qwen3VLEmbeddings(EmbeddingsModel):
             attn_implementation=attn_implementation,
             device=device,
         )
+        if quantization is not None:
+            quantize_torch_dynamic(self.embedder.model)
+        # Concurrent requests share one forward pass, run off the event loop
+        self.batcher: MicroBatcher[dict] = MicroBatcher(
+            lambda items: self.embedder.encode(items).detach().cpu().numpy(),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+        )
 
     async def get_text_embeddings(self, texts: str | list[str]) -> np.ndarray:
         if isinstance(texts, str):
             texts = [texts]
         items = [{"text": t} for t in texts]
-        emb = self.embedder.encode(items)
-        return emb.detach().cpu().numpy()
+        return await self.batcher.submit(items)
 
     async def get_image_embeddings(self, images: str | list[str]) -> np.ndarray:
         if isinstance(images, str):
@@ -264,10 +284,9 @@ class Qwen3VLEmbeddings(EmbeddingsModel):
             decoded_images.append(img)
 
         items = [{"image": im, "text": ""} for im in decoded_images]
-        emb = self.embedder.encode(items)
-        return emb.detach().cpu().numpy()
+        return await self.batcher.submit(items)
 
-    async def get_embeddings(self, chunks: str | Chunk | list[Chunk]) -> np.ndarray:
+    async def get_embeddings(self, chunks: str | Chunk | list[str] | list[Chunk]) -> np.ndarray:
         if isinstance(chunks, str):
             chunks = [Chunk(content=chunks, mime_type="text/plain", title="Query")]
 
@@ -276,7 +295,10 @@ class Qwen3VLEmbeddings(EmbeddingsModel):
 
         items: list[dict] = []
         for chunk in chunks:
-            if chunk.mime_type.startswith("text"):
+            if isinstance(chunk, str):
+                # Batched text queries (e.g. from 'VectorStoreRetriever.retrieve_many')
+                items.append({"text": chunk})
+            elif chunk.mime_type.startswith("text"):
                 items.append({"text": chunk.content})
             elif chunk.mime_type.startswith("image"):
                 # chunk.content is base64 in your current design
@@ -286,5 +308,4 @@ class Qwen3VLEmbeddings(EmbeddingsModel):
             else:
                 raise ValueError(f"Unknown Data Type: {chunk.mime_type}")
 
-        emb = self.embedder.encode(items)
-        return emb.detach().cpu().numpy()
+        return await self.batcher.submit(items)
@@ -1,9 +1,13 @@
+from pathlib import Path
 from typing import Union, Any
 from loguru import logger
 from numpy._typing import NDArray
 from sentence_transformers.models import Transformer, Pooling
 from sentence_transformers import SentenceTransformer
 from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.embeddings.micro_batcher import MicroBatcher
+from conversational_toolkit.embeddings.quantization import Quantization, load_sentence_transformer
+from conversational_toolkit.utils.executors import run_in_thread
 import numpy as np
 
 
@@ -47,20 +51,58 @@ class CustomizeSentenceTransformer(SentenceTransformer):  # type:ignore
 
 
 class SentenceTransformerEmbeddings(EmbeddingsModel):
-    def __init__(self, model_name: str, **kwargs: Any):
-        self.model_name = model_name
-        self.model = SentenceTransformer(model_name, **kwargs)
+    """
+    Local 'sentence-transformers' embeddings model.
+
+    Forward passes run in the shared thread pool, so they do not block the event loop. Concurrent calls without encode arguments (typically single queries from parallel requests) are merged into one padded batch by a 'MicroBatcher'.
+
+    With 'quantization' set, the model runs on CPU with int8 weights, either exported to ONNX Runtime ('onnx-int8') or through PyTorch dynamic quantization ('torch-int8', also the fallback when ONNX Runtime is not installed). See 'compare_quantized_recall' to check the retrieval quality against the fp32 model.
+
+    Attributes:
+        model_name: Name or path of the model, suffixed with the quantization (e.g. '...@onnx-int8') so 'CachedEmbeddings' keeps its vectors apart.
+        dimensions: Dimensionality of the embeddings.
+        batcher: The micro-batcher in front of 'model.encode'.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        quantization: Quantization | None = None,
+        onnx_cache_dir: str | Path | None = None,
+        **kwargs: Any,
+    ):
+        """
+        :param model_name: Name or path of the model
+        :param max_batch_size: Maximum number of texts merged into one forward pass
+        :param max_wait_ms: How long to wait for concurrent requests to join a batch
+        :param quantization: None for fp32 inference, 'onnx-int8' or 'torch-int8' for int8 CPU inference
+        :param onnx_cache_dir: Where the quantized ONNX export is stored
+        :param kwargs: Passed on to 'SentenceTransformer'
+        """
+        self.model_name = f"{model_name}@{quantization}" if quantization else model_name
+        self.model = load_sentence_transformer(model_name, quantization, cache_dir=onnx_cache_dir, **kwargs)
         self.model.eval()
-        logger.debug(f"Sentence Transformer embeddings model loaded: {model_name} with kwargs: {kwargs}")
+        self.dimensions = self.model.get_sentence_embedding_dimension()
+        self.batcher: MicroBatcher[str] = MicroBatcher(
+            # Requests larger than 'max_batch_size' reach 'encode' whole; keep their forward passes bounded
+            lambda texts: self.model.encode(texts, batch_size=min(len(texts), self.batcher.max_batch_size)),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+        )
+        logger.debug(f"Sentence Transformer embeddings model loaded: {self.model_name} with kwargs: {kwargs}")
 
     async def get_embeddings(self, texts: Union[str, list[str]], **kwargs_encode: Any) -> NDArray[np.float64]:
         """Encode a string or a list of strings into embeddings using the model."""
-        # Encode the texts using the model
-        embedded_chunk = self.model.encode(texts, **kwargs_encode)
-
-        # If a single string is given, convert the output to a numpy array of numpy arrays
         if isinstance(texts, str):
-            embedded_chunk = np.array([embedded_chunk])
+            texts = [texts]
+
+        if kwargs_encode:
+            # Custom encode arguments cannot be shared with other requests, so this call gets its own pass
+            embedded_chunk = await run_in_thread(self.model.encode, texts, **kwargs_encode)
+        else:
+            embedded_chunk = await self.batcher.submit(texts)
 
         logger.debug(f"{self.model_name} embeddings size: {embedded_chunk.shape}")
         return embedded_chunk  # type: ignore
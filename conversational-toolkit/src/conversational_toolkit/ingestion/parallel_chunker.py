@@ -0,0 +1,193 @@
+"""
+Parallel, cached document chunking.
+
+'ParallelChunker' runs the format-specific chunkers ('PDFChunker', 'ExcelChunker', ...) in a pool of worker processes, so that the CPU-heavy PDF conversion of a document collection scales with the number of cores. Each worker receives its own copy of the chunkers and calls 'Chunker.warm_up' once at start-up, so the docling models are loaded once per worker instead of once per file.
+
+Chunker output is cached on disk, one JSON file per document, keyed by the SHA-256 of the file content and the chunker configuration (class and 'make_chunks' arguments). Unchanged files are served from the cache without being submitted to the pool; changing a file or the chunker settings invalidates its entry.
+
+'iter_chunks' yields the chunks of each file as soon as it is done, so downstream stages (embedding, insertion) can start before the whole collection is converted; 'chunk_files' is the blocking equivalent.
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+from collections.abc import AsyncIterator, Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from conversational_toolkit.chunking.base import Chunk, Chunker
+from conversational_toolkit.utils.executors import run_in_thread
+
+# Bump to invalidate every cache entry after a change in the cached format
+_CACHE_VERSION = 1
+
+# Chunkers of the current worker process, set by '_init_worker'
+_worker_chunkers: dict[str, Chunker] = {}
+_worker_kwargs: dict[str, dict[str, Any]] = {}
+
+
+def _init_worker(chunkers: Mapping[str, Chunker], chunker_kwargs: dict[str, dict[str, Any]]) -> None:
+    _worker_chunkers.update(chunkers)
+    _worker_kwargs.update(chunker_kwargs)
+    for extension, chunker in chunkers.items():
+        try:
+            chunker.warm_up(**chunker_kwargs.get(extension, {}))
+        except Exception as e:
+            logger.warning(f"Warm-up of {type(chunker).__name__} failed in worker {os.getpid()}: {e}")
+
+
+def _chunk_in_worker(file_path: str, extension: str) -> list[Chunk]:
+    return _worker_chunkers[extension].make_chunks(file_path, **_worker_kwargs.get(extension, {}))
+
+
+class ParallelChunker:
+    """
+    Chunk many files concurrently in worker processes, with an on-disk cache per file.
+
+    Attributes:
+        chunkers: Chunker per lower-case file extension (e.g. '.pdf').
+        chunker_kwargs: Extra 'make_chunks' (and 'warm_up') arguments per extension, e.g. '{".pdf": {"write_images": False}}'.
+        cache_dir: Directory of the chunk cache, or None to disable caching.
+        max_workers: Size of the process pool (defaults to the number of CPUs).
+    """
+
+    def __init__(
+        self,
+        chunkers: Mapping[str, Chunker],
+        cache_dir: str | None = None,
+        max_workers: int | None = None,
+        chunker_kwargs: dict[str, dict[str, Any]] | None = None,
+    ) -> None:
+        self.chunkers = chunkers
+        self.chunker_kwargs = chunker_kwargs or {}
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """The worker pool, started on first use and kept warm across calls."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                # 'spawn' keeps workers independent of threads and native libraries loaded in the parent
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.chunkers, self.chunker_kwargs),
+            )
+            logger.debug(f"Started chunking pool with {self.max_workers} workers")
+        return self._executor
+
+    def cache_key(self, file_path: Path) -> str:
+        """SHA-256 of the file content and the configuration of the chunker that handles it."""
+        extension = file_path.suffix.lower()
+        chunker = self.chunkers[extension]
+        settings = json.dumps(
+            {
+                "version": _CACHE_VERSION,
+                "chunker": f"{type(chunker).__module__}.{type(chunker).__qualname__}",
+                "kwargs": self.chunker_kwargs.get(extension, {}),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha256(settings.encode("utf-8"))
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _load_cached(self, key: str) -> list[Chunk] | None:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self.cache_dir / f"{key}.json", "r", encoding="utf-8") as f:
+                return [Chunk.model_validate(chunk) for chunk in json.load(f)]
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.warning(f"Ignoring corrupt chunk cache entry {key}: {e}")
+            return None
+
+    def _store_cached(self, key: str, chunks: list[Chunk]) -> None:
+        if self.cache_dir is None:
+            return
+        tmp_path = self.cache_dir / f"{key}.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([chunk.model_dump(mode="json") for chunk in chunks], f)
+        os.replace(tmp_path, self.cache_dir / f"{key}.json")
+
+    def _submit(
+        self, file_paths: list[Path]
+    ) -> tuple[dict[Path, list[Chunk]], dict[Future[list[Chunk]], tuple[Path, str]]]:
+        """Split 'file_paths' into cache hits and futures for the files that must be converted."""
+        cached: dict[Path, list[Chunk]] = {}
+        futures: dict[Future[list[Chunk]], tuple[Path, str]] = {}
+        for file_path in file_paths:
+            extension = file_path.suffix.lower()
+            if extension not in self.chunkers:
+                logger.warning(f"No chunker for {extension!r}, skipping {file_path.name}")
+                continue
+            key = self.cache_key(file_path)
+            chunks = self._load_cached(key)
+            if chunks is not None:
+                cached[file_path] = chunks
+            else:
+                futures[self._pool().submit(_chunk_in_worker, str(file_path), extension)] = (file_path, key)
+        logger.info(f"Chunking {len(futures)} files ({len(cached)} unchanged, served from cache)")
+        return cached, futures
+
+    def _collect(
+        self, future: Future[list[Chunk]] | asyncio.Future[list[Chunk]], file_path: Path, key: str
+    ) -> list[Chunk] | None:
+        try:
+            chunks = future.result()
+        except Exception as e:
+            logger.warning(f"Skipping {file_path.name}: {e}")
+            return None
+        self._store_cached(key, chunks)
+        logger.debug(f"  {file_path.name}: {len(chunks)} chunks")
+        return chunks
+
+    def iter_chunks_sync(self, file_paths: list[Path]) -> Iterator[tuple[Path, list[Chunk]]]:
+        """Yield '(file_path, chunks)' per file: cache hits first, then conversions in order of completion."""
+        cached, futures = self._submit(file_paths)
+        yield from cached.items()
+        for future in as_completed(futures):
+            file_path, key = futures[future]
+            chunks = self._collect(future, file_path, key)
+            if chunks is not None:
+                yield file_path, chunks
+
+    async def iter_chunks(self, file_paths: list[Path]) -> AsyncIterator[tuple[Path, list[Chunk]]]:
+        """Async version of 'iter_chunks_sync': hashes files and waits for the workers without blocking the event loop."""
+        cached, futures = await run_in_thread(self._submit, file_paths)
+        for file_path, chunks in cached.items():
+            yield file_path, chunks
+
+        tasks = {asyncio.wrap_future(future): location for future, location in futures.items()}
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                file_path, key = tasks[task]
+                chunks = self._collect(task, file_path, key)
+                if chunks is not None:
+                    yield file_path, chunks
+
+    def chunk_files(self, file_paths: list[Path]) -> dict[Path, list[Chunk]]:
+        """Chunk every file and return the chunks per file, in the order of 'file_paths'. Failed files are left out."""
+        chunks_by_file = dict(self.iter_chunks_sync(file_paths))
+        return {file_path: chunks_by_file[file_path] for file_path in file_paths if file_path in chunks_by_file}
+
+    def close(self) -> None:
+        """Shut the worker pool down."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
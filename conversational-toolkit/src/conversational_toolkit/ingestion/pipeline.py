@@ -0,0 +1,213 @@
+"""
+Pipelined embedding and insertion of chunks into a vector store.
+
+'IngestionPipeline' overlaps the two slow stages of ingestion: embedding (network-bound for hosted models such as 'OpenAIEmbeddings') and insertion (disk- or database-bound). It runs three kinds of tasks connected by bounded queues:
+
+    producer    packs the incoming chunks into batches of at most 'max_batch_tokens' estimated tokens and 'max_batch_size' chunks
+    embedders   'concurrency' tasks, each with one embedding request in flight
+    writer      a single task calling 'VectorStore.insert_chunks', so the store never sees concurrent writes
+
+The queues are bounded, so the producer stops reading input while the embedders are busy and memory stays flat for arbitrarily long chunk streams (e.g. 'ParallelChunker.iter_chunks'). Progress is logged after every inserted batch and summarised in an 'IngestionReport' (chunks/s, tokens/s).
+
+Token counts are estimated from the content length ('estimate_tokens') rather than with a tokenizer, erring on the high side so a packed batch stays below the provider's per-request limit.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterable, Callable, Iterable
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.utils.tokens import estimate_token_count
+from conversational_toolkit.vectorstores.base import VectorStore
+
+
+def estimate_tokens(chunk: Chunk) -> int:
+    """Upper estimate of the number of tokens the embedding model sees for 'chunk'. Non-text chunks count as one."""
+    if not chunk.mime_type.startswith("text"):
+        return 1
+    return estimate_token_count(chunk.content)
+
+
+class IngestionReport(BaseModel):
+    """
+    Outcome of an 'IngestionPipeline.run'.
+
+    Attributes:
+        chunk_ids: IDs assigned by the vector store, in the order of the input chunks.
+        chunks: Number of chunks inserted.
+        tokens: Estimated number of tokens embedded.
+        batches: Number of embedding requests.
+        seconds: Wall-clock duration of the run.
+    """
+
+    chunk_ids: list[str] = []
+    chunks: int = 0
+    tokens: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.seconds if self.seconds > 0 else 0.0
+
+
+class _Batch:
+    __slots__ = ("chunks", "embeddings", "offset", "tokens")
+
+    def __init__(self, offset: int, chunks: list[Chunk], tokens: int) -> None:
+        self.offset = offset
+        self.chunks = chunks
+        self.tokens = tokens
+        self.embeddings: Any = None
+
+
+class IngestionPipeline:
+    """
+    Embed chunks with several requests in flight and insert them through a single writer.
+
+    Attributes:
+        embedding_model: Model used to embed the chunks.
+        vector_store: Store the embedded chunks are inserted into.
+        concurrency: Number of embedding requests in flight.
+        max_batch_tokens: Token budget per embedding request (estimated with 'estimate_tokens').
+        max_batch_size: Maximum number of chunks per embedding request.
+        on_insert: Optional callback with the chunks and IDs of every inserted batch, e.g. to update a 'BM25Retriever'.
+    """
+
+    def __init__(
+        self,
+        embedding_model: EmbeddingsModel,
+        vector_store: VectorStore,
+        concurrency: int = 4,
+        max_batch_tokens: int = 100_000,
+        max_batch_size: int = 100,
+        on_insert: Callable[[list[Chunk], list[str]], None] | None = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.embedding_model = embedding_model
+        self.vector_store = vector_store
+        self.concurrency = concurrency
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.on_insert = on_insert
+
+    async def _produce(
+        self, chunks: Iterable[Chunk] | AsyncIterable[Chunk], embed_queue: "asyncio.Queue[_Batch | None]"
+    ) -> None:
+        offset = 0
+        batch: list[Chunk] = []
+        batch_tokens = 0
+
+        async def flush() -> None:
+            nonlocal offset, batch, batch_tokens
+            if batch:
+                await embed_queue.put(_Batch(offset, batch, batch_tokens))
+                offset += len(batch)
+                batch, batch_tokens = [], 0
+
+        async def source() -> AsyncIterable[Chunk]:
+            if isinstance(chunks, AsyncIterable):
+                async for chunk in chunks:
+                    yield chunk
+            else:
+                for chunk in chunks:
+                    yield chunk
+
+        async for chunk in source():
+            tokens = estimate_tokens(chunk)
+            if batch and (batch_tokens + tokens > self.max_batch_tokens or len(batch) >= self.max_batch_size):
+                await flush()
+            batch.append(chunk)
+            batch_tokens += tokens
+        await flush()
+
+        for _ in range(self.concurrency):
+            await embed_queue.put(None)
+
+    async def _embed(
+        self, embed_queue: "asyncio.Queue[_Batch | None]", insert_queue: "asyncio.Queue[_Batch | None]"
+    ) -> None:
+        while (batch := await embed_queue.get()) is not None:
+            # Text embeddings need content strings; multimodal embeddings need Chunk objects
+            if all(c.mime_type.startswith("text") for c in batch.chunks):
+                batch.embeddings = await self.embedding_model.get_embeddings([c.content for c in batch.chunks])
+            else:
+                batch.embeddings = await self.embedding_model.get_embeddings(batch.chunks)  # type: ignore[arg-type]
+            await insert_queue.put(batch)
+        await insert_queue.put(None)
+
+    async def _write(
+        self, insert_queue: "asyncio.Queue[_Batch | None]", report: IngestionReport, total: int | None, start: float
+    ) -> dict[int, list[str]]:
+        ids_by_offset: dict[int, list[str]] = {}
+        finished_embedders = 0
+        while finished_embedders < self.concurrency:
+            batch = await insert_queue.get()
+            if batch is None:
+                finished_embedders += 1
+                continue
+
+            chunk_ids = await self.vector_store.insert_chunks(chunks=batch.chunks, embedding=batch.embeddings)
+            ids_by_offset[batch.offset] = chunk_ids
+            if self.on_insert is not None:
+                self.on_insert(batch.chunks, chunk_ids)
+
+            report.chunks += len(batch.chunks)
+            report.tokens += batch.tokens
+            report.batches += 1
+            elapsed = max(time.perf_counter() - start, 1e-9)
+            progress = f"{report.chunks}/{total}" if total is not None else str(report.chunks)
+            logger.info(
+                f"Inserted {progress} chunks ({report.chunks / elapsed:.1f} chunks/s, {report.tokens / elapsed:.0f} tokens/s)"
+            )
+        return ids_by_offset
+
+    async def run(self, chunks: Iterable[Chunk] | AsyncIterable[Chunk]) -> IngestionReport:
+        """
+        Embed and insert 'chunks'.
+
+        :param chunks: The chunks to ingest; a list, any iterable, or an async iterable
+        :return: The inserted IDs in input order and throughput statistics
+        """
+        report = IngestionReport()
+        total = len(chunks) if isinstance(chunks, list) else None
+        # Room for one batch per embedder to wait, so the producer stays just ahead of the requests
+        embed_queue: asyncio.Queue[_Batch | None] = asyncio.Queue(maxsize=self.concurrency)
+        insert_queue: asyncio.Queue[_Batch | None] = asyncio.Queue(maxsize=self.concurrency)
+
+        start = time.perf_counter()
+        writer = asyncio.create_task(self._write(insert_queue, report, total, start))
+        tasks = [
+            asyncio.create_task(self._produce(chunks, embed_queue)),
+            *(asyncio.create_task(self._embed(embed_queue, insert_queue)) for _ in range(self.concurrency)),
+            writer,
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # A failing stage would leave the others waiting on a queue forever
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        # Stores that buffer writes ('HNSWVectorStore') persist once per run instead of per batch
+        await self.vector_store.save()
+        report.seconds = time.perf_counter() - start
+
+        ids_by_offset = writer.result()
+        report.chunk_ids = [chunk_id for offset in sorted(ids_by_offset) for chunk_id in ids_by_offset[offset]]
+        logger.info(
+            f"Ingested {report.chunks} chunks in {report.batches} batches and {report.seconds:.1f}s "
+            f"({report.chunks_per_second:.1f} chunks/s, {report.tokens_per_second:.0f} tokens/s)"
+        )
+        return report
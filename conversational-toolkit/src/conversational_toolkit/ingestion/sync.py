@@ -0,0 +1,275 @@
+"""
+Incremental re-ingestion of a document collection into a vector store.
+
+'VectorStoreSync' keeps a JSON manifest next to the vector store that records, per source file, the hash of the file (the 'ParallelChunker' cache key, which also covers the chunker settings) and the hashes of its chunks together with the IDs under which they are stored:
+
+    {"<source_file>": {"file_hash": "...", "chunks": {"<chunk_hash>": ["<chunk_id>", ...]}}}
+
+On 'sync', files whose hash is unchanged are skipped without being chunked. A changed file is re-chunked and its chunks are diffed against the manifest by content hash (title, content, MIME type and metadata): chunks that are already stored keep their IDs, only new chunks are embedded and inserted, and stored chunks that no longer occur are deleted. Files that were ingested before but are no longer part of the collection are tombstoned, i.e. all their chunks are deleted and their manifest entry is dropped.
+
+Only the 'VectorStore' interface ('insert_chunks' / 'delete_chunks') is used, so the sync works for every backend. Secondary indexes over the store ('BM25Retriever', 'ChunkAdjacencyIndex') are kept in step through their 'add_chunks' / 'remove_chunks' methods and, like the store itself, persisted with 'save' once at the end of 'sync' / 'remove_files'.
+
+New chunks are inserted before stale ones are deleted. While a file is being updated its manifest entry is marked as pending (no file hash) and lists both its previously stored chunks and every batch inserted so far, saved as each batch lands. A sync interrupted while inserting or deleting therefore leaves no untracked chunks behind: the next run re-processes the file, keeps the chunks that were already inserted and deletes the stale ones.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any, Protocol
+
+from loguru import logger
+from pydantic import BaseModel
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.ingestion.parallel_chunker import ParallelChunker
+from conversational_toolkit.ingestion.pipeline import IngestionPipeline
+from conversational_toolkit.utils.executors import run_in_thread
+from conversational_toolkit.vectorstores.base import ChunkRecord, VectorStore
+
+
+class ChunkIndex(Protocol):
+    """A secondary index over the chunks of a vector store, e.g. 'BM25Retriever' or 'ChunkAdjacencyIndex'."""
+
+    def add_chunks(self, chunks: list[ChunkRecord]) -> None: ...
+
+    def remove_chunks(self, chunk_ids: list[str]) -> None: ...
+
+    async def save(self) -> None: ...
+
+
+class SyncReport(BaseModel):
+    """
+    Outcome of a 'VectorStoreSync.sync' run.
+
+    Attributes:
+        unchanged_files: Files skipped because their hash did not change.
+        updated_files: Files that were (re-)chunked and diffed.
+        removed_files: Files tombstoned because they are no longer in the collection.
+        kept_chunks: Chunks of updated files that were already stored.
+        inserted_chunks: Chunks that were embedded and inserted.
+        deleted_chunks: Stale chunks that were deleted.
+    """
+
+    unchanged_files: int = 0
+    updated_files: int = 0
+    removed_files: int = 0
+    kept_chunks: int = 0
+    inserted_chunks: int = 0
+    deleted_chunks: int = 0
+
+
+def chunk_hash(chunk: Chunk) -> str:
+    """SHA-256 of everything that is stored for a chunk, except its ID and embedding."""
+    payload = json.dumps(
+        [chunk.title, chunk.content, chunk.mime_type, chunk.metadata], sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class VectorStoreSync:
+    """
+    Bring a vector store in line with a collection of files, re-embedding only what changed.
+
+    Attributes:
+        vector_store: The store to update.
+        embedding_model: Model used to embed new chunks.
+        manifest_path: JSON file recording the stored chunk IDs per file and chunk hash.
+        indexes: Secondary indexes updated together with the store.
+        batch_size: Maximum number of chunks embedded and inserted per call.
+        concurrency: Number of embedding requests in flight ('IngestionPipeline').
+        manifest: The loaded manifest.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        embedding_model: EmbeddingsModel,
+        manifest_path: str,
+        indexes: Sequence[ChunkIndex] = (),
+        batch_size: int = 64,
+        concurrency: int = 4,
+    ) -> None:
+        self.vector_store = vector_store
+        self.embedding_model = embedding_model
+        self.manifest_path = Path(manifest_path)
+        self.indexes = list(indexes)
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.manifest: dict[str, dict[str, Any]] = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def _save_manifest(self) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _add_to_indexes(self, chunks: list[Chunk], chunk_ids: list[str]) -> None:
+        records = [
+            ChunkRecord(id=chunk_id, embedding=[], **chunk.model_dump()) for chunk_id, chunk in zip(chunk_ids, chunks)
+        ]
+        for index in self.indexes:
+            index.add_chunks(records)
+
+    async def _persist(self) -> None:
+        await self.vector_store.save()
+        for index in self.indexes:
+            await index.save()
+
+    async def _insert(
+        self, chunks: list[Chunk], on_insert: Callable[[list[Chunk], list[str]], None] | None = None
+    ) -> list[str]:
+        """Embed and insert 'chunks', update the indexes and return the new IDs in order.
+
+        'on_insert' is called after every inserted batch, once the indexes are updated.
+        """
+        if not chunks:
+            return []
+
+        def inserted(batch: list[Chunk], chunk_ids: list[str]) -> None:
+            self._add_to_indexes(batch, chunk_ids)
+            if on_insert is not None:
+                on_insert(batch, chunk_ids)
+
+        pipeline = IngestionPipeline(
+            self.embedding_model,
+            self.vector_store,
+            concurrency=self.concurrency,
+            max_batch_size=self.batch_size,
+            on_insert=inserted,
+        )
+        return (await pipeline.run(chunks)).chunk_ids
+
+    async def _delete(self, chunk_ids: list[str]) -> None:
+        if not chunk_ids:
+            return
+        await self.vector_store.delete_chunks(chunk_ids)
+        for index in self.indexes:
+            index.remove_chunks(chunk_ids)
+
+    async def _sync_file(self, source: str, file_hash: str, chunks: list[Chunk], report: SyncReport) -> None:
+        """Diff the new 'chunks' of 'source' against the manifest and apply the difference."""
+        stored: dict[str, list[str]] = {
+            h: list(ids) for h, ids in self.manifest.get(source, {}).get("chunks", {}).items()
+        }
+
+        updated: dict[str, list[str]] = {}
+        new_chunks: list[tuple[str, Chunk]] = []
+        for chunk in chunks:
+            h = chunk_hash(chunk)
+            # Diff as a multiset: two identical chunks in one file need two stored copies
+            if stored.get(h):
+                updated.setdefault(h, []).append(stored[h].pop())
+            else:
+                new_chunks.append((h, chunk))
+        stale_ids = [chunk_id for ids in stored.values() for chunk_id in ids]
+
+        # Everything of this file that is in the store while it is being updated: the previously stored chunks plus
+        # each batch as soon as it is inserted. No file hash, so the next run re-processes an interrupted update.
+        pending: dict[str, list[str]] = {
+            h: list(ids) for h, ids in self.manifest.get(source, {}).get("chunks", {}).items()
+        }
+
+        def record_batch(batch: list[Chunk], chunk_ids: list[str]) -> None:
+            for chunk, chunk_id in zip(batch, chunk_ids):
+                pending.setdefault(chunk_hash(chunk), []).append(chunk_id)
+            self.manifest[source] = {"file_hash": None, "chunks": pending}
+            self._save_manifest()
+
+        new_ids = await self._insert([chunk for _, chunk in new_chunks], on_insert=record_batch)
+        for (h, _), chunk_id in zip(new_chunks, new_ids):
+            updated.setdefault(h, []).append(chunk_id)
+        if stale_ids:
+            if not new_chunks:
+                # Nothing was inserted, so the file is not marked as pending yet
+                self.manifest[source] = {"file_hash": None, "chunks": pending}
+                self._save_manifest()
+            await self._delete(stale_ids)
+
+        self.manifest[source] = {"file_hash": file_hash, "chunks": updated}
+        self._save_manifest()
+
+        report.updated_files += 1
+        report.kept_chunks += len(chunks) - len(new_chunks)
+        report.inserted_chunks += len(new_chunks)
+        report.deleted_chunks += len(stale_ids)
+        logger.debug(
+            f"  {source}: {len(chunks) - len(new_chunks)} kept, {len(new_chunks)} inserted, {len(stale_ids)} deleted"
+        )
+
+    async def remove_files(self, sources: list[str]) -> int:
+        """
+        Tombstone files: delete all their chunks from the store and the indexes and drop them from the manifest.
+
+        :param sources: Manifest keys (source file paths) of the files to remove
+        :return: The number of deleted chunks
+        """
+        chunk_ids = [
+            chunk_id
+            for source in sources
+            for ids in self.manifest.get(source, {}).get("chunks", {}).values()
+            for chunk_id in ids
+        ]
+        await self._delete(chunk_ids)
+        for source in sources:
+            self.manifest.pop(source, None)
+        self._save_manifest()
+        await self._persist()
+        return len(chunk_ids)
+
+    async def sync(
+        self,
+        file_paths: list[Path],
+        chunker: ParallelChunker,
+        prepare: Callable[[Path, list[Chunk]], None] | None = None,
+        remove_missing: bool = True,
+    ) -> SyncReport:
+        """
+        Synchronise the store with 'file_paths'.
+
+        :param file_paths: The complete collection; files are identified by their path
+        :param chunker: Chunker used for new and changed files
+        :param prepare: Optional hook called with the fresh chunks of a file before diffing, e.g. to add metadata
+        :param remove_missing: Tombstone files that are in the manifest but not in 'file_paths'
+        :return: Counts of the files and chunks that were kept, inserted and deleted
+        """
+        report = SyncReport()
+        file_paths = [path for path in file_paths if path.suffix.lower() in chunker.chunkers]
+
+        file_hashes = dict(
+            zip(file_paths, await asyncio.gather(*(run_in_thread(chunker.cache_key, p) for p in file_paths)))
+        )
+        changed = [
+            path for path in file_paths if self.manifest.get(str(path), {}).get("file_hash") != file_hashes[path]
+        ]
+        report.unchanged_files = len(file_paths) - len(changed)
+        logger.info(f"Syncing {len(changed)} changed files ({report.unchanged_files} unchanged)")
+
+        try:
+            async for file_path, chunks in chunker.iter_chunks(changed):
+                if prepare is not None:
+                    prepare(file_path, chunks)
+                await self._sync_file(str(file_path), file_hashes[file_path], chunks, report)
+
+            if remove_missing:
+                missing = sorted(set(self.manifest) - {str(path) for path in file_paths})
+                if missing:
+                    report.deleted_chunks += await self.remove_files(missing)
+                    report.removed_files = len(missing)
+                    logger.info(f"Removed {len(missing)} files that are no longer in the collection")
+        finally:
+            # Persist the store and the indexes once per run (also after a failure, to match what is already in the store)
+            await self._persist()
+
+        logger.info(
+            f"Sync done: {report.inserted_chunks} chunks inserted, {report.deleted_chunks} deleted, "
+            f"{report.kept_chunks} kept"
+        )
+        return report
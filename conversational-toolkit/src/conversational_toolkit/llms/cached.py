@@ -0,0 +1,168 @@
+"""
+Exact-match completion cache for any 'LLM' backend.
+
+'CachedLLM' wraps an 'OpenAILLM', 'OllamaLLM' or 'LocalLLM' and returns the stored response when the same request is sent again. The cache key is a SHA-256 hash of the canonical JSON of everything that determines the completion: backend, model, messages, temperature, seed, tools, tool choice and response format. Utility calls (query rewriting, expansion, reranking prompts, routing) and evaluation re-runs therefore skip the network entirely.
+
+Entries live in a bounded in-memory LRU; with a 'cache_path' they are also written to a SQLite file, so the cache survives restarts. The LRU is served on the event loop; SQLite reads and writes run in the shared thread pool ('run_in_thread') on one connection guarded by a lock. Caching 'generate_stream' is opt-in: a cached stream is replayed chunk by chunk.
+
+Only wrap models whose output is effectively deterministic for a given request (fixed 'seed', low 'temperature'), otherwise the first sampled answer is frozen.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from loguru import logger
+
+from conversational_toolkit.llms.base import LLM, LLMMessage
+from conversational_toolkit.tools.base import Tool
+from conversational_toolkit.utils.executors import run_in_thread
+
+
+class CachedLLM(LLM):
+    """
+    LLM decorator that memoises completions.
+
+    Attributes:
+        llm: The wrapped backend.
+        max_entries: Capacity of the in-memory LRU tier.
+        cache_path: Optional SQLite file backing the in-memory tier.
+        cache_streams: Whether 'generate_stream' responses are cached as well.
+    """
+
+    def __init__(
+        self,
+        llm: LLM,
+        max_entries: int = 1024,
+        cache_path: str | None = None,
+        cache_streams: bool = False,
+    ) -> None:
+        self.llm = llm
+        self.max_entries = max_entries
+        self.cache_path = cache_path
+        self.cache_streams = cache_streams
+        self._memory: OrderedDict[str, list[LLMMessage]] = OrderedDict()
+
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        if cache_path is not None:
+            # Used from the thread pool, one statement at a time
+            self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+            )
+            self._connection.commit()
+
+    @property
+    def tools(self) -> list[Tool] | None:
+        # Not every backend runs 'LLM.__init__', so 'tools' may be missing
+        return getattr(self.llm, "tools", None)
+
+    @tools.setter
+    def tools(self, tools: list[Tool] | None) -> None:
+        self.llm.tools = tools
+
+    def cache_key(self, conversation: list[LLMMessage], stream: bool) -> str:
+        """Canonical hash of the request as the wrapped backend would send it."""
+        request = {
+            "backend": type(self.llm).__name__,
+            "model": getattr(self.llm, "model", None),
+            "temperature": getattr(self.llm, "temperature", None),
+            "seed": getattr(self.llm, "seed", None),
+            "tools": [tool.json_schema() for tool in getattr(self.llm, "tools", None) or []],
+            "tool_choice": getattr(self.llm, "tool_choice", None),
+            "response_format": getattr(self.llm, "response_format", None),
+            "messages": [message.model_dump(mode="json") for message in conversation],
+            "stream": stream,
+        }
+        canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def _get(self, key: str) -> list[LLMMessage] | None:
+        response = self._memory.get(key)
+        if response is not None:
+            self._memory.move_to_end(key)
+            return response
+
+        if self._connection is not None:
+            row = await run_in_thread(self._select, key)
+            if row is not None:
+                response = [LLMMessage.model_validate(message) for message in json.loads(row)]
+                self._remember(key, response)
+                return response
+        return None
+
+    def _select(self, key: str) -> str | None:
+        assert self._connection is not None
+        with self._lock:
+            row = self._connection.execute("SELECT response FROM completions WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _remember(self, key: str, response: list[LLMMessage]) -> None:
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def _put(self, key: str, response: list[LLMMessage]) -> None:
+        self._remember(key, response)
+        if self._connection is not None:
+            await run_in_thread(self._insert, key, [message.model_dump(mode="json") for message in response])
+
+    def _insert(self, key: str, messages: list[dict[str, Any]]) -> None:
+        assert self._connection is not None
+        payload = json.dumps(messages)
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO completions (key, response) VALUES (?, ?)", (key, payload))
+            self._connection.commit()
+
+    async def generate(self, conversation: list[LLMMessage]) -> LLMMessage:
+        """Return the cached completion for this exact request, or generate and cache it."""
+        key = self.cache_key(conversation, stream=False)
+        cached = await self._get(key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit for {key[:12]}")
+            return cached[0].model_copy(deep=True)
+
+        response = await self.llm.generate(conversation)
+        await self._put(key, [response])
+        return response
+
+    async def generate_stream(self, conversation: list[LLMMessage]) -> AsyncGenerator[LLMMessage, None]:
+        """Replay a cached stream, or forward the wrapped stream and cache it once fully consumed."""
+        if not self.cache_streams:
+            async for chunk in self.llm.generate_stream(conversation):
+                yield chunk
+            return
+
+        key = self.cache_key(conversation, stream=True)
+        cached = await self._get(key)
+        if cached is not None:
+            logger.debug(f"LLM stream cache hit for {key[:12]}")
+            for chunk in cached:
+                yield chunk.model_copy(deep=True)
+            return
+
+        chunks: list[LLMMessage] = []
+        async for chunk in self.llm.generate_stream(conversation):
+            chunks.append(chunk.model_copy(deep=True))
+            yield chunk
+        await self._put(key, chunks)
+
+    def clear(self) -> None:
+        """Drop every cached completion from both tiers."""
+        self._memory.clear()
+        if self._connection is not None:
+            with self._lock:
+                self._connection.execute("DELETE FROM completions")
+                self._connection.commit()
+
+    def close(self) -> None:
+        """Close the SQLite connection, if any."""
+        if self._connection is not None:
+            with self._lock:
+                self._connection.close()
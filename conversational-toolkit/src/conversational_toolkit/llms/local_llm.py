@@ -14,6 +14,7 @@ class LocalLLM(LLM):
         base_url: str = "",
         api_key: str = "",
     ):
+        super().__init__()
         self.client = AsyncOpenAI(base_url=base_url, api_key=api_key)
         self.model = model_name
         self.temperature = temperature
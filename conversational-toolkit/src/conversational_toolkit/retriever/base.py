@@ -4,9 +4,10 @@ Retriever abstractions.
 A retriever accepts a natural-language query and returns a ranked list of document chunks. 'Retriever' is generic over 'T_co' (covariant, bounded by 'Chunk') so that a 'Retriever[ChunkMatch]' can be assigned where a 'Retriever[ChunkRecord]' is expected without unsafe casts.
 
 Concrete implementations: 'VectorStoreRetriever', 'BM25Retriever', 'HybridRetriever',
-'RerankingRetriever'.
+'RerankingRetriever', 'CrossEncoderRerankingRetriever'.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import TypeVar, Generic
 
@@ -23,8 +24,11 @@ class Retriever(ABC, Generic[T_co]):
 
     Attributes:
         top_k: Maximum number of chunks to return per query.
+        max_concurrent_queries: Maximum number of 'retrieve' calls the default 'retrieve_many' runs at the same time.
     """
 
+    max_concurrent_queries: int = 8
+
     def __init__(self, top_k: int):
         self.top_k = top_k
 
@@ -32,3 +36,16 @@ class Retriever(ABC, Generic[T_co]):
     async def retrieve(self, query: str) -> list[T_co]:
         """Return up to 'top_k' chunks most relevant to 'query'."""
         pass
+
+    async def retrieve_many(self, queries: list[str]) -> list[list[T_co]]:
+        """Return one result list per query, in the same order as 'queries'.
+
+        The default calls 'retrieve' once per query, concurrently but at most 'max_concurrent_queries' at a time, so a long list of queries does not flood the backend. Retrievers that can batch the work (one embedding call and one vector store search for all queries) override it.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_queries)
+
+        async def retrieve(query: str) -> list[T_co]:
+            async with semaphore:
+                return await self.retrieve(query)
+
+        return list(await asyncio.gather(*[retrieve(query) for query in queries]))
@@ -0,0 +1,192 @@
+"""
+Incremental, persistent BM25 inverted index.
+
+'BM25Index' keeps one posting list per term (chunk ID -> term frequency), the length of every indexed chunk and a lazily recomputed IDF table. Chunks can be added and removed by ID without rebuilding the index, and the whole structure is saved as a single JSON file that loads in milliseconds at startup.
+
+A query only touches the posting lists of its own terms, so its cost is proportional to the number of matching postings rather than to the size of the corpus. Scoring is vectorised with NumPy: on first use after a change, each queried term's posting list is compiled into a pair of arrays (row numbers, precomputed BM25 weights) and cached. Per query the weights of all query terms are accumulated per row with 'np.unique' + 'np.bincount', and the best 'top_k' rows are selected with 'np.argpartition' instead of sorting every candidate.
+
+Scoring follows BM25 Okapi with the non-negative IDF variant used by Lucene, 'log(1 + (N - df + 0.5) / (df + 0.5))', so terms that occur in more than half of the chunks still contribute a small positive weight.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word-boundary tokenisation."""
+    return re.findall(r"\b\w+\b", text.lower())
+
+
+def chunk_fingerprint(chunk_ids: Iterable[str]) -> str:
+    """Order-independent fingerprint of a set of chunk IDs: their count and a SHA-256 hash of the sorted IDs."""
+    ids = sorted(chunk_ids)
+    digest = hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()
+    return f"{len(ids)}:{digest}"
+
+
+class BM25Index:
+    """
+    Inverted BM25 index over chunk IDs.
+
+    Attributes:
+        k1: Term frequency saturation parameter.
+        b: Document length normalisation parameter.
+        postings: Mapping term -> {chunk ID: term frequency}.
+        doc_lengths: Mapping chunk ID -> number of tokens.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.postings: dict[str, dict[str, int]] = {}
+        self.doc_lengths: dict[str, int] = {}
+        self._total_length = 0
+        self._terms_by_doc: dict[str, list[str]] = {}
+        # Compiled search state, rebuilt lazily after every change
+        self._row_ids: list[str] | None = None
+        self._row_of: dict[str, int] = {}
+        self._norms: NDArray[np.float32] = np.empty(0, dtype=np.float32)
+        self._term_arrays: dict[str, tuple[NDArray[np.int64], NDArray[np.float32]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, chunk_id: object) -> bool:
+        return chunk_id in self.doc_lengths
+
+    @property
+    def fingerprint(self) -> str:
+        """'chunk_fingerprint' of the indexed chunk IDs, compared with the vector store to detect a stale index."""
+        return chunk_fingerprint(self.doc_lengths)
+
+    @property
+    def average_length(self) -> float:
+        return self._total_length / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    def add(self, chunk_id: str, text: str) -> None:
+        """Index 'text' under 'chunk_id', replacing any previous version of the chunk."""
+        if chunk_id in self.doc_lengths:
+            self.remove(chunk_id)
+
+        tokens = tokenize(text)
+        frequencies = Counter(tokens)
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[chunk_id] = frequency
+        self._terms_by_doc[chunk_id] = list(frequencies)
+        self.doc_lengths[chunk_id] = len(tokens)
+        self._total_length += len(tokens)
+        self._row_ids = None
+
+    def remove(self, chunk_id: str) -> None:
+        """Drop 'chunk_id' from the index. Unknown IDs are ignored."""
+        length = self.doc_lengths.pop(chunk_id, None)
+        if length is None:
+            return
+
+        self._total_length -= length
+        for term in self._terms_by_doc.pop(chunk_id, []):
+            del self.postings[term][chunk_id]
+            if not self.postings[term]:
+                del self.postings[term]
+        self._row_ids = None
+
+    def _compile(self) -> list[str]:
+        """Assign row numbers to chunks and precompute the per-row length normalisation."""
+        self._row_ids = list(self.doc_lengths)
+        self._row_of = {chunk_id: row for row, chunk_id in enumerate(self._row_ids)}
+        lengths = np.fromiter(self.doc_lengths.values(), dtype=np.float32, count=len(self.doc_lengths))
+        average_length = self.average_length or 1.0
+        self._norms = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        self._term_arrays = {}
+        return self._row_ids
+
+    def _term_weights(self, term: str) -> tuple[NDArray[np.int64], NDArray[np.float32]] | None:
+        """Row numbers and BM25 weights of the chunks containing 'term' (cached until the next change)."""
+        cached = self._term_arrays.get(term)
+        if cached is not None:
+            return cached
+
+        postings = self.postings.get(term)
+        if not postings:
+            return None
+
+        rows = np.fromiter((self._row_of[chunk_id] for chunk_id in postings), dtype=np.int64, count=len(postings))
+        frequencies = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+        idf = math.log(1 + (len(self._row_of) - len(postings) + 0.5) / (len(postings) + 0.5))
+        weights = idf * frequencies * (self.k1 + 1) / (frequencies + self._norms[rows])
+        self._term_arrays[term] = (rows, weights)
+        return rows, weights
+
+    def search(self, query: str, top_k: int) -> list[tuple[str, float]]:
+        """Return up to 'top_k' '(chunk_id, score)' pairs, best first. Chunks sharing no term with the query are never returned."""
+        if top_k <= 0 or not self.doc_lengths:
+            return []
+
+        row_ids = self._row_ids if self._row_ids is not None else self._compile()
+
+        term_arrays = [arrays for term in set(tokenize(query)) if (arrays := self._term_weights(term)) is not None]
+        if not term_arrays:
+            return []
+
+        if len(term_arrays) == 1:
+            rows, scores = term_arrays[0]
+        else:
+            rows, inverse = np.unique(np.concatenate([r for r, _ in term_arrays]), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate([w for _, w in term_arrays]))
+
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(row_ids[int(rows[i])], float(scores[i])) for i in top]
+
+    def to_dict(self) -> dict[str, Any]:
+        """A copy of the index state that stays valid while the index keeps changing."""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "doc_lengths": dict(self.doc_lengths),
+            "postings": {term: dict(postings) for term, postings in self.postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BM25Index":
+        index = cls(k1=data["k1"], b=data["b"])
+        index.doc_lengths = data["doc_lengths"]
+        index.postings = data["postings"]
+        index._total_length = sum(index.doc_lengths.values())
+        for term, postings in index.postings.items():
+            for chunk_id in postings:
+                index._terms_by_doc.setdefault(chunk_id, []).append(term)
+        return index
+
+    def save(self, path: str | Path) -> None:
+        """Atomically write the index to 'path' as JSON."""
+        self.write(self.to_dict(), path)
+
+    @staticmethod
+    def write(data: dict[str, Any], path: str | Path) -> None:
+        """Atomically write the output of 'to_dict' to 'path' as JSON; safe to run in a worker thread."""
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BM25Index":
+        """Load an index previously written with 'save'."""
+        with open(path, "r", encoding="utf-8") as f:
+            index = cls.from_dict(json.load(f))
+        logger.debug(f"Loaded BM25 index with {len(index)} chunks and {len(index.postings)} terms from {path}")
+        return index
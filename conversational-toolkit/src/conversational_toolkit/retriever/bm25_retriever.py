@@ -1,60 +1,148 @@
 """
-BM25 lexical retriever backed by 'rank-bm25'.
+BM25 lexical retriever backed by an incremental, persistent inverted index.
 
-'rank-bm25' provides a well-tested BM25 Okapi implementation and several variants (BM25L, BM25Plus). The corpus is tokenised and indexed at construction time; retrieval is a pure in-memory operation with no I/O cost per query.
+The index ('BM25Index') stores posting lists, chunk lengths and IDF values only; the chunk contents stay in the vector store and are fetched by ID for the top hits. When an 'index_path' is given the index is loaded from disk at construction time and written back by 'save' (in a worker thread), so a restart does not re-tokenise the corpus. 'add_chunks' / 'remove_chunks' only mark the index dirty: call 'save' once after an ingestion run ('VectorStoreSync' does this for its indexes) instead of rewriting the file per batch. A loaded index is checked against the store once, on 'warm_up' or before its first query: only the chunk IDs are fetched ('VectorStore.get_chunk_ids'), and if they no longer match the fingerprint of the indexed IDs (the store was re-ingested or changed without 'add_chunks' / 'remove_chunks'), the index is rebuilt.
 
-Typical usage: initialise from a list of 'ChunkRecord' objects already stored in a vector store, then combine with a 'VectorStoreRetriever' inside a 'HybridRetriever' for lexical + semantic search.
+Typical usage: point it at the vector store that holds the text chunks, then combine with a 'VectorStoreRetriever' inside a 'HybridRetriever' for lexical + semantic search. Keep the index in step with the store by calling 'add_chunks' / 'remove_chunks' with the IDs returned by 'VectorStore.insert_chunks'.
 """
 
-import re
+import asyncio
+from pathlib import Path
 
-from rank_bm25 import BM25Okapi  # type: ignore[import-untyped]
+from loguru import logger
 
 from conversational_toolkit.retriever.base import Retriever
-from conversational_toolkit.vectorstores.base import ChunkMatch, VectorStore
+from conversational_toolkit.retriever.bm25_index import BM25Index, chunk_fingerprint
+from conversational_toolkit.utils.executors import run_in_thread
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord, VectorStore
 
 
 class BM25Retriever(Retriever[ChunkMatch]):
     """
-    In-memory BM25 retriever over a fixed corpus of 'ChunkRecord' objects.
+    BM25 retriever over the chunks of a vector store.
 
-    Uses 'rank_bm25.BM25Okapi' under the hood. The corpus is tokenised with a simple word-boundary regex (lowercased) at construction time.
+    If no index exists yet (no 'index_path', or the file is missing), the first query builds it once from 'vector_store.get_chunks_by_filter()' and persists it. Afterwards the index is only updated incrementally and persisted on 'save'. An index loaded from disk is verified against the chunk IDs of the store on 'warm_up' or the first query (unless 'verify_index' is False) and rebuilt if it is stale; a query whose hits are all missing from the store also triggers a rebuild. Builds and the verification run under a lock, so concurrent first queries do the work once.
 
     Attributes:
-        corpus: The indexed document chunks.
+        vs: The vector store holding the chunk contents.
+        index: The BM25 inverted index.
+        index_path: Where the index is persisted, or None to keep it in memory only.
     """
 
-    def __init__(self, vector_store: VectorStore, top_k: int) -> None:
+    def __init__(
+        self, vector_store: VectorStore, top_k: int, index_path: str | None = None, verify_index: bool = True
+    ) -> None:
         super().__init__(top_k)
         self.vs = vector_store
-        self.corpus = ([],)
-        self.tokenized = []
-        self._bm25 = None
+        self.index_path = Path(index_path) if index_path else None
+        self._built = False
+        self._verified = True
+        self._dirty = False
+        self._index_lock = asyncio.Lock()
+        self._save_lock = asyncio.Lock()
 
-    @staticmethod
-    def _tokenize(text: str) -> list[str]:
-        """Lowercase word-boundary tokenisation."""
-        return re.findall(r"\b\w+\b", text.lower())
+        if self.index_path is not None and self.index_path.exists():
+            self.index = BM25Index.load(self.index_path)
+            self._built = True
+            self._verified = not verify_index
+        else:
+            self.index = BM25Index()
+
+    async def save(self) -> None:
+        """Write the index to 'index_path' if it changed since the last save. The file is written in a worker thread."""
+        if self.index_path is None or not self._dirty:
+            return
+        async with self._save_lock:
+            if not self._dirty:
+                return
+            # Copy on the loop, which owns the index, then serialise and write off it
+            data = self.index.to_dict()
+            self._dirty = False
+            try:
+                await run_in_thread(BM25Index.write, data, self.index_path)
+            except BaseException:
+                self._dirty = True
+                raise
+
+    async def build(self) -> None:
+        """(Re)build the index from every chunk currently in the vector store and save it."""
+        self._build_from(await self.vs.get_chunks_by_filter())
+        await self.save()
+
+    def _build_from(self, chunks: list[ChunkRecord]) -> None:
+        self.index = BM25Index(k1=self.index.k1, b=self.index.b)
+        for chunk in chunks:
+            self.index.add(chunk.id, chunk.content)
+        self._built = True
+        self._verified = True
+        self._dirty = True
+        logger.info(f"Built BM25 index over {len(self.index)} chunks")
+
+    async def warm_up(self) -> None:
+        """Build or verify the index ahead of the first query, e.g. at application startup."""
+        await self._ensure_index()
+
+    async def _ensure_index(self) -> None:
+        """Build the index if there is none, and rebuild a loaded index whose chunk IDs no longer match the store."""
+        if self._built and self._verified:
+            return
+        async with self._index_lock:
+            if not self._built:
+                await self.build()
+            elif not self._verified:
+                stale = chunk_fingerprint(await self.vs.get_chunk_ids()) != self.index.fingerprint
+                self._verified = True
+                if stale:
+                    logger.warning(f"BM25 index {self.index_path} is out of sync with the vector store, rebuilding it")
+                    await self.build()
+
+    async def _rebuild_stale(self, stale_index: BM25Index) -> None:
+        """Rebuild the index unless a concurrent query already replaced 'stale_index'."""
+        async with self._index_lock:
+            if self.index is stale_index:
+                await self.build()
+
+    def add_chunks(self, chunks: list[ChunkRecord]) -> None:
+        """Index new or updated chunks (keyed by 'chunk.id'). Call 'save' to persist the change."""
+        for chunk in chunks:
+            self.index.add(chunk.id, chunk.content)
+        self._dirty = True
+
+    def remove_chunks(self, chunk_ids: list[str]) -> None:
+        """Remove chunks from the index. Call 'save' to persist the change."""
+        for chunk_id in chunk_ids:
+            self.index.remove(chunk_id)
+        self._dirty = True
 
     async def retrieve(self, query: str) -> list[ChunkMatch]:
-        """Score the corpus against 'query' using BM25 and return the top 'top_k' matches."""
-        if self._bm25 is None:
-            self.corpus = await self.vs.get_chunks_by_filter()
-            tokenized = [self._tokenize(chunk.content) for chunk in self.corpus]
-            self._bm25 = BM25Okapi(tokenized)
-
-        query_terms = self._tokenize(query)
-        scores: list[float] = self._bm25.get_scores(query_terms).tolist()
-        top_indices = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[: self.top_k]
+        """Score the postings of the query terms with BM25 and return the top 'top_k' matches."""
+        return (await self.retrieve_many([query]))[0]
+
+    async def retrieve_many(self, queries: list[str]) -> list[list[ChunkMatch]]:
+        """Score every query against the index, then fetch the contents of all hits with a single 'get_chunks_by_ids' call."""
+        await self._ensure_index()
+
+        index = self.index
+        hits_per_query, records = await self._search(queries)
+        if not records and any(hits_per_query):
+            # Every hit is gone from the store: the index is stale, rebuild it and search again
+            logger.warning("BM25 hits are missing from the vector store, rebuilding the index")
+            await self._rebuild_stale(index)
+            hits_per_query, records = await self._search(queries)
+
         return [
-            ChunkMatch(
-                id=self.corpus[i].id,
-                title=self.corpus[i].title,
-                content=self.corpus[i].content,
-                mime_type=self.corpus[i].mime_type,
-                metadata=self.corpus[i].metadata,
-                embedding=self.corpus[i].embedding,
-                score=scores[i],
-            )
-            for i in top_indices
+            [
+                ChunkMatch(**records[chunk_id].model_dump(), score=score)
+                for chunk_id, score in hits
+                if chunk_id in records
+            ]
+            for hits in hits_per_query
         ]
+
+    async def _search(self, queries: list[str]) -> tuple[list[list[tuple[str, float]]], dict[str, ChunkRecord]]:
+        """Hits per query and the records of all hits, fetched with a single 'get_chunks_by_ids' call."""
+        hits_per_query = [self.index.search(query, self.top_k) for query in queries]
+        hit_ids = list(dict.fromkeys(chunk_id for hits in hits_per_query for chunk_id, _ in hits))
+        if not hit_ids:
+            return hits_per_query, {}
+        return hits_per_query, {record.id: record for record in await self.vs.get_chunks_by_ids(hit_ids)}
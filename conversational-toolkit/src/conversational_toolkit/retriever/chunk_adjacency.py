@@ -0,0 +1,108 @@
+"""
+Position index mapping '(source_file, chunk_index)' to chunk IDs.
+
+'ChunkAdjacencyIndex' lets 'ContextWindowRetriever' resolve the neighbours of any chunk without querying the vector store: it turns "the two chunks before and after chunk 7 of report.pdf" into a list of chunk IDs, which can then be fetched for all hits at once with a single 'get_chunks_by_ids' call.
+
+The index only relies on 'get_chunks_by_filter' and 'get_chunks_by_ids', so it works with every vector store backend. It can be filled at ingestion time ('add_chunks' / 'remove_chunks', the same interface as 'BM25Retriever') or built lazily from the store on first use ('ensure_built'). A lazily built index is not told about later inserts, so callers refresh the sources of chunks it does not know ('refresh_sources'), which re-reads just those files from the store. Building and refreshing run under a lock, so concurrent first queries fill the index once.
+"""
+
+import asyncio
+from typing import Any
+
+from loguru import logger
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.vectorstores.base import ChunkRecord, VectorStore
+
+
+def chunk_position(chunk: Chunk) -> tuple[str, int] | None:
+    """The '(source_file, chunk_index)' of a chunk, or None if it was not produced by a position-aware chunker."""
+    source = chunk.metadata.get("source_file")
+    index = chunk.metadata.get("chunk_index")
+    if source is None or index is None:
+        return None
+    return str(source), int(index)
+
+
+class ChunkAdjacencyIndex:
+    """
+    In-memory '(source_file, chunk_index) -> chunk ID' map.
+
+    Attributes:
+        ids_by_position: The position map.
+        built: Whether the index has been filled from a vector store (or explicitly via 'add_chunks').
+    """
+
+    def __init__(self) -> None:
+        self.ids_by_position: dict[tuple[str, int], str] = {}
+        self._position_by_id: dict[str, tuple[str, int]] = {}
+        self.built = False
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids_by_position)
+
+    async def build(self, vector_store: VectorStore, filters: dict[str, Any] | None = None) -> None:
+        """Fill the index from every chunk in 'vector_store' (optionally restricted by 'filters')."""
+        async with self._lock:
+            await self._fill(vector_store, filters)
+
+    async def ensure_built(self, vector_store: VectorStore) -> None:
+        """Build the index from 'vector_store' unless it was built or filled already; concurrent callers build it once."""
+        if self.built:
+            return
+        async with self._lock:
+            if not self.built:
+                await self._fill(vector_store, None)
+
+    async def _fill(self, vector_store: VectorStore, filters: dict[str, Any] | None) -> None:
+        self.add_chunks(await vector_store.get_chunks_by_filter(filters))
+        logger.debug(f"Built chunk adjacency index with {len(self)} positioned chunks")
+
+    def knows(self, chunk: ChunkRecord) -> bool:
+        """Whether the position of a stored chunk maps to its ID. Chunks without position metadata are always known."""
+        position = chunk_position(chunk)
+        return position is None or self.ids_by_position.get(position) == chunk.id
+
+    async def refresh_sources(self, vector_store: VectorStore, misses: dict[str, str]) -> None:
+        """
+        Re-read the chunks of the sources of chunks the index does not know, e.g. ones inserted after it was built.
+
+        :param vector_store: The store to read the chunks from
+        :param misses: Chunk IDs that missed, mapped to their source file; sources refreshed concurrently are skipped
+        """
+        async with self._lock:
+            sources = {source for chunk_id, source in misses.items() if chunk_id not in self._position_by_id}
+            for source in sorted(sources):
+                stale_ids = [chunk_id for chunk_id, position in self._position_by_id.items() if position[0] == source]
+                self.remove_chunks(stale_ids)
+                self.add_chunks(await vector_store.get_chunks_by_filter({"source_file": source}))
+            if sources:
+                logger.debug(f"Refreshed chunk adjacency index for {len(sources)} sources")
+
+    def add_chunks(self, chunks: list[ChunkRecord]) -> None:
+        """Register stored chunks. Chunks without position metadata are ignored."""
+        for chunk in chunks:
+            position = chunk_position(chunk)
+            if position is not None:
+                self.ids_by_position[position] = chunk.id
+                self._position_by_id[chunk.id] = position
+        self.built = True
+
+    def remove_chunks(self, chunk_ids: list[str]) -> None:
+        """Forget chunks that were deleted from the store."""
+        for chunk_id in chunk_ids:
+            position = self._position_by_id.pop(chunk_id, None)
+            if position is not None and self.ids_by_position.get(position) == chunk_id:
+                del self.ids_by_position[position]
+
+    async def save(self) -> None:
+        """No-op: the index lives in memory only and is rebuilt from the store on restart."""
+
+    def ids_in_range(self, source: str, start: int, end: int) -> list[tuple[int, str]]:
+        """'(chunk_index, chunk_id)' pairs of the known chunks of 'source' with 'start <= chunk_index <= end'."""
+        return [
+            (index, chunk_id)
+            for index in range(start, end + 1)
+            if (chunk_id := self.ids_by_position.get((source, index))) is not None
+        ]
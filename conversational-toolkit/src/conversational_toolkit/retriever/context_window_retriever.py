@@ -3,17 +3,18 @@ Context window retriever that expands each retrieved chunk with its neighbours.
 
 After the base retriever returns its top-k results, 'ContextWindowRetriever' fetches the adjacent chunks (window_size chunks on each side) from the vector store and stitches them into a single, larger content window before returning.
 
+Neighbours are resolved through a 'ChunkAdjacencyIndex' ('(source_file, chunk_index) -> chunk ID'), built lazily from the vector store on first use unless one is passed in. A hit the index does not know (its chunk was inserted after the index was built) makes the index re-read that hit's source file from the store, so the lazily built index follows new ingestions. All neighbours of all hits (of all queries, for 'retrieve_many') are then fetched with a single 'get_chunks_by_ids' call. Hits of the same query whose windows overlap are merged into one result covering the union of their windows, so no chunk appears twice in the context.
+
 Requirements:
     - Chunks must have 'chunk_index' (int) and 'source_file' (str) in their metadata. These are set by 'fixed_size_chunks()' and 'paragraph_aware_chunks()' in feature0_ingestion.py, but NOT by the default header-based PDFChunker.
-    - The vector store must implement 'get_chunks_by_filter()' (ChromaDBVectorStore and PGVectorStore both do).
+    - The vector store must implement 'get_chunks_by_filter()' and 'get_chunks_by_ids()' (all bundled stores do).
 
 If a chunk lacks the required metadata fields, it is returned unchanged.
 """
 
-import asyncio
-
 from conversational_toolkit.retriever.base import Retriever
-from conversational_toolkit.vectorstores.base import ChunkMatch, VectorStore
+from conversational_toolkit.retriever.chunk_adjacency import ChunkAdjacencyIndex, chunk_position
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord, VectorStore
 
 
 class ContextWindowRetriever(Retriever[ChunkMatch]):
@@ -22,8 +23,9 @@ class ContextWindowRetriever(Retriever[ChunkMatch]):
 
     Attributes:
         retriever: The base retriever that produces the initial ranked list.
-        vector_store: The store used to look up neighbours by metadata filter.
+        vector_store: The store the neighbours are fetched from.
         window_size: How many chunks to include on each side of a retrieved chunk. window_size=1 adds at most one predecessor and one successor.
+        adjacency_index: Position index used to resolve neighbour IDs. Pass one that is kept up to date at ingestion time to skip the lazy build.
     """
 
     def __init__(
@@ -32,62 +34,112 @@ class ContextWindowRetriever(Retriever[ChunkMatch]):
         vector_store: VectorStore,
         window_size: int = 1,
         top_k: int = 5,
+        adjacency_index: ChunkAdjacencyIndex | None = None,
     ) -> None:
         super().__init__(top_k)
         self.retriever = retriever
         self.vector_store = vector_store
         self.window_size = window_size
+        self.adjacency_index = adjacency_index or ChunkAdjacencyIndex()
 
     async def retrieve(self, query: str) -> list[ChunkMatch]:
         """Retrieve then expand: fetch base results, then widen each with neighbours."""
-        base_chunks = await self.retriever.retrieve(query)
-        expanded = await asyncio.gather(*[self._expand(c) for c in base_chunks])
-        return list(expanded)[: self.top_k]
-
-    async def _expand(self, chunk: ChunkMatch) -> ChunkMatch:
-        """Replace chunk.content with a stitched window including its neighbours."""
-        idx = chunk.metadata.get("chunk_index")
-        source = chunk.metadata.get("source_file")
-
-        if idx is None or source is None:
-            # Chunk was not produced by a position-aware chunker -> return as-is.
-            return chunk
-
-        idx = int(idx)
-        offsets = [o for o in range(-self.window_size, self.window_size + 1) if o != 0]
-
-        # Fetch all neighbours in parallel.
-        neighbour_lists = await asyncio.gather(
-            *[
-                self.vector_store.get_chunks_by_filter(
-                    {
-                        "$and": [
-                            {"source_file": {"$eq": source}},
-                            {"chunk_index": {"$eq": idx + offset}},
-                        ]
-                    }
-                )
-                for offset in offsets
-            ]
+        return (await self.retrieve_many([query]))[0]
+
+    async def retrieve_many(self, queries: list[str]) -> list[list[ChunkMatch]]:
+        """Batch the base retrieval for all queries, then expand every result with one neighbour lookup."""
+        base_results = await self.retriever.retrieve_many(queries)
+        await self.adjacency_index.ensure_built(self.vector_store)
+        misses = {
+            chunk.id: str(chunk.metadata["source_file"])
+            for chunks in base_results
+            for chunk in chunks[: self.top_k]
+            if not self.adjacency_index.knows(chunk)
+        }
+        if misses:
+            await self.adjacency_index.refresh_sources(self.vector_store, misses)
+
+        windows_per_query = [self._merge_windows(chunks[: self.top_k]) for chunks in base_results]
+
+        # One round trip for every neighbour of every hit of every query
+        hit_ids = {chunk.id for chunks in base_results for chunk in chunks}
+        neighbour_ids = {
+            chunk_id
+            for windows in windows_per_query
+            for source, start, end, _ in windows
+            if source is not None
+            for _, chunk_id in self.adjacency_index.ids_in_range(source, start, end)
+            if chunk_id not in hit_ids
+        }
+        # Some stores (ChromaDB) reject an empty ID list; there are no neighbours e.g. when hits lack position metadata
+        records = (
+            {record.id: record for record in await self.vector_store.get_chunks_by_ids(list(neighbour_ids))}
+            if neighbour_ids
+            else {}
         )
-        neighbours = [c for sublist in neighbour_lists for c in sublist]
 
-        if not neighbours:
-            return chunk
-
-        # Sort all chunks (neighbours + the retrieved chunk itself) by position.
-        all_chunks = sorted(
-            [*neighbours, chunk],
-            key=lambda c: int(c.metadata.get("chunk_index", 0)),
-        )
-        expanded_content = "\n\n".join(c.content for c in all_chunks)
+        return [[self._stitch(window, records) for window in windows] for windows in windows_per_query]
+
+    def _merge_windows(self, chunks: list[ChunkMatch]) -> list[tuple[str | None, int, int, list[ChunkMatch]]]:
+        """Group hits whose windows overlap into '(source, start, end, hits)', ordered by the rank of their best hit.
+
+        Hits without position metadata form their own group with source None.
+        """
+        rank = {chunk.id: i for i, chunk in enumerate(chunks)}
+        windows: list[tuple[str | None, int, int, list[ChunkMatch]]] = []
+        positioned: dict[str, list[tuple[int, ChunkMatch]]] = {}
+        for chunk in chunks:
+            position = chunk_position(chunk)
+            if position is None:
+                windows.append((None, 0, 0, [chunk]))
+            else:
+                positioned.setdefault(position[0], []).append((position[1], chunk))
+
+        for source, hits in positioned.items():
+            current: tuple[str | None, int, int, list[ChunkMatch]] | None = None
+            for index, chunk in sorted(hits, key=lambda hit: hit[0]):
+                start, end = index - self.window_size, index + self.window_size
+                if current is not None and start <= current[2]:
+                    current = (source, current[1], max(end, current[2]), [*current[3], chunk])
+                else:
+                    if current is not None:
+                        windows.append(current)
+                    current = (source, start, end, [chunk])
+            if current is not None:
+                windows.append(current)
+
+        # Best hit first inside each window, windows in the order of their best hit
+        windows = [
+            (source, start, end, sorted(hits, key=lambda hit: rank[hit.id])) for source, start, end, hits in windows
+        ]
+        return sorted(windows, key=lambda window: rank[window[3][0].id])
+
+    def _stitch(
+        self, window: tuple[str | None, int, int, list[ChunkMatch]], records: dict[str, ChunkRecord]
+    ) -> ChunkMatch:
+        """Build the expanded match for one (possibly merged) window; the best-ranked hit provides ID and score."""
+        source, start, end, hits = window
+        best = hits[0]
+        if source is None:
+            return best
+
+        hits_by_id = {hit.id: hit for hit in hits}
+        positioned = self.adjacency_index.ids_in_range(source, start, end)
+        parts = [(hits_by_id.get(chunk_id) or records.get(chunk_id), index) for index, chunk_id in positioned]
+        # Hits missing from the index (e.g. inserted after it was built) still contribute their own content
+        known_ids = {chunk_id for _, chunk_id in positioned}
+        parts += [(hit, int(hit.metadata["chunk_index"])) for hit in hits if hit.id not in known_ids]
+        contents = [chunk.content for chunk, _ in sorted(parts, key=lambda part: part[1]) if chunk is not None]
+
+        if len(contents) == 1:
+            return best
 
         return ChunkMatch(
-            id=chunk.id,
-            title=chunk.title,
-            content=expanded_content,
-            mime_type=chunk.mime_type,
-            metadata={**chunk.metadata, "context_window_size": self.window_size},
-            embedding=chunk.embedding,
-            score=chunk.score,
+            id=best.id,
+            title=best.title,
+            content="\n\n".join(contents),
+            mime_type=best.mime_type,
+            metadata={**best.metadata, "context_window_size": self.window_size},
+            embedding=best.embedding,
+            score=best.score,
         )
@@ -0,0 +1,144 @@
+"""
+Cross-encoder reranking retriever.
+
+'CrossEncoderRerankingRetriever' is a drop-in alternative to 'RerankingRetriever': the same two-stage design (a base retriever supplies a candidate pool, which is then re-ordered), but the second stage is a local sentence-transformers cross-encoder instead of a chat model. Each (query, chunk) pair is scored jointly by the model in batches on CPU, so a rerank costs tens of milliseconds instead of an LLM round trip, and 'ChunkMatch.score' carries the model's relevance probability rather than a rank-based decay.
+
+Chunks are tokenised once and the token IDs are cached by chunk ID, so popular chunks that show up in many candidate pools are never tokenised twice.
+
+As with 'RerankingRetriever', any failure during scoring falls back to the base retriever's order, so the pipeline never breaks.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import torch
+from loguru import logger
+from sentence_transformers import CrossEncoder
+
+from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.utils.executors import run_in_thread
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord
+
+
+class CrossEncoderRerankingRetriever(Retriever[ChunkMatch]):
+    """
+    Two-stage retriever that reranks a candidate pool with a local cross-encoder.
+
+    Configure the base retriever's 'top_k' as the candidate pool size (e.g. 20) and this retriever's 'top_k' as the final number of results (e.g. 5).
+
+    Attributes:
+        retriever: The base retriever that supplies the candidate pool.
+        cross_encoder: The sentence-transformers cross-encoder, e.g. 'cross-encoder/ms-marco-MiniLM-L-6-v2'.
+        batch_size: Number of (query, chunk) pairs per forward pass.
+        max_length: Maximum number of tokens of a (query, chunk) pair; the chunk is truncated to fit.
+    """
+
+    def __init__(
+        self,
+        retriever: Retriever[Any],
+        model_name: str,
+        top_k: int,
+        batch_size: int = 32,
+        max_length: int = 512,
+        device: str = "cpu",
+        token_cache_size: int = 10_000,
+    ) -> None:
+        super().__init__(top_k)
+        self.retriever = retriever
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.cross_encoder = CrossEncoder(model_name, max_length=max_length, device=device)
+        self.cross_encoder.eval()
+        self._token_cache: OrderedDict[str, list[int]] = OrderedDict()
+        self._token_cache_size = token_cache_size
+        # Serialises forward passes (and token cache updates) across worker threads
+        self._lock = threading.Lock()
+        logger.debug(f"Cross-encoder reranker loaded: {model_name} on {device}")
+
+    def _chunk_tokens(self, chunk: ChunkRecord) -> list[int]:
+        """Token IDs of the chunk content without special tokens, cached by chunk ID."""
+        tokens = self._token_cache.get(chunk.id)
+        if tokens is not None:
+            self._token_cache.move_to_end(chunk.id)
+            return tokens
+
+        tokens = self.cross_encoder.tokenizer(
+            chunk.content, add_special_tokens=False, truncation=True, max_length=self.max_length
+        )["input_ids"]
+        self._token_cache[chunk.id] = tokens
+        if len(self._token_cache) > self._token_cache_size:
+            self._token_cache.popitem(last=False)
+        return tokens
+
+    @torch.inference_mode()
+    def _score(self, queries: list[str], candidates_per_query: list[list[ChunkRecord]]) -> list[list[float]]:
+        """Score every (query, candidate) pair in batches; returns one score list per query."""
+        with self._lock:
+            return self._score_locked(queries, candidates_per_query)
+
+    def _score_locked(self, queries: list[str], candidates_per_query: list[list[ChunkRecord]]) -> list[list[float]]:
+        tokenizer = self.cross_encoder.tokenizer
+        pairs = []
+        for query, candidates in zip(queries, candidates_per_query):
+            query_tokens = tokenizer(query, add_special_tokens=False)["input_ids"]
+            pairs += [
+                tokenizer.prepare_for_model(
+                    query_tokens,
+                    self._chunk_tokens(chunk),
+                    truncation="only_second",
+                    max_length=self.max_length,
+                )
+                for chunk in candidates
+            ]
+
+        scores: list[float] = []
+        for start in range(0, len(pairs), self.batch_size):
+            features = tokenizer.pad(pairs[start : start + self.batch_size], padding=True, return_tensors="pt")
+            features = features.to(self.cross_encoder.model.device)
+            logits = self.cross_encoder.model(**features, return_dict=True).logits
+            # Single-label cross-encoders use a sigmoid; for multi-label models the last class is "relevant".
+            scores += self.cross_encoder.activation_fn(logits)[:, -1].tolist()
+
+        scores_per_query, offset = [], 0
+        for candidates in candidates_per_query:
+            scores_per_query.append(scores[offset : offset + len(candidates)])
+            offset += len(candidates)
+        return scores_per_query
+
+    def _to_matches(self, candidates: list[ChunkRecord], scores: list[float]) -> list[ChunkMatch]:
+        ranked = sorted(zip(candidates, scores), key=lambda pair: pair[1], reverse=True)[: self.top_k]
+        return [
+            ChunkMatch(
+                id=chunk.id,
+                title=chunk.title,
+                content=chunk.content,
+                mime_type=chunk.mime_type,
+                metadata=chunk.metadata,
+                embedding=chunk.embedding,
+                score=score,
+            )
+            for chunk, score in ranked
+        ]
+
+    async def retrieve(self, query: str) -> list[ChunkMatch]:
+        """Fetch candidates from the base retriever and rerank them with the cross-encoder."""
+        return (await self.retrieve_many([query]))[0]
+
+    async def retrieve_many(self, queries: list[str]) -> list[list[ChunkMatch]]:
+        """Fetch all candidate pools in one batched call and score every pair in a single worker-thread pass."""
+        candidates_per_query: list[list[ChunkRecord]] = await self.retriever.retrieve_many(queries)
+
+        try:
+            scores_per_query = await run_in_thread(self._score, queries, candidates_per_query)
+        except Exception as exc:
+            logger.warning(f"CrossEncoderRerankingRetriever scoring failed, using original order: {exc}")
+            # Same linear decay as 'RerankingRetriever': 1.0 at rank 1, approaching 0 at the last rank
+            scores_per_query = [
+                [(len(candidates) - i) / len(candidates) for i in range(len(candidates))]
+                for candidates in candidates_per_query
+            ]
+
+        return [
+            self._to_matches(candidates, scores) for candidates, scores in zip(candidates_per_query, scores_per_query)
+        ]
@@ -34,6 +34,13 @@ class HybridRetriever(Retriever[ChunkMatch]):
         all_results: list[list[Any]] = await asyncio.gather(*[r.retrieve(query) for r in self.retrievers])
         return self._rrf_merge(all_results)[: self.top_k]
 
+    async def retrieve_many(self, queries: list[str]) -> list[list[ChunkMatch]]:
+        """Batch 'queries' through every sub-retriever in parallel, then RRF-merge per query."""
+        per_retriever: list[list[list[Any]]] = await asyncio.gather(
+            *[r.retrieve_many(queries) for r in self.retrievers]
+        )
+        return [self._rrf_merge([results[i] for results in per_retriever])[: self.top_k] for i in range(len(queries))]
+
     def _rrf_merge(self, results_per_retriever: list[list[ChunkRecord]]) -> list[ChunkMatch]:
         fused_scores: dict[str, float] = {}
         chunk_map: dict[str, ChunkRecord] = {}
@@ -8,6 +8,7 @@ Design note: configure the base retriever with 'top_k = candidate_pool_size' (e.
 If the LLM call fails or returns unparseable JSON the retriever falls back to the original ranking from the base retriever, so the pipeline never breaks.
 """
 
+import asyncio
 import json
 from textwrap import dedent
 from typing import Any
@@ -38,6 +39,18 @@ class RerankingRetriever(Retriever[ChunkMatch]):
     async def retrieve(self, query: str) -> list[ChunkMatch]:
         """Fetch candidates from the base retriever and rerank them with the LLM."""
         candidates: list[ChunkRecord] = await self.retriever.retrieve(query)  # type: ignore[assignment]
+        return await self._rerank(query, candidates)
+
+    async def retrieve_many(self, queries: list[str]) -> list[list[ChunkMatch]]:
+        """Fetch the candidate pools for all queries in one batched call, then rerank the pools concurrently."""
+        candidates_per_query: list[list[ChunkRecord]] = await self.retriever.retrieve_many(queries)
+        return list(
+            await asyncio.gather(
+                *[self._rerank(query, candidates) for query, candidates in zip(queries, candidates_per_query)]
+            )
+        )
+
+    async def _rerank(self, query: str, candidates: list[ChunkRecord]) -> list[ChunkMatch]:
         if not candidates:
             return []
 
@@ -14,6 +14,12 @@ class VectorStoreRetriever(Retriever[ChunkMatch]):
         results = await self.vector_store.get_chunks_by_embedding(embeddings[0], self.top_k)
         return results
 
+    async def retrieve_many(self, queries: list[str]) -> list[list[ChunkMatch]]:
+        if not queries:
+            return []
+        embeddings = await self.embedding_model.get_embeddings(queries)
+        return await self.vector_store.get_chunks_by_embeddings(embeddings, self.top_k)
+
 
 class CompositeVectorStoreRetriever(Retriever[ChunkMatch]):
     # TODO: Should allow in main class to have list as well for top_k
@@ -39,3 +45,17 @@ class CompositeVectorStoreRetriever(Retriever[ChunkMatch]):
             all_results.extend(results)
 
         return all_results[: self.top_k]
+
+    async def retrieve_many(self, queries: list[str]) -> list[list[ChunkMatch]]:
+        all_results: list[list[ChunkMatch]] = [[] for _ in queries]
+        if not queries:
+            return all_results
+        for embedding_model, vector_store, top_k_tmp in zip(
+            self.embedding_models, self.vector_stores, self.top_k_per_retriever
+        ):
+            embeddings = await embedding_model.get_embeddings(queries)
+            results = await vector_store.get_chunks_by_embeddings(embeddings, top_k_tmp)
+            for query_results, store_results in zip(all_results, results):
+                query_results.extend(store_results)
+
+        return [query_results[: self.top_k] for query_results in all_results]
@@ -39,7 +39,7 @@ class RetrieverTool(Tool):
         else:
             queries = [query]
 
-        retrieved = [await self.retriever.retrieve(q) for q in queries]
+        retrieved = await self.retriever.retrieve_many(queries)
         sources = reciprocal_rank_fusion(retrieved)[: self.retriever.top_k]
 
         json_chunks = [
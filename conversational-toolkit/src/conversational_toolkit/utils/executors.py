@@ -0,0 +1,83 @@
+"""
+Shared executors for blocking work called from async code.
+
+Model forward passes, ChromaDB calls and file rewrites block the thread they run on. Awaited directly inside a coroutine they stall the event loop, and with it every other request (token streaming included). 'run_in_thread' moves such a call to a thread pool shared by the whole toolkit; torch, NumPy and file I/O release the GIL, so the loop keeps running in the meantime. 'run_in_process' is for pure-Python CPU work that holds the GIL; it needs picklable arguments and only uses a process pool once one is configured ('max_processes > 0'), falling back to the thread pool otherwise.
+
+Both pools are created on first use. Call 'configure_executors' at application start-up to size them.
+"""
+
+import asyncio
+import functools
+import os
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from loguru import logger
+
+R = TypeVar("R")
+
+
+class _SharedExecutors:
+    def __init__(self) -> None:
+        self.max_threads: int | None = None
+        self.max_processes = 0
+        self.thread_pool: ThreadPoolExecutor | None = None
+        self.process_pool: ProcessPoolExecutor | None = None
+
+
+_shared = _SharedExecutors()
+
+
+def configure_executors(max_threads: int | None = None, max_processes: int = 0) -> None:
+    """
+    Size the shared pools. Pools that are already running are shut down and re-created on next use.
+
+    :param max_threads: Size of the thread pool; defaults to 'min(32, os.cpu_count() + 4)'
+    :param max_processes: Size of the process pool; 0 routes 'run_in_process' to the thread pool
+    """
+    shutdown_executors(wait=False)
+    _shared.max_threads = max_threads
+    _shared.max_processes = max_processes
+
+
+def thread_executor() -> ThreadPoolExecutor:
+    """The shared thread pool, for I/O and GIL-releasing computations."""
+    if _shared.thread_pool is None:
+        _shared.thread_pool = ThreadPoolExecutor(max_workers=_shared.max_threads, thread_name_prefix="toolkit")
+        logger.debug("Started shared thread pool")
+    return _shared.thread_pool
+
+
+def process_executor() -> Executor:
+    """The shared process pool, or the thread pool when no process pool is configured."""
+    if _shared.max_processes <= 0:
+        return thread_executor()
+    if _shared.process_pool is None:
+        _shared.process_pool = ProcessPoolExecutor(max_workers=_shared.max_processes)
+        logger.debug(f"Started shared process pool with {_shared.max_processes} workers (parent {os.getpid()})")
+    return _shared.process_pool
+
+
+async def run_in_thread(function: Callable[..., R], /, *args: Any, **kwargs: Any) -> R:
+    """Run 'function(*args, **kwargs)' in the shared thread pool and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(
+        thread_executor(), functools.partial(function, *args, **kwargs)
+    )
+
+
+async def run_in_process(function: Callable[..., R], /, *args: Any, **kwargs: Any) -> R:
+    """Run 'function(*args, **kwargs)' in the shared process pool (or the thread pool) and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(
+        process_executor(), functools.partial(function, *args, **kwargs)
+    )
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut both pools down; they are re-created on next use."""
+    if _shared.thread_pool is not None:
+        _shared.thread_pool.shutdown(wait=wait)
+        _shared.thread_pool = None
+    if _shared.process_pool is not None:
+        _shared.process_pool.shutdown(wait=wait)
+        _shared.process_pool = None
@@ -0,0 +1,86 @@
+"""
+Event-loop lag monitor.
+
+'EventLoopLagMonitor' measures how late the event loop wakes up a coroutine that sleeps for 'interval' seconds. Any delay beyond the sleep is time during which the loop could not run anything else, i.e. a blocking call inside a coroutine. Lags above 'threshold' are logged as stalls.
+
+A blocked loop cannot report on itself until the blocking call returns, and by then the culprit is gone. A watchdog thread therefore checks the heartbeat of the monitor coroutine and, as soon as it is more than 'threshold' late, logs the stack of the loop thread, pointing at the code that is blocking it.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+from loguru import logger
+
+
+class EventLoopLagMonitor:
+    """
+    Report event-loop stalls.
+
+    Attributes:
+        interval: Seconds between two heartbeats.
+        threshold: Lag in seconds above which a stall is reported.
+        max_lag: Largest lag seen so far, in seconds.
+        stalls: Number of stalls seen so far.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._heartbeat = time.monotonic()
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._loop_thread_id: int | None = None
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop monitoring."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _beat(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._heartbeat = time.monotonic()
+            lag = self._heartbeat - start - self.interval
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.threshold:
+                self.stalls += 1
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f} ms")
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            late = time.monotonic() - heartbeat - self.interval
+            if late > self.threshold and heartbeat != reported_heartbeat:
+                # Once per stall: the heartbeat only moves once the loop runs again
+                reported_heartbeat = heartbeat
+                frame = sys._current_frames().get(self._loop_thread_id or 0)
+                stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unknown>"
+                logger.warning(f"Event loop blocked for more than {late * 1000:.0f} ms, currently in:\n{stack}")
@@ -0,0 +1,9 @@
+import math
+
+# OpenAI tokenizers average about 4 characters per token on Latin-script text; 3 errs on the high side
+CHARS_PER_TOKEN = 3
+
+
+def estimate_token_count(text: str) -> int:
+    """Upper estimate of the number of tokens in 'text', without loading a tokenizer."""
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
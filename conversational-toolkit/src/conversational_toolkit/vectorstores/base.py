@@ -3,7 +3,7 @@ Vector store abstractions and chunk data models.
 
 'Chunk' is the base document unit. 'ChunkRecord' extends it with the storage identity ('id') and its embedding vector, representing a chunk as it exists in the store. 'ChunkMatch' further extends 'ChunkRecord' with a relevance score returned after a similarity search. This three-level hierarchy preserves type safety at each stage of the pipeline without duplicating fields.
 
-Concrete implementations: 'ChromaDBVectorStore', 'PGVectorStore'.
+Concrete implementations: 'ChromaDBVectorStore', 'PGVectorStore', 'FlatVectorStore', 'HNSWVectorStore'.
 """
 
 from abc import ABC, abstractmethod
@@ -32,15 +32,20 @@ class VectorStore(ABC):
     """
     Abstract base class for vector store backends.
 
-    Implementations handle insertion, similarity search, and ID-based lookup
-    for embedded document chunks. The embedding array passed to 'insert_chunks'
+    Implementations handle insertion, deletion, similarity search, and ID-based
+    lookup for embedded document chunks. The embedding array passed to 'insert_chunks'
     has shape '(len(chunks), embedding_size)', with rows corresponding to chunks
     in the same order.
     """
 
     @abstractmethod
-    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> None:
-        """Persist 'chunks' together with their pre-computed 'embedding' matrix."""
+    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> list[str]:
+        """Persist 'chunks' together with their pre-computed 'embedding' matrix and return the generated IDs, in chunk order."""
+        pass
+
+    @abstractmethod
+    async def delete_chunks(self, chunk_ids: list[str]) -> None:
+        """Delete chunks by their stored IDs. Unknown IDs are ignored."""
         pass
 
     @abstractmethod
@@ -50,12 +55,31 @@ class VectorStore(ABC):
         """Return the 'top_k' most similar chunks to 'embedding', optionally filtered by metadata."""
         pass
 
+    async def get_chunks_by_embeddings(
+        self, embeddings: NDArray[np.float64], top_k: int, filters: dict[str, Any] | None = None
+    ) -> list[list[ChunkMatch]]:
+        """Batched 'get_chunks_by_embedding': one result list per row of the '(n_queries, embedding_size)' matrix.
+
+        The default issues one search per row. Backends that can answer several queries in a single call should override it.
+        """
+        return [await self.get_chunks_by_embedding(embedding, top_k, filters) for embedding in embeddings]
+
     @abstractmethod
-    async def get_chunks_by_ids(self, chunk_ids: Union[int, list[int]]) -> list[Chunk]:
-        """Fetch specific chunks by their stored IDs."""
+    async def get_chunks_by_ids(self, chunk_ids: Union[str, list[str]]) -> list[ChunkRecord]:
+        """Fetch specific chunks by their stored IDs. Unknown IDs are skipped."""
         pass
 
     @abstractmethod
     async def get_chunks_by_filter(self, filters: dict[str, Any] | None = None) -> list[ChunkRecord]:
         """Return all chunks matching the given metadata filters (no embedding needed)."""
         pass
+
+    async def get_chunk_ids(self) -> list[str]:
+        """Return the IDs of all stored chunks.
+
+        The default goes through 'get_chunks_by_filter'. Backends that can list IDs without loading the chunk contents should override it.
+        """
+        return [chunk.id for chunk in await self.get_chunks_by_filter()]
+
+    async def save(self) -> None:
+        """Persist changes the backend buffers in memory. The default does nothing, for stores that write through on every call."""
@@ -6,10 +6,17 @@ from numpy.typing import NDArray
 
 from conversational_toolkit.chunking.base import Chunk
 from conversational_toolkit.utils.database import generate_uid
+from conversational_toolkit.utils.executors import run_in_thread
 from conversational_toolkit.vectorstores.base import VectorStore, ChunkMatch, ChunkRecord
 
 
 class ChromaDBVectorStore(VectorStore):
+    """
+    Vector store backed by a persistent ChromaDB collection.
+
+    The ChromaDB client is synchronous; every collection call runs in the shared thread pool ('run_in_thread') so that queries and inserts do not block the event loop.
+    """
+
     def __init__(self, db_path: str, collection_name: str = "default_collection"):
         """
         Initialize the ChromaDB vector store.
@@ -20,12 +27,13 @@ class ChromaDBVectorStore(VectorStore):
         self.client = chromadb.PersistentClient(path=db_path)
         self.collection = self.client.get_or_create_collection(name=collection_name)
 
-    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> None:
+    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> list[str]:
         """
         Insert chunks into ChromaDB.
 
         :param chunks: List of document chunks
         :param embedding: Corresponding embedding vectors
+        :return: The IDs assigned to the chunks, in order
         """
         documents = []
         metadatas = []
@@ -40,12 +48,23 @@ class ChromaDBVectorStore(VectorStore):
             metadatas.append(safe_meta)
             ids.append(doc_id)
 
-        self.collection.add(
+        await run_in_thread(
+            self.collection.add,
             ids=ids,
             embeddings=embedding.tolist(),  # type: ignore
             metadatas=metadatas,  # type: ignore
             documents=documents,
         )
+        return ids
+
+    async def delete_chunks(self, chunk_ids: list[str]) -> None:
+        """
+        Delete chunks from the collection.
+
+        :param chunk_ids: IDs of the chunks to delete; unknown IDs are ignored
+        """
+        if chunk_ids:
+            await run_in_thread(self.collection.delete, ids=[str(cid) for cid in chunk_ids])
 
     async def get_chunks_by_embedding(
         self, embedding: NDArray[np.float64], top_k: int, filters: dict[str, Any] | None = None
@@ -57,25 +76,50 @@ class ChromaDBVectorStore(VectorStore):
         :param top_k: Number of results to return
         :param filters: Optional filters for metadata
         """
-        results = self.collection.query(query_embeddings=embedding.tolist(), n_results=top_k, where=filters)  # type: ignore
+        return (await self.get_chunks_by_embeddings(np.atleast_2d(embedding), top_k, filters))[0]
 
-        chunk_matches = []
-        if results and results["ids"]:
-            for i in range(len(results["ids"][0])):
-                metadata: dict[str, Any] = dict(results["metadatas"][0][i]) if results["metadatas"] else {}
-                chunk_matches.append(
-                    ChunkMatch(
-                        id=results["ids"][0][i],
-                        title=str(metadata.get("title", "")),  # type: ignore[reportCallIssue]
-                        mime_type=str(metadata.get("mime_type", "")),  # type: ignore[reportCallIssue]
-                        metadata=metadata,
-                        content=results["documents"][0][i] if results["documents"] else "",  # type: ignore[reportCallIssue]
-                        embedding=[],
-                        score=results["distances"][0][i] if results["distances"] else 0.0,
+    async def get_chunks_by_embeddings(
+        self, embeddings: NDArray[np.float64], top_k: int, filters: dict[str, Any] | None = None
+    ) -> list[list[ChunkMatch]]:
+        """
+        Retrieve the chunks most similar to each row of 'embeddings' in a single ChromaDB query.
+
+        :param embeddings: Query embeddings, one per row
+        :param top_k: Number of results to return per query
+        :param filters: Optional filters for metadata, applied to every query
+        """
+        results = await run_in_thread(
+            self.collection.query,
+            query_embeddings=embeddings.tolist(),  # type: ignore[arg-type]
+            n_results=top_k,
+            where=filters,
+        )
+
+        matches_per_query: list[list[ChunkMatch]] = []
+        for q in range(len(embeddings)):
+            chunk_matches = []
+            if results and results["ids"]:
+                for i in range(len(results["ids"][q])):
+                    metadata: dict[str, Any] = dict(results["metadatas"][q][i]) if results["metadatas"] else {}
+                    chunk_matches.append(
+                        ChunkMatch(
+                            id=results["ids"][q][i],
+                            title=str(metadata.get("title", "")),  # type: ignore[reportCallIssue]
+                            mime_type=str(metadata.get("mime_type", "")),  # type: ignore[reportCallIssue]
+                            metadata=metadata,
+                            content=results["documents"][q][i] if results["documents"] else "",  # type: ignore[reportCallIssue]
+                            embedding=[],
+                            score=results["distances"][q][i] if results["distances"] else 0.0,
+                        )
                     )
-                )
+            matches_per_query.append(chunk_matches)
+
+        return matches_per_query
 
-        return chunk_matches
+    async def get_chunk_ids(self) -> list[str]:
+        """Return the IDs of all stored chunks, without fetching documents or metadata."""
+        results = await run_in_thread(self.collection.get, include=[])
+        return list(results["ids"]) if results else []
 
     async def get_chunks_by_filter(self, filters: dict[str, Any] | None = None) -> list[ChunkRecord]:
         """
@@ -93,9 +137,9 @@ class ChromaDBVectorStore(VectorStore):
             }
         """
         if not filters:
-            results = self.collection.get()
+            results = await run_in_thread(self.collection.get)
         else:
-            results = self.collection.get(where=filters)  # type: ignore[arg-type]
+            results = await run_in_thread(self.collection.get, where=filters)  # type: ignore[arg-type]
 
         chunk_records = []
         if results and results["ids"]:
@@ -113,30 +157,35 @@ class ChromaDBVectorStore(VectorStore):
                 )
         return chunk_records
 
-    async def get_chunks_by_ids(self, chunk_ids: int | list[int]) -> list[Chunk]:
+    async def get_chunks_by_ids(self, chunk_ids: str | list[str]) -> list[ChunkRecord]:
         """
         Retrieve chunks by their IDs.
 
         :param chunk_ids: A single ID or a list of IDs
         :return: List of retrieved chunks
         """
-        if isinstance(chunk_ids, int):
-            chunk_ids = [str(chunk_ids)]  # type: ignore
+        if isinstance(chunk_ids, str):
+            chunk_ids = [str(chunk_ids)]
         else:
-            chunk_ids = [str(cid) for cid in chunk_ids]  # type: ignore
+            chunk_ids = [str(cid) for cid in chunk_ids]
+        if not chunk_ids:
+            # ChromaDB raises on an empty ID list
+            return []
 
-        results = self.collection.get(ids=chunk_ids)  # type: ignore
+        results = await run_in_thread(self.collection.get, ids=chunk_ids)  # type: ignore[arg-type]
 
         chunks = []
         if results and results["ids"]:
             for i in range(len(results["ids"])):
                 metadata: dict[str, Any] = dict(results["metadatas"][i]) if results["metadatas"] else {}
                 chunks.append(
-                    Chunk(
+                    ChunkRecord(
+                        id=results["ids"][i],
                         title=str(metadata.get("title", "")),
                         mime_type=str(metadata.get("mime_type", "")),
                         content=results["documents"][i] if results["documents"] else "",
                         metadata=metadata,
+                        embedding=[],
                     )
                 )
 
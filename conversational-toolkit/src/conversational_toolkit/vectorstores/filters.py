@@ -0,0 +1,158 @@
+"""
+In-process evaluation of ChromaDB-style metadata filters.
+
+Vector stores that keep their records in Python ('FlatVectorStore') cannot delegate filtering to a database, so they evaluate the same filter dictionaries that 'ChromaDBVectorStore' accepts. Keeping the syntax identical lets callers swap stores without rewriting their filters.
+
+Supported syntax:
+    {"field": value}                                  shorthand for '$eq'
+    {"field": {"$eq" | "$ne" | "$gt" | "$gte" | "$lt" | "$lte": value}}
+    {"field": {"$in" | "$nin": [value, ...]}}
+    {"$and": [filter, ...]}, {"$or": [filter, ...]}
+
+A dictionary with several top-level fields is treated as an implicit '$and'.
+
+'MetadataIndex' is an inverted index for stores with many records: it answers the equality part of a filter with set operations, so only the remaining conditions (if any) are evaluated with 'matches_filters', and only on the candidate records.
+"""
+
+import operator
+from collections.abc import Hashable
+from typing import Any, Callable
+
+_COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$in": lambda value, options: value in options,
+    "$nin": lambda value, options: value not in options,
+}
+
+
+def _match_field(value: Any, condition: Any) -> bool:
+    if not isinstance(condition, dict):
+        return bool(value == condition)
+
+    for op, expected in condition.items():
+        compare = _COMPARISONS.get(op)
+        if compare is None:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if value is None and op not in ("$ne", "$nin"):
+            return False
+        try:
+            if not compare(value, expected):
+                return False
+        except TypeError:
+            # Ordering comparisons between incompatible types never match.
+            return False
+    return True
+
+
+def matches_filters(metadata: dict[str, Any], filters: dict[str, Any] | None) -> bool:
+    """Return True if 'metadata' satisfies 'filters' (always True when 'filters' is empty)."""
+    if not filters:
+        return True
+
+    for key, condition in filters.items():
+        if key == "$and":
+            if not all(matches_filters(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filters(metadata, sub) for sub in condition):
+                return False
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported logical operator: {key}")
+        elif not _match_field(metadata.get(key), condition):
+            return False
+    return True
+
+
+def _indexable(value: Any) -> bool:
+    return value is not None and isinstance(value, Hashable)
+
+
+class MetadataIndex:
+    """
+    Inverted index from metadata field and value to the labels of the records holding that value.
+
+    'resolve' handles '{"field": value}', '$eq', '$in', and '$and' / '$or' combinations of them. Other operators, unhashable values and None (which also matches a missing field) are not indexed; for filters using them 'resolve' returns a superset of the matches to check with 'matches_filters', or None if nothing could be resolved.
+
+    Attributes:
+        postings: Mapping field -> value -> labels of the records with that value.
+    """
+
+    def __init__(self) -> None:
+        self.postings: dict[str, dict[Any, set[int]]] = {}
+
+    def add(self, label: int, metadata: dict[str, Any]) -> None:
+        for key, value in metadata.items():
+            if _indexable(value):
+                self.postings.setdefault(key, {}).setdefault(value, set()).add(label)
+
+    def remove(self, label: int, metadata: dict[str, Any]) -> None:
+        for key, value in metadata.items():
+            values = self.postings.get(key)
+            if not _indexable(value) or values is None or value not in values:
+                continue
+            values[value].discard(label)
+            if not values[value]:
+                del values[value]
+                if not values:
+                    del self.postings[key]
+
+    def resolve(self, filters: dict[str, Any]) -> tuple[set[int], bool] | None:
+        """
+        Labels that can match 'filters', resolved from the postings.
+
+        :return: The candidate labels and whether they are exactly the matches (otherwise they still need 'matches_filters'), or None if no part of the filter is indexed
+        """
+        parts: list[tuple[set[int], bool] | None] = []
+        for key, condition in filters.items():
+            if key == "$and":
+                parts.extend(self.resolve(sub) for sub in condition)
+            elif key == "$or":
+                branches = [self.resolve(sub) for sub in condition]
+                resolved = [branch for branch in branches if branch is not None]
+                if len(resolved) < len(branches):
+                    parts.append(None)
+                else:
+                    parts.append(
+                        (set().union(*(labels for labels, _ in resolved)), all(exact for _, exact in resolved))
+                    )
+            elif key.startswith("$"):
+                parts.append(None)
+            else:
+                parts.append(self._resolve_field(key, condition))
+        return _intersect(parts)
+
+    def _resolve_field(self, key: str, condition: Any) -> tuple[set[int], bool] | None:
+        values = self.postings.get(key, {})
+        if not isinstance(condition, dict):
+            return (set(values.get(condition, ())), True) if _indexable(condition) else None
+
+        parts: list[tuple[set[int], bool] | None] = []
+        for op, expected in condition.items():
+            if op == "$eq" and (expected is None or _indexable(expected)):
+                # '$eq' never matches a missing field, so None selects nothing
+                parts.append((set(values.get(expected, ())) if expected is not None else set(), True))
+            elif (
+                op == "$in"
+                and isinstance(expected, (list, tuple, set, frozenset))
+                and all(option is None or _indexable(option) for option in expected)
+            ):
+                parts.append(
+                    (set().union(*(values.get(option, ()) for option in expected if option is not None)), True)
+                )
+            else:
+                parts.append(None)
+        return _intersect(parts)
+
+
+def _intersect(parts: list[tuple[set[int], bool] | None]) -> tuple[set[int], bool] | None:
+    """AND of resolved parts; unresolved parts (None) make the result a superset to be checked."""
+    resolved = sorted((part for part in parts if part is not None), key=lambda part: len(part[0]))
+    if not resolved:
+        return None
+    labels = resolved[0][0].intersection(*(part[0] for part in resolved[1:]))
+    return labels, len(resolved) == len(parts) and all(exact for _, exact in resolved)
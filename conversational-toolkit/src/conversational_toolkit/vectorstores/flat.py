@@ -0,0 +1,373 @@
+"""
+Exact, in-process vector store backed by a memory-mapped float32 matrix.
+
+'FlatVectorStore' keeps every embedding as one row of a contiguous float32 matrix saved as a '.npy' file, plus a JSON-lines side file holding the chunk records in the same row order. On startup the matrix is memory-mapped ('np.lib.format.open_memmap'), so nothing is copied until a query touches the pages. A query is a single BLAS matrix-vector product followed by 'np.argpartition', which for corpora of a few hundred thousand chunks is faster than a round trip through a database client.
+
+Rows are L2-normalised at insert time, so the dot product is the cosine similarity and 'ChunkMatch.score' is higher-is-better (like 'PGVectorStore', unlike the distances returned by 'ChromaDBVectorStore').
+
+With 'quantization' set, queries are scored against compressed codes instead of the float32 matrix ('int8': 4x smaller, 'pq': 32x smaller with the default 8 dimensions per subspace, see 'conversational_toolkit.vectorstores.quantization'). The float32 matrix stays on disk, memory-mapped, and is only read to (re)train the quantizer and, with 'rerank_factor > 0', to re-score the 'top_k * rerank_factor' best candidates exactly, which recovers most of the recall lost to quantization.
+
+Inserts append in place: the '.npy' files have room for more rows than are in use and their capacity doubles when full, so filling the store batch by batch writes every vector a constant number of times instead of rewriting the whole matrix per batch. The number of rows in use is the number of lines in 'chunks.jsonl', which is appended last and therefore acts as the commit point: rows written by an interrupted insert lie beyond it and are overwritten by the next one. Deletes compact the files.
+
+On-disk layout of 'db_path':
+    embeddings.npy  float32 matrix of shape '(capacity, embedding_size)'; the first 'n_chunks' rows are in use
+    chunks.jsonl    one JSON record per row in use: id, title, content, mime_type, metadata
+    codes.npy       quantized codes, one row per matrix row (only with 'quantization')
+    quantizer.npz   trained quantizer parameters (only with 'quantization')
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.utils.database import generate_uid
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord, VectorStore
+from conversational_toolkit.vectorstores.filters import matches_filters
+from conversational_toolkit.vectorstores.quantization import EmbeddingQuantizer, QuantizationKind, create_quantizer
+
+MATRIX_FILE_NAME = "embeddings.npy"
+RECORDS_FILE_NAME = "chunks.jsonl"
+CODES_FILE_NAME = "codes.npy"
+QUANTIZER_FILE_NAME = "quantizer.npz"
+
+
+def _write_array(path: Path, rows: NDArray[Any], capacity: int, fortran_order: bool = False) -> np.memmap:
+    """Atomically replace 'path' by a '.npy' file of 'capacity' rows starting with 'rows', and return it memory-mapped for writing."""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    array = np.lib.format.open_memmap(
+        tmp_path, mode="w+", dtype=rows.dtype, shape=(capacity, *rows.shape[1:]), fortran_order=fortran_order
+    )
+    array[: rows.shape[0]] = rows
+    array.flush()
+    del array
+    os.replace(tmp_path, path)
+    return np.lib.format.open_memmap(path, mode="r+")
+
+
+def _append_rows(
+    path: Path, storage: np.memmap | None, n_rows: int, rows: NDArray[Any], fortran_order: bool = False
+) -> np.memmap:
+    """Write 'rows' after the first 'n_rows' rows of 'storage' (the file at 'path'), doubling its capacity when full."""
+    needed = n_rows + rows.shape[0]
+    if storage is None or storage.shape[0] < needed:
+        capacity = needed if storage is None else max(needed, 2 * storage.shape[0])
+        storage = _write_array(path, rows[:0] if storage is None else storage[:n_rows], capacity, fortran_order)
+    storage[n_rows:needed] = rows
+    storage.flush()
+    return storage
+
+
+class FlatVectorStore(VectorStore):
+    """
+    Brute-force cosine similarity search over a memory-mapped embedding matrix.
+
+    Suited to small and medium corpora that fit in RAM. Metadata 'filters' use the same syntax as 'ChromaDBVectorStore' and are evaluated in Python before scoring.
+
+    Attributes:
+        db_path: Directory holding the matrix and the record file.
+        records: Chunk records in row order ('records[i]' belongs to matrix row 'i'); their number is the number of rows in use.
+        quantizer: Quantizer of the compressed codes, None when searching the float32 matrix.
+        rerank_factor: With a quantizer, re-score 'top_k * rerank_factor' candidates with the float32 vectors; 0 disables it.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        quantization: QuantizationKind | None = None,
+        rerank_factor: int = 0,
+        **quantizer_kwargs: Any,
+    ) -> None:
+        """
+        Open (or create) a flat vector store.
+
+        :param db_path: Directory in which the matrix and records are stored.
+        :param quantization: 'int8' or 'pq' to search compressed codes instead of the float32 matrix; codes are built from the stored vectors if missing.
+        :param rerank_factor: Candidates per result re-scored with the float32 vectors when quantized; 0 returns the approximate ranking.
+        :param quantizer_kwargs: Passed on to 'ProductQuantizer' (e.g. 'dims_per_subspace').
+        """
+        self.db_path = Path(db_path)
+        self.db_path.mkdir(parents=True, exist_ok=True)
+        self._matrix_path = self.db_path / MATRIX_FILE_NAME
+        self._records_path = self.db_path / RECORDS_FILE_NAME
+        self._codes_path = self.db_path / CODES_FILE_NAME
+        self._quantizer_path = self.db_path / QUANTIZER_FILE_NAME
+
+        self.records: list[dict[str, Any]] = []
+        self._row_by_id: dict[str, int] = {}
+        # Memory maps of the whole '.npy' files and views of the rows in use
+        self._matrix_storage: np.memmap | None = None
+        self._matrix: NDArray[np.float32] | None = None
+        self._codes_storage: np.memmap | None = None
+        self.quantizer: EmbeddingQuantizer | None = (
+            create_quantizer(quantization, **quantizer_kwargs) if quantization is not None else None
+        )
+        self.rerank_factor = rerank_factor
+        self._codes: NDArray[Any] | None = None
+        self._load()
+
+    def _load(self) -> None:
+        if self._records_path.exists():
+            with open(self._records_path, "r", encoding="utf-8") as f:
+                self.records = [json.loads(line) for line in f if line.strip()]
+        self._row_by_id = {record["id"]: row for row, record in enumerate(self.records)}
+
+        n_rows = len(self.records)
+        if self._matrix_path.exists():
+            self._matrix_storage = np.lib.format.open_memmap(self._matrix_path, mode="r+")
+            if self._matrix_storage.shape[0] < n_rows:
+                raise ValueError(
+                    f"Corrupt flat vector store at {self.db_path}: "
+                    f"{self._matrix_storage.shape[0]} embeddings but {n_rows} records"
+                )
+            self._matrix = self._matrix_storage[:n_rows]
+
+        if self.quantizer is None:
+            # Codes are not kept up to date without a quantizer, so they must not be picked up later
+            self._codes_path.unlink(missing_ok=True)
+            self._quantizer_path.unlink(missing_ok=True)
+        elif (
+            self._codes_path.exists()
+            and self._quantizer_path.exists()
+            and self.quantizer.load(self._quantizer_path)
+            and (codes := np.lib.format.open_memmap(self._codes_path, mode="r+")).shape[0] >= n_rows
+        ):
+            self._codes_storage = codes
+            self._codes = codes[:n_rows]
+        elif self._matrix is not None and self._matrix.shape[0] > 0:
+            self._train_quantizer()
+
+    def _write_codes(self, codes: NDArray[Any]) -> None:
+        """Atomically replace the quantizer file and the codes file, sized to 'codes'."""
+        assert self.quantizer is not None
+        tmp_path = self._quantizer_path.with_name(f"{QUANTIZER_FILE_NAME}.tmp")
+        with open(tmp_path, "wb") as f:
+            self.quantizer.save(f)
+        os.replace(tmp_path, self._quantizer_path)
+        self._codes_storage = _write_array(
+            self._codes_path, codes, codes.shape[0], fortran_order=self.quantizer.layout == "F"
+        )
+        self._codes = self._codes_storage[: codes.shape[0]]
+
+    def _train_quantizer(self) -> None:
+        """Fit the quantizer to all stored vectors and re-encode them."""
+        assert self.quantizer is not None and self._matrix is not None
+        self.quantizer.train(np.asarray(self._matrix))
+        self._write_codes(self.quantizer.encode(self._matrix))
+        logger.info(
+            f"Trained {self.quantizer.kind} quantizer on {self._matrix.shape[0]} vectors "
+            f"({self.quantizer.bytes_per_vector(self._matrix.shape[1])} bytes per vector)"
+        )
+
+    @staticmethod
+    def _normalize(vectors: NDArray[Any]) -> NDArray[np.float32]:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @property
+    def embedding_size(self) -> int | None:
+        return None if self._matrix is None else int(self._matrix.shape[1])
+
+    @property
+    def search_bytes(self) -> int:
+        """Size of the array scanned by a query: the codes when quantized, the float32 matrix otherwise."""
+        searched = self._codes if self.quantizer is not None else self._matrix
+        return 0 if searched is None else int(searched.nbytes)
+
+    def _to_record(self, row: int) -> ChunkRecord:
+        record = self.records[row]
+        return ChunkRecord(
+            id=record["id"],
+            title=record["title"],
+            content=record["content"],
+            mime_type=record["mime_type"],
+            metadata=record["metadata"],
+            embedding=[],
+        )
+
+    def _candidate_rows(self, filters: dict[str, Any] | None) -> NDArray[np.intp] | None:
+        """Rows passing 'filters', or None when every row is a candidate."""
+        if not filters:
+            return None
+        return np.asarray(
+            [
+                row
+                for row, record in enumerate(self.records)
+                if matches_filters(
+                    {"title": record["title"], "mime_type": record["mime_type"], **record["metadata"]}, filters
+                )
+            ],
+            dtype=np.intp,
+        )
+
+    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> list[str]:
+        """
+        Append chunks and their embeddings to the store.
+
+        :param chunks: List of document chunks
+        :param embedding: Corresponding embedding vectors, one row per chunk
+        :return: The IDs assigned to the chunks, in order
+        """
+        if not chunks:
+            return []
+
+        vectors = self._normalize(embedding)
+        if vectors.shape[0] != len(chunks):
+            raise ValueError(f"Got {len(chunks)} chunks but {vectors.shape[0]} embeddings")
+        if self.embedding_size is not None and vectors.shape[1] != self.embedding_size:
+            raise ValueError(f"Expected embeddings of size {self.embedding_size}, got {vectors.shape[1]}")
+
+        new_records = [
+            {
+                "id": generate_uid(),
+                "title": chunk.title,
+                "content": chunk.content,
+                "mime_type": chunk.mime_type,
+                "metadata": chunk.metadata,
+            }
+            for chunk in chunks
+        ]
+
+        n_rows = len(self.records)
+        self._matrix_storage = _append_rows(self._matrix_path, self._matrix_storage, n_rows, vectors)
+        self._matrix = self._matrix_storage[: n_rows + len(new_records)]
+        if self.quantizer is not None:
+            if self._codes is None or self._matrix.shape[0] > 2 * self.quantizer.n_trained:
+                # Not trained yet, or trained on less than half of the data: codebooks may no longer fit
+                self._train_quantizer()
+            else:
+                self._codes_storage = _append_rows(
+                    self._codes_path,
+                    self._codes_storage,
+                    n_rows,
+                    self.quantizer.encode(vectors),
+                    fortran_order=self.quantizer.layout == "F",
+                )
+                self._codes = self._codes_storage[: self._matrix.shape[0]]
+
+        # Appending the records commits the new rows
+        with open(self._records_path, "a", encoding="utf-8") as f:
+            for record in new_records:
+                f.write(json.dumps(record, default=str) + "\n")
+
+        for record in new_records:
+            self._row_by_id[record["id"]] = len(self.records)
+            self.records.append(record)
+        return [record["id"] for record in new_records]
+
+    async def delete_chunks(self, chunk_ids: list[str]) -> None:
+        """
+        Remove chunks and their matrix rows. The matrix and record file are rewritten once per call, so delete in batches.
+
+        :param chunk_ids: IDs of the chunks to delete; unknown IDs are ignored
+        """
+        rows = sorted({row for cid in chunk_ids if (row := self._row_by_id.get(str(cid))) is not None})
+        if not rows or self._matrix is None:
+            return
+
+        matrix = np.delete(np.asarray(self._matrix), rows, axis=0)
+        self._matrix_storage = _write_array(self._matrix_path, matrix, matrix.shape[0])
+        self._matrix = self._matrix_storage[: matrix.shape[0]]
+        if self._codes is not None:
+            self._write_codes(np.delete(self._codes, rows, axis=0))
+        removed = set(rows)
+        self.records = [record for row, record in enumerate(self.records) if row not in removed]
+
+        tmp_path = self._records_path.with_name(f"{RECORDS_FILE_NAME}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record, default=str) + "\n")
+        os.replace(tmp_path, self._records_path)
+        self._row_by_id = {record["id"]: row for row, record in enumerate(self.records)}
+
+    async def get_chunks_by_embedding(
+        self, embedding: NDArray[np.float64], top_k: int, filters: dict[str, Any] | None = None
+    ) -> list[ChunkMatch]:
+        """
+        Return the 'top_k' chunks with the highest cosine similarity to 'embedding'.
+
+        :param embedding: Query embedding
+        :param top_k: Number of results to return
+        :param filters: Optional ChromaDB-style metadata filters
+        """
+        return (await self.get_chunks_by_embeddings(np.atleast_2d(embedding), top_k, filters))[0]
+
+    async def get_chunks_by_embeddings(
+        self, embeddings: NDArray[np.float64], top_k: int, filters: dict[str, Any] | None = None
+    ) -> list[list[ChunkMatch]]:
+        """
+        Score every query row against the matrix with a single matrix-matrix product.
+
+        :param embeddings: Query embeddings, one per row
+        :param top_k: Number of results to return per query
+        :param filters: Optional ChromaDB-style metadata filters, applied to every query
+        """
+        queries = self._normalize(embeddings)
+        if self._matrix is None or top_k <= 0:
+            return [[] for _ in queries]
+
+        rows = self._candidate_rows(filters)
+        n_candidates = self._matrix.shape[0] if rows is None else rows.shape[0]
+        if n_candidates == 0:
+            return [[] for _ in queries]
+        k = min(top_k, n_candidates)
+
+        # (n_candidates, n_queries); a single query degenerates to a matrix-vector product.
+        if self.quantizer is not None and self._codes is not None:
+            codes = self._codes if rows is None else self._codes[rows]
+            scores = self.quantizer.scores(codes, queries)
+            shortlist = min(k * self.rerank_factor, n_candidates) if self.rerank_factor > 0 else k
+        else:
+            matrix = self._matrix if rows is None else self._matrix[rows]
+            scores = matrix @ queries.T
+            shortlist = k
+
+        results: list[list[ChunkMatch]] = []
+        for query, column in zip(queries, scores.T):
+            top = np.argpartition(-column, shortlist - 1)[:shortlist]
+            top_rows = top if rows is None else rows[top]
+            top_scores = column[top]
+            if shortlist > k:
+                # Exact float32 scores for the shortlist; sorted rows read the memory map sequentially
+                order = np.argsort(top_rows)
+                top_rows, top_scores = top_rows[order], self._matrix[top_rows[order]] @ query
+            best = np.argsort(-top_scores)[:k]
+            results.append(
+                [ChunkMatch(**self._to_record(int(top_rows[i])).model_dump(), score=float(top_scores[i])) for i in best]
+            )
+        return results
+
+    async def get_chunk_ids(self) -> list[str]:
+        """Return the IDs of all stored chunks, in row order."""
+        return [record["id"] for record in self.records]
+
+    async def get_chunks_by_filter(self, filters: dict[str, Any] | None = None) -> list[ChunkRecord]:
+        """
+        Return all chunks matching the given metadata filters (no embedding needed).
+
+        Filters use the ChromaDB syntax, see 'conversational_toolkit.vectorstores.filters'.
+        """
+        rows = self._candidate_rows(filters)
+        if rows is None:
+            return [self._to_record(row) for row in range(len(self.records))]
+        return [self._to_record(int(row)) for row in rows]
+
+    async def get_chunks_by_ids(self, chunk_ids: str | list[str]) -> list[ChunkRecord]:
+        """
+        Retrieve chunks by their IDs, in the requested order. Unknown IDs are skipped.
+
+        :param chunk_ids: A single ID or a list of IDs
+        :return: List of retrieved chunks
+        """
+        if not isinstance(chunk_ids, list):
+            chunk_ids = [chunk_ids]
+
+        rows = [self._row_by_id.get(str(cid)) for cid in chunk_ids]
+        return [self._to_record(row) for row in rows if row is not None]
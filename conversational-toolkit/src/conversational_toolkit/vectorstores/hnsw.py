@@ -0,0 +1,434 @@
+"""
+Approximate nearest-neighbour vector store backed by an HNSW graph ('hnswlib').
+
+An exact scan ('FlatVectorStore') touches every stored vector per query, so its latency grows linearly with the corpus. 'HNSWVectorStore' keeps the vectors in a hierarchical navigable small-world graph and answers a query by a greedy walk that visits a few thousand nodes, whatever the corpus size. Three parameters trade recall for speed and memory:
+    M: links per node. Higher M gives better recall and costs more memory (about 'M * 8' bytes per vector) and slower inserts.
+    ef_construction: candidate list size while inserting; higher values build a better graph, more slowly.
+    ef_search: candidate list size while searching, settable per query; higher values give better recall and slower queries.
+
+Deleting a chunk marks its graph node as deleted (a tombstone): the node still routes searches but is never returned, and its slot is re-used by later inserts. Metadata 'filters' use the same syntax as 'ChromaDBVectorStore'. Equality and '$in' conditions are answered from an inverted index of the metadata values ('MetadataIndex'); other conditions are evaluated in Python over the candidate records, outside the graph lock, and the resulting set of matching chunks is cached per filter until the next write. A selective filter (at most 'exact_search_threshold' matching chunks) is answered by an exact scan over the matching vectors, and a broader one by a graph search that only accepts matching nodes.
+
+Vectors are L2-normalised at insert time and the graph uses inner-product distance, so 'ChunkMatch.score' is the cosine similarity (higher is better, like 'FlatVectorStore').
+
+Snapshots are written on 'save' (or after every write with 'autosave=True') while holding only the write lock, so queries keep running during a snapshot. Each snapshot goes to a new directory and is published by atomically replacing the 'CURRENT' pointer, so a crash while saving leaves the previous snapshot intact. On-disk layout of 'db_path':
+    CURRENT                     name of the latest snapshot directory
+    snapshot-<n>/index.bin      the hnswlib graph, including the vectors and tombstones
+    snapshot-<n>/chunks.jsonl   one JSON record per live chunk: label, id, title, content, mime_type, metadata
+    snapshot-<n>/meta.json      embedding size and graph parameters
+"""
+
+import json
+import os
+import shutil
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import hnswlib  # type: ignore[import-untyped]
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.utils.database import generate_uid
+from conversational_toolkit.utils.executors import run_in_thread
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord, VectorStore
+from conversational_toolkit.vectorstores.filters import MetadataIndex, matches_filters
+
+CURRENT_FILE_NAME = "CURRENT"
+INDEX_FILE_NAME = "index.bin"
+RECORDS_FILE_NAME = "chunks.jsonl"
+META_FILE_NAME = "meta.json"
+# Number of distinct filters whose matching labels are cached between writes
+FILTER_CACHE_SIZE = 128
+
+
+class HNSWVectorStore(VectorStore):
+    """
+    Approximate cosine similarity search over an HNSW graph.
+
+    Graph operations run in the shared thread pool ('run_in_thread') and are serialised by a lock, as 'hnswlib' sets 'ef' on the index rather than per call. Inserts, deletes and snapshots are additionally serialised by a write lock; a snapshot holds only the write lock, so searches are not blocked while it is written.
+
+    Attributes:
+        db_path: Directory holding the snapshots.
+        M: Links per graph node. Fixed once the index exists.
+        ef_construction: Candidate list size while inserting. Fixed once the index exists.
+        ef_search: Default candidate list size while searching.
+        exact_search_threshold: Filtered queries matching at most this many chunks are answered by an exact scan.
+        autosave: Write a snapshot after every insert and delete. Off by default: call 'save' at the end of an ingestion run ('IngestionPipeline' and 'VectorStoreSync' do).
+        num_threads: Threads used by 'hnswlib' for inserts and batched queries; -1 uses all cores.
+        records: Chunk records of the live chunks, by graph label.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        M: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        initial_capacity: int = 10_000,
+        exact_search_threshold: int = 1_000,
+        autosave: bool = False,
+        num_threads: int = -1,
+    ) -> None:
+        """
+        Open (or create) an HNSW vector store.
+
+        :param db_path: Directory in which the snapshots are stored.
+        :param M: Links per graph node, only used when the index is created.
+        :param ef_construction: Candidate list size while inserting, only used when the index is created.
+        :param ef_search: Default candidate list size while searching; can be overridden per query.
+        :param initial_capacity: Number of vectors the new index has room for; it doubles when full.
+        :param exact_search_threshold: Filtered queries matching at most this many chunks are answered by an exact scan.
+        :param autosave: Write a snapshot after every insert and delete, instead of only on 'save'.
+        :param num_threads: Threads used by 'hnswlib'; -1 uses all cores.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.mkdir(parents=True, exist_ok=True)
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.initial_capacity = initial_capacity
+        self.exact_search_threshold = exact_search_threshold
+        self.autosave = autosave
+        self.num_threads = num_threads
+
+        self.records: dict[int, dict[str, Any]] = {}
+        self._label_by_id: dict[str, int] = {}
+        self._next_label = 0
+        self._snapshot = 0
+        self._index: hnswlib.Index | None = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._metadata_index = MetadataIndex()
+        # Bumped by every insert and delete; cached filter results are only valid for the version they were computed at
+        self._version = 0
+        self._filter_cache: dict[str, tuple[int, set[int]]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        current_path = self.db_path / CURRENT_FILE_NAME
+        if not current_path.exists():
+            return
+        snapshot_dir = self.db_path / current_path.read_text(encoding="utf-8").strip()
+
+        meta = json.loads((snapshot_dir / META_FILE_NAME).read_text(encoding="utf-8"))
+        self._snapshot = meta["snapshot"]
+        self._next_label = meta["next_label"]
+        self.M = meta["M"]
+        self.ef_construction = meta["ef_construction"]
+
+        with open(snapshot_dir / RECORDS_FILE_NAME, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    label = record.pop("label")
+                    self.records[label] = record
+                    self._label_by_id[record["id"]] = label
+                    self._metadata_index.add(label, self._filterable(record))
+
+        if meta["dimensions"] is not None:
+            self._index = hnswlib.Index(space="ip", dim=meta["dimensions"])
+            self._index.load_index(str(snapshot_dir / INDEX_FILE_NAME), allow_replace_deleted=True)
+        logger.debug(f"Loaded HNSW vector store {snapshot_dir} with {len(self.records)} chunks")
+
+    def _save_snapshot(self) -> None:
+        """Write a new snapshot and point 'CURRENT' at it. Must hold the write lock, which keeps the graph and records unchanged; searches may run meanwhile."""
+        self._snapshot += 1
+        name = f"snapshot-{self._snapshot}"
+        snapshot_dir = self.db_path / name
+        snapshot_dir.mkdir(exist_ok=True)
+
+        if self._index is not None:
+            self._index.save_index(str(snapshot_dir / INDEX_FILE_NAME))
+        with open(snapshot_dir / RECORDS_FILE_NAME, "w", encoding="utf-8") as f:
+            for label, record in self.records.items():
+                f.write(json.dumps({"label": label, **record}, default=str) + "\n")
+        meta = {
+            "snapshot": self._snapshot,
+            "dimensions": self.embedding_size,
+            "M": self.M,
+            "ef_construction": self.ef_construction,
+            "next_label": self._next_label,
+        }
+        (snapshot_dir / META_FILE_NAME).write_text(json.dumps(meta), encoding="utf-8")
+
+        tmp_path = self.db_path / f"{CURRENT_FILE_NAME}.tmp"
+        tmp_path.write_text(name, encoding="utf-8")
+        os.replace(tmp_path, self.db_path / CURRENT_FILE_NAME)
+
+        for old_dir in self.db_path.glob("snapshot-*"):
+            if old_dir.name != name:
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+    async def save(self) -> None:
+        """Write a snapshot of the index and records (needed after changes made with 'autosave=False')."""
+
+        def save() -> None:
+            with self._write_lock:
+                self._save_snapshot()
+
+        await run_in_thread(save)
+
+    @staticmethod
+    def _normalize(vectors: NDArray[Any]) -> NDArray[np.float32]:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @property
+    def embedding_size(self) -> int | None:
+        return None if self._index is None else int(self._index.dim)
+
+    @staticmethod
+    def _to_record(record: dict[str, Any]) -> ChunkRecord:
+        return ChunkRecord(
+            id=record["id"],
+            title=record["title"],
+            content=record["content"],
+            mime_type=record["mime_type"],
+            metadata=record["metadata"],
+            embedding=[],
+        )
+
+    def _match(self, label: int, score: float) -> ChunkMatch:
+        return ChunkMatch(**self._to_record(self.records[label]).model_dump(), score=score)
+
+    @staticmethod
+    def _filterable(record: dict[str, Any]) -> dict[str, Any]:
+        """The fields 'filters' are evaluated against: the metadata plus title and MIME type."""
+        return {"title": record["title"], "mime_type": record["mime_type"], **record["metadata"]}
+
+    @classmethod
+    def _matches(cls, record: dict[str, Any], filters: dict[str, Any]) -> bool:
+        return matches_filters(cls._filterable(record), filters)
+
+    def _allowed(self, filters: dict[str, Any]) -> set[int]:
+        """
+        Labels of the chunks matching 'filters'.
+
+        Safe to call without the lock: 'records' is copied before it is scanned and the postings are only read. A write running concurrently may or may not be reflected, which callers detect by comparing '_version'.
+        """
+        key = json.dumps(filters, sort_keys=True, default=str)
+        version = self._version
+        cached = self._filter_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        resolved = self._metadata_index.resolve(filters)
+        if resolved is None:
+            allowed = {label for label, record in list(self.records.items()) if self._matches(record, filters)}
+        elif resolved[1]:
+            allowed = resolved[0]
+        else:
+            allowed = {
+                label
+                for label in resolved[0]
+                if (record := self.records.get(label)) is not None and self._matches(record, filters)
+            }
+
+        if len(self._filter_cache) >= FILTER_CACHE_SIZE:
+            self._filter_cache.clear()
+        self._filter_cache[key] = (version, allowed)
+        return allowed
+
+    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> list[str]:
+        """
+        Add chunks and their embeddings to the graph.
+
+        :param chunks: List of document chunks
+        :param embedding: Corresponding embedding vectors, one row per chunk
+        :return: The IDs assigned to the chunks, in order
+        """
+        if not chunks:
+            return []
+
+        vectors = self._normalize(embedding)
+        if vectors.shape[0] != len(chunks):
+            raise ValueError(f"Got {len(chunks)} chunks but {vectors.shape[0]} embeddings")
+        if self.embedding_size is not None and vectors.shape[1] != self.embedding_size:
+            raise ValueError(f"Expected embeddings of size {self.embedding_size}, got {vectors.shape[1]}")
+
+        new_records = [
+            {
+                "id": generate_uid(),
+                "title": chunk.title,
+                "content": chunk.content,
+                "mime_type": chunk.mime_type,
+                "metadata": chunk.metadata,
+            }
+            for chunk in chunks
+        ]
+        await run_in_thread(self._insert, vectors, new_records)
+        return [record["id"] for record in new_records]
+
+    def _insert(self, vectors: NDArray[np.float32], new_records: list[dict[str, Any]]) -> None:
+        with self._write_lock:
+            with self._lock:
+                self._add(vectors, new_records)
+            if self.autosave:
+                self._save_snapshot()
+
+    def _add(self, vectors: NDArray[np.float32], new_records: list[dict[str, Any]]) -> None:
+        """Add the vectors to the graph and register their records. Must hold both locks."""
+        if self._index is None:
+            self._index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+            self._index.init_index(
+                max_elements=max(self.initial_capacity, len(new_records)),
+                M=self.M,
+                ef_construction=self.ef_construction,
+                allow_replace_deleted=True,
+            )
+
+        # Tombstoned slots are re-used first, so this over-estimates the space needed
+        needed = self._index.get_current_count() + len(new_records)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+
+        labels = np.arange(self._next_label, self._next_label + len(new_records), dtype=np.uint64)
+        self._index.add_items(vectors, labels, num_threads=self.num_threads, replace_deleted=True)
+        self._next_label += len(new_records)
+        for label, record in zip(labels.tolist(), new_records):
+            self.records[label] = record
+            self._label_by_id[record["id"]] = label
+            self._metadata_index.add(label, self._filterable(record))
+        self._version += 1
+
+    async def delete_chunks(self, chunk_ids: list[str]) -> None:
+        """
+        Mark chunks as deleted. Their graph nodes stay as tombstones until re-used by later inserts.
+
+        :param chunk_ids: IDs of the chunks to delete; unknown IDs are ignored
+        """
+        if chunk_ids:
+            await run_in_thread(self._delete, [str(cid) for cid in chunk_ids])
+
+    def _delete(self, chunk_ids: list[str]) -> None:
+        with self._write_lock:
+            with self._lock:
+                labels = [label for cid in chunk_ids if (label := self._label_by_id.pop(cid, None)) is not None]
+                if not labels or self._index is None:
+                    return
+                for label in labels:
+                    self._index.mark_deleted(label)
+                    self._metadata_index.remove(label, self._filterable(self.records.pop(label)))
+                self._version += 1
+
+            if self.autosave:
+                self._save_snapshot()
+
+    async def get_chunks_by_embedding(
+        self,
+        embedding: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        ef_search: int | None = None,
+    ) -> list[ChunkMatch]:
+        """
+        Return the (approximately) 'top_k' chunks with the highest cosine similarity to 'embedding'.
+
+        :param embedding: Query embedding
+        :param top_k: Number of results to return
+        :param filters: Optional ChromaDB-style metadata filters
+        :param ef_search: Candidate list size for this query; defaults to 'self.ef_search'
+        """
+        return (await self.get_chunks_by_embeddings(np.atleast_2d(embedding), top_k, filters, ef_search))[0]
+
+    async def get_chunks_by_embeddings(
+        self,
+        embeddings: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        ef_search: int | None = None,
+    ) -> list[list[ChunkMatch]]:
+        """
+        Search the graph for every query row in one 'hnswlib' call.
+
+        :param embeddings: Query embeddings, one per row
+        :param top_k: Number of results to return per query
+        :param filters: Optional ChromaDB-style metadata filters, applied to every query
+        :param ef_search: Candidate list size for these queries; defaults to 'self.ef_search'
+        """
+        queries = self._normalize(embeddings)
+        if self._index is None or top_k <= 0:
+            return [[] for _ in queries]
+        return await run_in_thread(self._search, queries, top_k, filters, ef_search or self.ef_search)
+
+    def _search(
+        self, queries: NDArray[np.float32], top_k: int, filters: dict[str, Any] | None, ef_search: int
+    ) -> list[list[ChunkMatch]]:
+        # Resolve the filter before taking the lock, so a slow filter does not block writes and other queries
+        version = self._version
+        allowed = self._allowed(filters) if filters else None
+        with self._lock:
+            assert self._index is not None
+            accept: Callable[[int], bool] | None = None
+            if filters:
+                if version != self._version:
+                    # A write landed while the filter was resolved
+                    allowed = self._allowed(filters)
+                assert allowed is not None
+                if len(allowed) <= self.exact_search_threshold:
+                    return [self._exact_search(query, top_k, list(allowed)) for query in queries]
+                accept = allowed.__contains__
+
+            k = min(top_k, len(self.records) if allowed is None else len(allowed))
+            if k == 0:
+                return [[] for _ in queries]
+            self._index.set_ef(max(ef_search, k))
+            try:
+                # The filter is a Python callback, which 'hnswlib' only supports efficiently on a single thread
+                labels, distances = self._index.knn_query(
+                    queries, k=k, num_threads=self.num_threads if accept is None else 1, filter=accept
+                )
+            except RuntimeError:
+                # Fewer than k live nodes reachable, e.g. after many deletions
+                logger.warning(f"HNSW search found fewer than {k} results, falling back to an exact scan")
+                candidates = list(self.records if allowed is None else allowed)
+                return [self._exact_search(query, top_k, candidates) for query in queries]
+
+            return [
+                [self._match(int(label), 1.0 - float(distance)) for label, distance in zip(row_labels, row_distances)]
+                for row_labels, row_distances in zip(labels, distances)
+            ]
+
+    def _exact_search(self, query: NDArray[np.float32], top_k: int, labels: list[int]) -> list[ChunkMatch]:
+        """Score 'query' against the vectors of 'labels' stored in the graph. Must hold the lock."""
+        assert self._index is not None
+        if not labels:
+            return []
+        scores = np.asarray(self._index.get_items(labels), dtype=np.float32) @ query
+        k = min(top_k, len(labels))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [self._match(labels[i], float(scores[i])) for i in top[np.argsort(-scores[top])]]
+
+    async def get_chunk_ids(self) -> list[str]:
+        """Return the IDs of all stored chunks."""
+        return list(self._label_by_id)
+
+    async def get_chunks_by_filter(self, filters: dict[str, Any] | None = None) -> list[ChunkRecord]:
+        """
+        Return all chunks matching the given metadata filters (no embedding needed).
+
+        Filters use the ChromaDB syntax, see 'conversational_toolkit.vectorstores.filters'.
+        """
+        if not filters:
+            return [self._to_record(record) for record in list(self.records.values())]
+        allowed = self._allowed(filters)
+        records = [self.records.get(label) for label in sorted(allowed)]
+        return [self._to_record(record) for record in records if record is not None]
+
+    async def get_chunks_by_ids(self, chunk_ids: str | list[str]) -> list[ChunkRecord]:
+        """
+        Retrieve chunks by their IDs, in the requested order. Unknown IDs are skipped.
+
+        :param chunk_ids: A single ID or a list of IDs
+        :return: List of retrieved chunks
+        """
+        if not isinstance(chunk_ids, list):
+            chunk_ids = [chunk_ids]
+
+        records = [self.records.get(self._label_by_id.get(str(cid), -1)) for cid in chunk_ids]
+        return [self._to_record(record) for record in records if record is not None]
@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
 
 from conversational_toolkit.chunking.base import Chunk
 from conversational_toolkit.utils.database import generate_uid
-from conversational_toolkit.vectorstores.base import VectorStore, ChunkMatch
+from conversational_toolkit.vectorstores.base import VectorStore, ChunkMatch, ChunkRecord
 
 from sqlalchemy import text, and_
 from sqlalchemy import MetaData
@@ -13,7 +13,7 @@ from sqlalchemy import Table, Column, String, JSON
 from pgvector.sqlalchemy import Vector  # type: ignore[import-untyped]
 from numpy.typing import NDArray
 
-from sqlalchemy import insert, select
+from sqlalchemy import delete, insert, literal, select, union_all
 
 
 class PGVectorStore(VectorStore):
@@ -67,12 +67,13 @@ class PGVectorStore(VectorStore):
         async with self.engine.begin() as session:
             await session.run_sync(self.metadata.create_all)
 
-    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> None:
+    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> list[str]:
         """
         Inserts a document and its embedding into the table.
 
         :param chunks: List of document chunks, each containing a title, content, and metadata
         :param embedding: Array of embedding vectors corresponding to the document chunks
+        :return: The IDs assigned to the chunks, in order
         """
         data_to_insert = [
             {
@@ -90,6 +91,20 @@ class PGVectorStore(VectorStore):
             async with session.begin():
                 stmt = insert(self.table)
                 await session.execute(stmt, data_to_insert)
+        return [row["id"] for row in data_to_insert]
+
+    async def delete_chunks(self, chunk_ids: list[str]) -> None:
+        """
+        Delete chunks with a single set-based statement.
+
+        :param chunk_ids: IDs of the chunks to delete; unknown IDs are ignored
+        """
+        if not chunk_ids:
+            return
+
+        async with self.SessionLocal() as session:
+            await session.execute(delete(self.table).where(self.table.columns.id.in_(chunk_ids)))
+            await session.commit()
 
     async def get_chunks_by_embedding(
         self,
@@ -129,14 +144,94 @@ class PGVectorStore(VectorStore):
             ]
         return results
 
-    async def get_chunks_by_ids(self, chunk_ids: int | list[int]) -> list[Chunk]:
+    async def get_chunks_by_embeddings(
+        self,
+        embeddings: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+    ) -> list[list[ChunkMatch]]:
+        """
+        Search for the top K most similar documents for several embeddings in one round trip.
+
+        Each query becomes its own ordered and limited SELECT; the SELECTs are combined with UNION ALL and tagged with their query index.
+
+        :param embeddings: Embedding vectors to search for, one per row
+        :param top_k: Number of top results to return per query
+        :param filters: Dict of metadata to filter on (optional), applied to every query
+        :return: One list of ChunkMatch objects per query
+        """
+        if len(embeddings) == 0:
+            return []
+
+        queries = []
+        for query_index, embedding in enumerate(embeddings):
+            score = (1 - self.table.columns.embedding.cosine_distance(embedding)).label("score")
+            query = select(self.table, score, literal(query_index).label("query_index"))
+            if filters:
+                conditions = [getattr(self.table.c, key) == value for key, value in filters.items()]
+                query = query.where(and_(*conditions))
+            queries.append(query.order_by(score.desc()).limit(top_k))
+
+        results: list[list[ChunkMatch]] = [[] for _ in embeddings]
+        async with self.SessionLocal() as session:
+            rows = await session.execute(union_all(*queries))
+            for chunk in rows:
+                results[chunk.query_index].append(
+                    ChunkMatch(
+                        id=chunk.id,
+                        title=chunk.title,  # type: ignore[reportCallIssue]
+                        content=chunk.content,  # type: ignore[reportCallIssue]
+                        embedding=chunk.embedding,
+                        mime_type=chunk.mime_type,  # type: ignore[reportCallIssue]
+                        score=chunk.score,
+                    )
+                )
+
+        for matches in results:
+            matches.sort(key=lambda match: match.score, reverse=True)
+        return results
+
+    async def get_chunk_ids(self) -> list[str]:
+        """Return the IDs of all stored chunks with a single 'SELECT id' query."""
+        async with self.SessionLocal() as session:
+            results = await session.execute(select(self.table.c.id))
+            return [str(chunk_id) for chunk_id in results.scalars()]
+
+    async def get_chunks_by_filter(self, filters: dict[str, Any] | None = None) -> list[ChunkRecord]:
+        """
+        Return all chunks matching the given filters (no embedding needed).
+
+        :param filters: Dict of column values to filter on (optional), same equality semantics as 'get_chunks_by_embedding'
+        :return: List of ChunkRecord objects
+        """
+        async with self.SessionLocal() as session:
+            query = select(self.table)
+            if filters:
+                conditions = [getattr(self.table.c, key) == value for key, value in filters.items()]
+                query = query.where(and_(*conditions))
+
+            results = await session.execute(query)
+            chunks = [
+                ChunkRecord(
+                    id=result.id,
+                    title=result.title,
+                    content=result.content,
+                    mime_type=result.mime_type,
+                    metadata=result.chunk_metadata,
+                    embedding=[],
+                )
+                for result in results
+            ]
+        return chunks
+
+    async def get_chunks_by_ids(self, chunk_ids: str | list[str]) -> list[ChunkRecord]:
         """
         Search for document chunks based on a single chunk ID or a list of chunk IDs.
 
         :param chunk_ids: A single ID or a list of IDs of the chunks to search for
         :return: List of document chunks matching the given IDs
         """
-        if isinstance(chunk_ids, int):
+        if isinstance(chunk_ids, str):
             chunk_ids = [chunk_ids]
 
         if not chunk_ids:
@@ -146,11 +241,13 @@ class PGVectorStore(VectorStore):
             results = await session.execute(select(self.table).where(self.table.columns.id.in_(chunk_ids)))
 
             chunks = [
-                Chunk(
+                ChunkRecord(
+                    id=result.id,
                     title=result.title,
                     content=result.content,
-                    mime_type="text/plain",
+                    mime_type=result.mime_type,
                     metadata=result.chunk_metadata,
+                    embedding=[],
                 )
                 for result in results
             ]
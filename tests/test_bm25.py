@@ -0,0 +1,140 @@
+import asyncio
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.retriever.bm25_index import BM25Index, tokenize
+from conversational_toolkit.retriever.bm25_retriever import BM25Retriever
+from conversational_toolkit.vectorstores.flat import FlatVectorStore
+
+DOCUMENTS = {
+    "a": "the quick brown fox jumps over the lazy dog",
+    "b": "the lazy cat sleeps all day",
+    "c": "a quick brown dog outpaces a quick red fox",
+    "d": "nothing in common here",
+}
+
+
+def reference_scores(
+    documents: dict[str, str], query: str, k1: float = 1.5, b: float = 0.75
+) -> dict[str, float]:
+    """BM25 Okapi with the non-negative (Lucene) IDF, computed term by term."""
+    tokens = {chunk_id: tokenize(text) for chunk_id, text in documents.items()}
+    average_length = sum(map(len, tokens.values())) / len(tokens)
+    scores: dict[str, float] = {}
+    for term in set(tokenize(query)):
+        containing = [chunk_id for chunk_id in tokens if term in tokens[chunk_id]]
+        idf = math.log(
+            1 + (len(tokens) - len(containing) + 0.5) / (len(containing) + 0.5)
+        )
+        for chunk_id in containing:
+            frequency = Counter(tokens[chunk_id])[term]
+            norm = k1 * (1 - b + b * len(tokens[chunk_id]) / average_length)
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (
+                k1 + 1
+            ) / (frequency + norm)
+    return scores
+
+
+def build_index(documents: dict[str, str]) -> BM25Index:
+    index = BM25Index()
+    for chunk_id, text in documents.items():
+        index.add(chunk_id, text)
+    return index
+
+
+def test_search_matches_reference_bm25_scores():
+    index = build_index(DOCUMENTS)
+
+    hits = index.search("quick fox", top_k=10)
+    expected = reference_scores(DOCUMENTS, "quick fox")
+    assert [chunk_id for chunk_id, _ in hits] == sorted(
+        expected, key=expected.get, reverse=True
+    )
+    for chunk_id, score in hits:
+        assert score == pytest.approx(expected[chunk_id], rel=1e-5)
+
+    assert [chunk_id for chunk_id, _ in index.search("quick fox", top_k=1)] == ["c"]
+    assert index.search("unicorn", top_k=10) == []
+
+
+def test_add_replaces_and_remove_drops_chunks():
+    index = build_index(DOCUMENTS)
+    index.search("cat", top_k=10)  # compile the search state before changing it
+
+    index.add("b", "a lazy dog sleeps all day")
+    index.remove("d")
+    index.remove("unknown")
+
+    documents = {**DOCUMENTS, "b": "a lazy dog sleeps all day"}
+    del documents["d"]
+    assert len(index) == 3
+    assert "d" not in index
+    assert index.search("cat", top_k=10) == []
+    assert "common" not in index.postings
+
+    expected = reference_scores(documents, "lazy dog")
+    for chunk_id, score in index.search("lazy dog", top_k=10):
+        assert score == pytest.approx(expected[chunk_id], rel=1e-5)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = build_index(DOCUMENTS)
+    index.save(tmp_path / "bm25.json")
+
+    loaded = BM25Index.load(tmp_path / "bm25.json")
+    assert loaded.fingerprint == index.fingerprint
+    assert loaded.search("quick brown fox", 3) == index.search("quick brown fox", 3)
+
+    loaded.remove("a")
+    assert loaded.search("jumps", 3) == []
+
+
+def insert(store: FlatVectorStore, texts: list[str]) -> list[str]:
+    chunks = [
+        Chunk(title="", content=text, mime_type="text/plain", metadata={})
+        for text in texts
+    ]
+    vectors = np.random.default_rng(len(texts)).normal(size=(len(texts), 4))
+    return asyncio.run(store.insert_chunks(chunks, vectors))
+
+
+def test_retriever_persists_only_on_save(tmp_path):
+    store = FlatVectorStore(str(tmp_path / "store"))
+    index_path = tmp_path / "bm25.json"
+    retriever = BM25Retriever(store, top_k=2, index_path=str(index_path))
+    asyncio.run(retriever.warm_up())
+    assert BM25Index.load(index_path).doc_lengths == {}
+
+    ids = insert(store, ["quick brown fox", "lazy dog"])
+    retriever.add_chunks(asyncio.run(store.get_chunks_by_ids(ids)))
+    assert len(BM25Index.load(index_path)) == 0
+
+    asyncio.run(retriever.save())
+    assert BM25Index.load(index_path).fingerprint == retriever.index.fingerprint
+
+
+def test_retriever_rebuilds_an_index_whose_fingerprint_is_stale(tmp_path):
+    store = FlatVectorStore(str(tmp_path / "store"))
+    index_path = str(tmp_path / "bm25.json")
+    ids = insert(store, ["quick brown fox", "lazy dog", "red fox"])
+    asyncio.run(BM25Retriever(store, top_k=3, index_path=index_path).warm_up())
+
+    # The store changes without the index being told
+    asyncio.run(store.delete_chunks([ids[0]]))
+    new_ids = insert(store, ["arctic fox"])
+
+    retriever = BM25Retriever(store, top_k=3, index_path=index_path)
+    assert ids[0] in retriever.index
+    matches = asyncio.run(retriever.retrieve("fox"))
+    assert {match.id for match in matches} == {ids[2], new_ids[0]}
+    assert ids[0] not in retriever.index
+
+    unverified = BM25Retriever(
+        store, top_k=3, index_path=index_path, verify_index=False
+    )
+    asyncio.run(unverified.warm_up())
+    assert unverified.index.fingerprint == retriever.index.fingerprint
@@ -0,0 +1,140 @@
+import asyncio
+
+import numpy as np
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.vectorstores.flat import FlatVectorStore
+
+DIMENSIONS = 16
+
+
+def make_chunks(n: int, offset: int = 0) -> list[Chunk]:
+    return [
+        Chunk(
+            title=f"chunk {i}",
+            content=f"content {i}",
+            mime_type="text/plain",
+            metadata={"parity": "even" if i % 2 == 0 else "odd"},
+        )
+        for i in range(offset, offset + n)
+    ]
+
+
+def make_vectors(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, DIMENSIONS))
+
+
+def fill(
+    store: FlatVectorStore, vectors: np.ndarray, batch_size: int = 16
+) -> list[str]:
+    async def insert() -> list[str]:
+        ids: list[str] = []
+        for start in range(0, len(vectors), batch_size):
+            batch = vectors[start : start + batch_size]
+            ids += await store.insert_chunks(make_chunks(len(batch), start), batch)
+        return ids
+
+    return asyncio.run(insert())
+
+
+def top_ids(
+    store: FlatVectorStore, query: np.ndarray, top_k: int, filters=None
+) -> list[str]:
+    return [
+        match.id
+        for match in asyncio.run(store.get_chunks_by_embedding(query, top_k, filters))
+    ]
+
+
+def test_exact_search_ranks_by_cosine_similarity(tmp_path):
+    vectors = make_vectors(100)
+    store = FlatVectorStore(str(tmp_path))
+    ids = fill(store, vectors)
+
+    matches = asyncio.run(store.get_chunks_by_embedding(vectors[42], top_k=5))
+    assert matches[0].id == ids[42]
+    assert matches[0].content == "content 42"
+    assert np.isclose(matches[0].score, 1.0, atol=1e-5)
+    assert [match.score for match in matches] == sorted(
+        (match.score for match in matches), reverse=True
+    )
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ normalized[7]))[:5]
+    assert top_ids(store, vectors[7], 5) == [ids[row] for row in expected]
+
+
+def test_exact_search_applies_filters(tmp_path):
+    vectors = make_vectors(40)
+    store = FlatVectorStore(str(tmp_path))
+    ids = fill(store, vectors)
+
+    matches = asyncio.run(
+        store.get_chunks_by_embedding(vectors[3], top_k=40, filters={"parity": "even"})
+    )
+    assert len(matches) == 20
+    assert ids[3] not in {match.id for match in matches}
+    assert all(match.metadata["parity"] == "even" for match in matches)
+
+
+def test_int8_search_finds_the_stored_vector(tmp_path):
+    vectors = make_vectors(200)
+    store = FlatVectorStore(str(tmp_path), quantization="int8")
+    ids = fill(store, vectors)
+
+    assert store.search_bytes == 200 * DIMENSIONS
+    for row in (0, 57, 199):
+        assert top_ids(store, vectors[row], 1) == [ids[row]]
+
+
+def test_pq_search_with_reranking_matches_exact_search(tmp_path):
+    vectors = make_vectors(300)
+    exact = FlatVectorStore(str(tmp_path / "exact"))
+    fill(exact, vectors, batch_size=300)
+    store = FlatVectorStore(str(tmp_path / "pq"), quantization="pq", rerank_factor=10)
+    fill(store, vectors, batch_size=300)
+
+    assert store.search_bytes < exact.search_bytes
+    exact_contents = [
+        match.content
+        for match in asyncio.run(exact.get_chunks_by_embedding(vectors[11], 5))
+    ]
+    pq_contents = [
+        match.content
+        for match in asyncio.run(store.get_chunks_by_embedding(vectors[11], 5))
+    ]
+    assert pq_contents == exact_contents
+
+
+def test_delete_and_reload(tmp_path):
+    vectors = make_vectors(50)
+    store = FlatVectorStore(str(tmp_path))
+    ids = fill(store, vectors, batch_size=7)
+    asyncio.run(store.delete_chunks([ids[0], ids[10], "unknown"]))
+
+    reopened = FlatVectorStore(str(tmp_path))
+    assert asyncio.run(reopened.get_chunk_ids()) == [
+        chunk_id for i, chunk_id in enumerate(ids) if i not in (0, 10)
+    ]
+    assert top_ids(reopened, vectors[25], 1) == [ids[25]]
+    assert ids[10] not in top_ids(reopened, vectors[10], 5)
+
+    # Inserts after a reload append behind the surviving rows
+    new_ids = asyncio.run(
+        reopened.insert_chunks(make_chunks(1, 50), make_vectors(1, seed=1))
+    )
+    assert (
+        top_ids(FlatVectorStore(str(tmp_path)), make_vectors(1, seed=1)[0], 1)
+        == new_ids
+    )
+
+
+def test_quantized_store_reloads_its_codes(tmp_path):
+    vectors = make_vectors(100)
+    store = FlatVectorStore(str(tmp_path), quantization="int8")
+    ids = fill(store, vectors, batch_size=100)
+    asyncio.run(store.delete_chunks(ids[:10]))
+
+    reopened = FlatVectorStore(str(tmp_path), quantization="int8")
+    assert reopened.search_bytes == 90 * DIMENSIONS
+    assert top_ids(reopened, vectors[50], 1) == [ids[50]]
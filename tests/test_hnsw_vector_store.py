@@ -0,0 +1,121 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("hnswlib")
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.vectorstores.hnsw import HNSWVectorStore
+
+DIMENSIONS = 16
+
+
+def make_chunks(n: int) -> list[Chunk]:
+    return [
+        Chunk(
+            title=f"chunk {i}",
+            content=f"content {i}",
+            mime_type="text/plain",
+            metadata={"group": i % 10, "rank": i},
+        )
+        for i in range(n)
+    ]
+
+
+def make_vectors(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, DIMENSIONS))
+
+
+def exact_top(vectors: np.ndarray, query: np.ndarray, rows, top_k: int) -> list[int]:
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    rows = list(rows)
+    scores = normalized[rows] @ (query / np.linalg.norm(query))
+    return [rows[i] for i in np.argsort(-scores)[:top_k]]
+
+
+def search(store: HNSWVectorStore, query: np.ndarray, top_k: int, filters=None):
+    return asyncio.run(store.get_chunks_by_embedding(query, top_k, filters))
+
+
+@pytest.fixture
+def vectors() -> np.ndarray:
+    return make_vectors(500)
+
+
+@pytest.fixture
+def store(tmp_path) -> HNSWVectorStore:
+    return HNSWVectorStore(
+        str(tmp_path), initial_capacity=100, exact_search_threshold=60
+    )
+
+
+@pytest.fixture
+def ids(store, vectors) -> list[str]:
+    return asyncio.run(store.insert_chunks(make_chunks(len(vectors)), vectors))
+
+
+def test_search_returns_the_nearest_chunks(store, ids, vectors):
+    matches = search(store, vectors[123], top_k=5)
+    assert matches[0].id == ids[123]
+    assert matches[0].score == pytest.approx(1.0, abs=1e-4)
+    assert [match.score for match in matches] == sorted(
+        (match.score for match in matches), reverse=True
+    )
+    expected = exact_top(vectors, vectors[123], range(len(vectors)), 5)
+    assert {match.id for match in matches} == {ids[row] for row in expected}
+
+
+def test_selective_filter_is_answered_by_an_exact_scan(store, ids, vectors):
+    # 50 matching chunks, below the exact search threshold
+    query = make_vectors(1, seed=1)[0]
+    matches = search(store, query, top_k=10, filters={"group": 3})
+    rows = range(3, len(vectors), 10)
+    assert [match.id for match in matches] == [
+        ids[row] for row in exact_top(vectors, query, rows, 10)
+    ]
+    assert all(match.metadata["group"] == 3 for match in matches)
+
+
+def test_broad_filter_searches_the_graph_for_matching_nodes(store, ids, vectors):
+    # 250 matching chunks, above the exact search threshold
+    filters = {"group": {"$in": [0, 2, 4, 6, 8]}}
+    matches = search(store, vectors[7], top_k=10, filters=filters)
+    assert len(matches) == 10
+    assert all(match.metadata["group"] % 2 == 0 for match in matches)
+    assert ids[7] not in {match.id for match in matches}
+
+    matches = search(store, vectors[8], top_k=10, filters=filters)
+    assert matches[0].id == ids[8]
+
+    range_filter = {"rank": {"$lt": 20}}
+    matches = search(store, vectors[499], top_k=30, filters=range_filter)
+    assert sorted(match.metadata["rank"] for match in matches) == list(range(20))
+
+
+def test_search_after_heavy_deletion_returns_only_live_chunks(store, ids, vectors):
+    live = {0, 250, 499}
+    asyncio.run(
+        store.delete_chunks(
+            [chunk_id for row, chunk_id in enumerate(ids) if row not in live]
+        )
+    )
+    matches = search(store, vectors[250], top_k=10)
+    assert [match.id for match in matches][:1] == [ids[250]]
+    assert {match.id for match in matches} == {ids[row] for row in live}
+    filtered = search(store, vectors[0], top_k=5, filters={"group": 9})
+    assert [match.id for match in filtered] == [ids[499]]
+
+
+def test_changes_are_persisted_on_save(tmp_path, store, ids, vectors):
+    asyncio.run(store.delete_chunks(ids[:100]))
+    assert asyncio.run(HNSWVectorStore(str(tmp_path)).get_chunk_ids()) == []
+
+    asyncio.run(store.save())
+    reopened = HNSWVectorStore(str(tmp_path))
+    assert asyncio.run(reopened.get_chunk_ids()) == ids[100:]
+    assert search(reopened, vectors[200], 1)[0].id == ids[200]
+    assert ids[50] not in {match.id for match in search(reopened, vectors[50], 5)}
+
+    new_ids = asyncio.run(reopened.insert_chunks(make_chunks(1), make_vectors(1, 2)))
+    assert search(reopened, make_vectors(1, 2)[0], 1)[0].id == new_ids[0]
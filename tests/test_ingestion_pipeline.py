@@ -0,0 +1,105 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.ingestion.pipeline import IngestionPipeline, estimate_tokens
+from conversational_toolkit.vectorstores.flat import FlatVectorStore
+
+
+class SlowEmbeddings(EmbeddingsModel):
+    """Embeddings whose first requests take longest, so batches finish out of order."""
+
+    def __init__(self, fail_on: str | None = None) -> None:
+        self.requests: list[list[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_on = fail_on
+
+    async def get_embeddings(self, texts):
+        self.requests.append(texts)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.02 / len(self.requests))
+            if self.fail_on in texts:
+                raise RuntimeError("embedding request failed")
+            return np.array(
+                [[float(text.split()[-1]), 1.0, 0.0] for text in texts],
+                dtype=np.float64,
+            )
+        finally:
+            self.in_flight -= 1
+
+
+def make_chunks(n: int) -> list[Chunk]:
+    return [
+        Chunk(title="", content=f"chunk {i}", mime_type="text/plain", metadata={})
+        for i in range(n)
+    ]
+
+
+def test_ids_follow_input_order_with_concurrent_embedders(tmp_path):
+    chunks = make_chunks(23)
+    embeddings = SlowEmbeddings()
+    store = FlatVectorStore(str(tmp_path))
+    inserted: list[list[str]] = []
+    pipeline = IngestionPipeline(
+        embeddings,
+        store,
+        concurrency=4,
+        max_batch_size=3,
+        on_insert=lambda batch, ids: inserted.append([c.content for c in batch]),
+    )
+
+    report = asyncio.run(pipeline.run(chunks))
+
+    assert (report.chunks, report.batches) == (23, 8)
+    assert embeddings.max_in_flight > 1
+    assert all(len(request) <= 3 for request in embeddings.requests)
+    # The writer saw the batches in completion order, but the IDs are in input order
+    assert [content for batch in inserted for content in batch] != [
+        chunk.content for chunk in chunks
+    ]
+    stored = asyncio.run(store.get_chunks_by_ids(report.chunk_ids))
+    assert [chunk.content for chunk in stored] == [chunk.content for chunk in chunks]
+    # Each chunk is stored with its own embedding
+    for i in (0, 11, 22):
+        match = asyncio.run(store.get_chunks_by_embedding(np.array([i, 1.0, 0.0]), 1))
+        assert match[0].id == report.chunk_ids[i]
+
+
+def test_batches_are_packed_by_token_budget(tmp_path):
+    chunks = make_chunks(10)
+    budget = 3 * estimate_tokens(chunks[0])
+    embeddings = SlowEmbeddings()
+    pipeline = IngestionPipeline(
+        embeddings,
+        FlatVectorStore(str(tmp_path)),
+        concurrency=1,
+        max_batch_tokens=budget,
+    )
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    report = asyncio.run(pipeline.run(stream()))
+    assert [len(request) for request in embeddings.requests] == [3, 3, 3, 1]
+    assert report.tokens == sum(map(estimate_tokens, chunks))
+    assert len(report.chunk_ids) == 10
+
+
+def test_failing_request_cancels_the_pipeline(tmp_path):
+    embeddings = SlowEmbeddings(fail_on="chunk 7")
+    pipeline = IngestionPipeline(
+        embeddings, FlatVectorStore(str(tmp_path)), concurrency=2, max_batch_size=2
+    )
+    with pytest.raises(RuntimeError, match="embedding request failed"):
+        asyncio.run(asyncio.wait_for(pipeline.run(make_chunks(50)), timeout=5))
+    assert len(embeddings.requests) < 25
+
+    with pytest.raises(ValueError):
+        IngestionPipeline(embeddings, FlatVectorStore(str(tmp_path)), concurrency=0)
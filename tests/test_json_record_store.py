@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+from pydantic import BaseModel
+
+from conversational_toolkit.conversation_database.in_memory.storage import (
+    JsonRecordStore,
+)
+
+
+class Item(BaseModel):
+    id: str
+    value: int
+
+
+def open_store(path, **kwargs) -> JsonRecordStore[Item]:
+    store = JsonRecordStore(str(path), Item, write_ahead_log=True, **kwargs)
+    store.load()
+    return store
+
+
+def put(store: JsonRecordStore[Item], item_id: str, value: int) -> None:
+    store.records[item_id] = Item(id=item_id, value=value)
+    store.put(item_id, store.records[item_id])
+
+
+def test_wal_replay_restores_puts_and_deletes(tmp_path):
+    store = open_store(tmp_path / "items.json")
+    put(store, "a", 1)
+    put(store, "b", 2)
+    put(store, "a", 3)
+    del store.records["b"]
+    store.delete(["b"])
+    store.close()
+
+    reopened = open_store(tmp_path / "items.json")
+    assert reopened.records == {"a": Item(id="a", value=3)}
+    reopened.close()
+
+
+def test_wal_replay_drops_torn_last_entry(tmp_path):
+    store = open_store(tmp_path / "items.json")
+    put(store, "a", 1)
+    store.close()
+    with open(store.log_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "id": "b", "rec')
+
+    reopened = open_store(tmp_path / "items.json")
+    assert set(reopened.records) == {"a"}
+    put(reopened, "c", 2)
+    reopened.close()
+    assert set(open_store(tmp_path / "items.json").records) == {"a", "c"}
+
+
+def test_compact_truncates_log_and_keeps_state(tmp_path):
+    store = open_store(tmp_path / "items.json")
+    for i in range(10):
+        put(store, str(i), i)
+    store.compact()
+    assert store.log_path.read_text(encoding="utf-8") == ""
+    assert not store.segment_path.exists()
+    put(store, "10", 10)
+    store.close()
+
+    reopened = open_store(tmp_path / "items.json")
+    assert {k: v.value for k, v in reopened.records.items()} == {
+        str(i): i for i in range(11)
+    }
+    reopened.close()
+
+
+def test_appends_during_background_compaction_survive_replay(tmp_path):
+    store = open_store(
+        tmp_path / "items.json",
+        fsync_interval=0.001,
+        compact_interval=0.0,
+        compact_min_entries=50,
+    )
+    # Hold the compaction lock so that the background thread is writing a snapshot
+    # while the appends below go on
+    with store._compaction_lock:
+        for i in range(60):
+            put(store, str(i), i)
+        assert store._compacting
+        for i in range(60, 200):
+            put(store, str(i), i)
+    deadline = time.monotonic() + 5
+    while store._compacting and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not store._compacting
+    for i in range(200, 300):
+        put(store, str(i), -i)
+    store.close()
+
+    reopened = open_store(tmp_path / "items.json")
+    expected = {str(i): i for i in range(200)} | {str(i): -i for i in range(200, 300)}
+    assert {k: v.value for k, v in reopened.records.items()} == expected
+    reopened.close()
+
+
+def test_interrupted_compaction_is_completed_at_startup(tmp_path):
+    store = open_store(tmp_path / "items.json")
+    for i in range(5):
+        put(store, str(i), i)
+    # Rotate the log but "crash" before the snapshot is written
+    _, rotated = store._rotate()
+    rotated.close()
+    put(store, "5", 5)
+    store._stop.set()
+    store._worker.join()
+    store._fsync()
+    assert store.segment_path.exists()
+
+    reopened = open_store(tmp_path / "items.json")
+    assert set(reopened.records) == {str(i) for i in range(6)}
+    assert not reopened.segment_path.exists()
+    reopened.close()
+
+
+def test_snapshot_mode_async_writes(tmp_path):
+    async def main() -> None:
+        store = JsonRecordStore(str(tmp_path / "items.json"), Item)
+        store.load()
+        store.records["a"] = Item(id="a", value=1)
+        await store.put_async("a", store.records["a"])
+        store.records.pop("a")
+        store.records["b"] = Item(id="b", value=2)
+        await store.delete_async(["a"])
+
+    asyncio.run(main())
+    store = JsonRecordStore(str(tmp_path / "items.json"), Item)
+    assert store.load() == {"b": Item(id="b", value=2)}
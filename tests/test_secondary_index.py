@@ -0,0 +1,126 @@
+import asyncio
+
+from conversational_toolkit.conversation_database.data_models.conversation import (
+    Conversation,
+)
+from conversational_toolkit.conversation_database.data_models.message import Message
+from conversational_toolkit.conversation_database.data_models.reaction import Reaction
+from conversational_toolkit.conversation_database.in_memory.conversation import (
+    InMemoryConversationDatabase,
+)
+from conversational_toolkit.conversation_database.in_memory.index import SecondaryIndex
+from conversational_toolkit.conversation_database.in_memory.message import (
+    InMemoryMessageDatabase,
+)
+from conversational_toolkit.conversation_database.in_memory.reactions import (
+    InMemoryReactionDatabase,
+)
+from conversational_toolkit.llms.base import Roles
+
+
+def make_message(message_id: str, conversation_id: str) -> Message:
+    return Message(
+        id=message_id,
+        user_id="user",
+        conversation_id=conversation_id,
+        content=f"message {message_id}",
+        role=Roles.USER,
+        create_timestamp=0,
+    )
+
+
+def make_conversation(conversation_id: str, user_id: str) -> Conversation:
+    return Conversation(
+        id=conversation_id,
+        user_id=user_id,
+        create_timestamp=0,
+        update_timestamp=0,
+        title="title",
+    )
+
+
+def test_index_tracks_replacements_and_removals():
+    index = SecondaryIndex[Message](
+        lambda message: message.conversation_id,
+        [make_message("m1", "c1"), make_message("m2", "c1")],
+    )
+    index.add(make_message("m3", "c2"))
+    assert index.get("c1") == ["m1", "m2"]
+
+    index.replace(make_message("m1", "c1"), make_message("m1", "c2"))
+    assert index.get("c1") == ["m2"]
+    assert index.get("c2") == ["m3", "m1"]
+
+    index.remove(make_message("m2", "c1"))
+    index.remove(make_message("unknown", "c3"))
+    assert index.get("c1") == []
+    assert index.get("c3") == []
+
+
+def test_index_skips_records_without_a_key():
+    index = SecondaryIndex[Message](lambda message: message.parent_id)
+    index.add(make_message("m1", "c1"))
+    index.replace(None, make_message("m1", "c1").model_copy(update={"parent_id": "p"}))
+    assert index.get("p") == ["m1"]
+
+
+def test_conversation_update_moves_it_to_the_new_user(tmp_path):
+    db = InMemoryConversationDatabase(str(tmp_path / "conversations.json"))
+    asyncio.run(db.create_conversation(make_conversation("c1", "alice")))
+    asyncio.run(db.create_conversation(make_conversation("c2", "alice")))
+    asyncio.run(db.update_conversation(make_conversation("c1", "bob")))
+
+    by_user = asyncio.run(db.get_conversations_by_user_id("alice"))
+    assert [conversation.id for conversation in by_user] == ["c2"]
+    by_user = asyncio.run(db.get_conversations_by_user_id("bob"))
+    assert [conversation.id for conversation in by_user] == ["c1"]
+
+    asyncio.run(db.delete_conversation("c2"))
+    assert asyncio.run(db.get_conversations_by_user_id("alice")) == []
+
+    reopened = InMemoryConversationDatabase(str(tmp_path / "conversations.json"))
+    by_user = asyncio.run(reopened.get_conversations_by_user_id("bob"))
+    assert [conversation.id for conversation in by_user] == ["c1"]
+
+
+def test_message_index_follows_recreates_and_deletes(tmp_path):
+    db = InMemoryMessageDatabase(str(tmp_path / "messages.json"))
+    for message_id, conversation_id in [("m1", "c1"), ("m2", "c1"), ("m3", "c2")]:
+        asyncio.run(db.create_message(make_message(message_id, conversation_id)))
+    # Re-creating a message under the same ID replaces it, including its index entry
+    asyncio.run(db.create_message(make_message("m2", "c2")))
+
+    def ids(conversation_id: str) -> list[str]:
+        messages = asyncio.run(db.get_messages_by_conversation_id(conversation_id))
+        return [message.id for message in messages]
+
+    assert ids("c1") == ["m1"]
+    assert ids("c2") == ["m3", "m2"]
+
+    asyncio.run(db.delete_message("m3"))
+    assert ids("c2") == ["m2"]
+
+    asyncio.run(db.delete_messages_by_conversation_id("c2"))
+    assert ids("c2") == []
+    assert set(db.messages) == {"m1"}
+
+
+def test_reaction_index_follows_bulk_deletes(tmp_path):
+    db = InMemoryReactionDatabase(str(tmp_path / "reactions.json"))
+    for reaction_id, message_id in [("r1", "m1"), ("r2", "m1"), ("r3", "m2")]:
+        asyncio.run(
+            db.create_reaction(
+                Reaction(id=reaction_id, user_id="u", message_id=message_id, content="")
+            )
+        )
+
+    asyncio.run(db.delete_reactions(["r1"]))
+    by_message = asyncio.run(db.get_reactions_by_message_ids(["m1", "m2"]))
+    assert {key: [r.id for r in value] for key, value in by_message.items()} == {
+        "m1": ["r2"],
+        "m2": ["r3"],
+    }
+
+    asyncio.run(db.delete_reactions_by_message_ids(["m1", "m2"]))
+    assert asyncio.run(db.get_reactions_by_message_id("m2")) == []
+    assert db.reactions == {}
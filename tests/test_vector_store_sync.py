@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from conversational_toolkit.chunking.jsonlines_chunker import JSONLinesChunker
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.ingestion.parallel_chunker import ParallelChunker
+from conversational_toolkit.ingestion.sync import VectorStoreSync
+from conversational_toolkit.retriever.bm25_retriever import BM25Retriever
+from conversational_toolkit.vectorstores.flat import FlatVectorStore
+
+
+class HashEmbeddings(EmbeddingsModel):
+    """Deterministic embeddings that record what they embed and fail on request."""
+
+    def __init__(self, fail_after: int | None = None) -> None:
+        self.embedded: list[str] = []
+        self.fail_after = fail_after
+
+    async def get_embeddings(self, texts):
+        texts = [texts] if isinstance(texts, str) else texts
+        if self.fail_after is not None and len(self.embedded) >= self.fail_after:
+            raise RuntimeError("embedding service unavailable")
+        self.embedded += texts
+        return np.array(
+            [
+                np.frombuffer(hashlib.sha256(text.encode()).digest(), dtype=np.uint8)
+                for text in texts
+            ],
+            dtype=np.float64,
+        )
+
+
+def write_file(path: Path, contents: list[str]) -> Path:
+    path.write_text(
+        "".join(
+            json.dumps({"title": path.stem, "content": content, "source": path.name})
+            + "\n"
+            for content in contents
+        )
+    )
+    return path
+
+
+@pytest.fixture
+def chunker(tmp_path):
+    chunker = ParallelChunker(
+        {".jsonl": JSONLinesChunker()},
+        max_workers=1,
+        chunker_kwargs={
+            ".jsonl": {
+                "title_key": "title",
+                "content_key": "content",
+                "source_key": "source",
+            }
+        },
+    )
+    yield chunker
+    chunker.close()
+
+
+def make_sync(tmp_path: Path, embeddings: EmbeddingsModel) -> VectorStoreSync:
+    store = FlatVectorStore(str(tmp_path / "store"))
+    bm25 = BM25Retriever(store, top_k=5, index_path=str(tmp_path / "bm25.json"))
+    return VectorStoreSync(
+        store,
+        embeddings,
+        str(tmp_path / "manifest.json"),
+        indexes=[bm25],
+        batch_size=1,
+        concurrency=1,
+    )
+
+
+def stored_contents(sync: VectorStoreSync) -> list[str]:
+    store = sync.vector_store
+    ids = asyncio.run(store.get_chunk_ids())
+    return sorted(chunk.content for chunk in asyncio.run(store.get_chunks_by_ids(ids)))
+
+
+def manifest_ids(sync: VectorStoreSync) -> set[str]:
+    return {
+        chunk_id
+        for entry in sync.manifest.values()
+        for ids in entry["chunks"].values()
+        for chunk_id in ids
+    }
+
+
+def test_sync_embeds_only_new_chunks_and_tombstones_missing_files(tmp_path, chunker):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    a = write_file(docs / "a.jsonl", ["alpha", "beta", "beta"])
+    b = write_file(docs / "b.jsonl", ["gamma"])
+    embeddings = HashEmbeddings()
+    sync = make_sync(tmp_path, embeddings)
+
+    report = asyncio.run(sync.sync([a, b], chunker))
+    assert (report.updated_files, report.inserted_chunks) == (2, 4)
+    assert stored_contents(sync) == ["alpha", "beta", "beta", "gamma"]
+
+    report = asyncio.run(sync.sync([a, b], chunker))
+    assert (report.unchanged_files, report.updated_files) == (2, 0)
+    assert len(embeddings.embedded) == 4
+
+    write_file(a, ["alpha", "beta", "delta"])
+    report = asyncio.run(sync.sync([a], chunker))
+    assert report.model_dump() == {
+        "unchanged_files": 0,
+        "updated_files": 1,
+        "removed_files": 1,
+        "kept_chunks": 2,
+        "inserted_chunks": 1,
+        "deleted_chunks": 2,
+    }
+    assert embeddings.embedded[4:] == ["delta"]
+    assert stored_contents(sync) == ["alpha", "beta", "delta"]
+    assert set(sync.manifest) == {str(a)}
+    assert manifest_ids(sync) == set(asyncio.run(sync.vector_store.get_chunk_ids()))
+
+    bm25 = BM25Retriever(
+        sync.vector_store, top_k=5, index_path=str(tmp_path / "bm25.json")
+    )
+    assert {match.content for match in asyncio.run(bm25.retrieve("gamma delta"))} == {
+        "delta"
+    }
+
+
+def test_interrupted_sync_leaves_no_untracked_chunks(tmp_path, chunker):
+    path = write_file(tmp_path / "a.jsonl", ["one", "two"])
+    sync = make_sync(tmp_path, HashEmbeddings())
+    asyncio.run(sync.sync([path], chunker))
+    old_ids = manifest_ids(sync)
+
+    # The embedding service fails after the first new chunk is inserted
+    write_file(path, ["one", "three", "four", "five"])
+    failing = make_sync(tmp_path, HashEmbeddings(fail_after=1))
+    with pytest.raises(RuntimeError):
+        asyncio.run(failing.sync([path], chunker))
+
+    store_ids = set(asyncio.run(failing.vector_store.get_chunk_ids()))
+    assert failing.manifest[str(path)]["file_hash"] is None
+    assert manifest_ids(failing) == store_ids
+    assert old_ids < store_ids
+
+    embeddings = HashEmbeddings()
+    recovered = make_sync(tmp_path, embeddings)
+    report = asyncio.run(recovered.sync([path], chunker))
+    assert sorted(embeddings.embedded) == ["five", "four"]
+    assert (report.kept_chunks, report.inserted_chunks, report.deleted_chunks) == (
+        2,
+        2,
+        1,
+    )
+    assert stored_contents(recovered) == ["five", "four", "one", "three"]
+    assert manifest_ids(recovered) == set(
+        asyncio.run(recovered.vector_store.get_chunk_ids())
+    )
+    assert recovered.manifest[str(path)]["file_hash"] is not None